@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    BasicAuthentication,
+    SessionAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPES, JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from accounts.replay import is_token_used
+
+User = get_user_model()
+
+
+def credentials_key(kind, credentials):
+    # never keep the raw credentials around, not even inside a cache key
+    digest = salted_hmac(f"accounts.auth.{kind}", credentials).hexdigest()
+    return f"accounts:auth:{kind}:{digest}"
+
+
+def user_key(user_id):
+    return f"accounts:auth:user:{user_id}"
+
+
+def jti_key(jti):
+    return f"accounts:auth:jti:{jti}"
+
+
+def get_cached_user(user_id):
+    """
+    Return the user with the given id, from the cache when possible, or None.
+    ``accounts.signals`` drops the entry whenever the user is saved or deleted.
+    """
+    key = user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, settings.ACCOUNTS_AUTH_CACHE_TIMEOUT)
+    return user
+
+
+def forget_jti(jti):
+    """
+    Forget the validated JWT with the given ``jti`` so its next use is checked
+    against the database again.
+    """
+    key = cache.get(jti_key(jti))
+    if key is not None:
+        cache.delete_many([key, jti_key(jti)])
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    Remembers which user a pair of credentials belongs to, so the password is
+    only hashed on the first request. A password change alters the hash stored
+    on the user, which no longer matches the remembered one.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = credentials_key("basic", f"{userid}:{password}")
+        cached = cache.get(key)
+        if cached is not None:
+            user_id, password_hash = cached
+            user = get_cached_user(user_id)
+            if user is not None and user.is_active and user.password == password_hash:
+                return (user, None)
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        cache.set_many(
+            {key: (user.pk, user.password), user_key(user.pk): user},
+            settings.ACCOUNTS_AUTH_CACHE_TIMEOUT,
+        )
+        return (user, auth)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication reading the token owner from the cache. Logging out
+    deletes the token, which drops the entry.
+    """
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        cache_key = credentials_key("token", key)
+        cached = cache.get(cache_key)
+        if cached is None:
+            try:
+                token = model.objects.get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            cache.set(cache_key, (token.user_id, token.created), settings.ACCOUNTS_AUTH_CACHE_TIMEOUT)
+        else:
+            user_id, created = cached
+            token = model(key=key, user_id=user_id, created=created)
+
+        user = get_cached_user(token.user_id)
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        token.user = user
+        return (user, token)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication remembering validated tokens in the cache until they
+    expire, at most for ``ACCOUNTS_AUTH_CACHE_TIMEOUT`` seconds.
+    Tokens whose ``jti`` was recorded as a ``UsedToken`` are rejected, and
+    recording one forgets the token.
+    """
+
+    def get_validated_token(self, raw_token):
+        key = credentials_key("jwt", raw_token)
+        cached = cache.get(key)
+        if cached is not None:
+            # the signature and the UsedToken table were checked when it was cached
+            return jwt_settings.AUTH_TOKEN_CLASSES[cached](raw_token, verify=False)
+
+        validated_token = super().get_validated_token(raw_token)
+        jti = validated_token.get(jwt_settings.JTI_CLAIM)
+        if jti and is_token_used(jti):
+            raise InvalidToken(_("Token has already been used"))
+
+        timeout = settings.ACCOUNTS_AUTH_CACHE_TIMEOUT
+        exp = validated_token.get("exp")
+        if exp is not None:
+            remaining = exp - datetime.now(timezone.utc).timestamp()
+            timeout = max(0, min(timeout, int(remaining)))
+        if timeout:
+            cache.set(key, self.token_class_index(validated_token), timeout)
+            if jti:
+                cache.set(jti_key(jti), key, timeout)
+        return validated_token
+
+    @staticmethod
+    def token_class_index(validated_token):
+        return next(
+            index
+            for index, token_class in enumerate(jwt_settings.AUTH_TOKEN_CLASSES)
+            if isinstance(validated_token, token_class)
+        )
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class APIAuthentication(BaseAuthentication):
+    """
+    Authenticates API requests with the scheme named in the ``Authorization``
+    header (Basic, Token or a JWT type such as Bearer), falling back to the
+    session for any other request. Only the matching backend runs, instead
+    of every configured one in turn.
+    """
+
+    def __init__(self):
+        self.basic = CachedBasicAuthentication()
+        self.session = SessionAuthentication()
+        jwt = CachedJWTAuthentication()
+        self.backends = {b"basic": self.basic, b"token": CachedTokenAuthentication()}
+        for header_type in AUTH_HEADER_TYPES:
+            self.backends[header_type.lower().encode()] = jwt
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split(maxsplit=1)
+        backend = self.backends.get(auth[0].lower()) if auth else None
+        if backend is None:
+            return self.session.authenticate(request)
+        return backend.authenticate(request)
+
+    def authenticate_header(self, request):
+        # same challenge as when BasicAuthentication came first in the settings
+        return self.basic.authenticate_header(request)
@@ -5,6 +5,7 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from ...models import User, Profile
+from core.images import image_srcsets
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 
@@ -27,7 +28,13 @@ class RegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop("password1", None)
-        return User.objects.create_user(**validated_data)
+        password_hash = validated_data.pop("password_hash", None)
+        if password_hash is None:
+            return User.objects.create_user(**validated_data)
+        # hashed off the request thread by RegistrationApiView.apost
+        user = User(email=User.objects.normalize_email(validated_data["email"]), password=password_hash)
+        user.save()
+        return user
 
 
 class CustomAuthTokenSerializer(serializers.Serializer):
@@ -95,10 +102,15 @@ class ChangePasswordSerializer(serializers.Serializer):
 
 class ProfileSerializer(serializers.ModelSerializer):
     email = serializers.CharField(source="user.email", read_only=True)
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = ("id", "email", "first_name", "last_name", "image", "bio")
+        fields = ("id", "email", "first_name", "last_name", "image", "image_srcset", "bio")
+
+    def get_image_srcset(self, obj):
+        request = self.context.get("request")
+        return image_srcsets(obj, build_url=request.build_absolute_uri if request else None)
 
 
 class ActivationResendSerializer(serializers.Serializer):
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework_simplejwt.views import (
     TokenRefreshView,
@@ -43,3 +44,9 @@ urlpatterns = [
     path("jwt/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
     path("jwt/verify/", TokenVerifyView.as_view(), name="token-verify"),
 ]
+
+if settings.ASYNC_VIEWS:
+    # signups hash the password without holding up the thread of the sync views
+    urlpatterns = [
+        path("registration/", views.async_registration_view(), name="registration"),
+    ] + urlpatterns
@@ -22,14 +22,17 @@ from .serializers import (
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from mail_templated import EmailMessage
+from django.db import transaction
 import jwt
 from django.conf import settings
-from ...tasks import send_email
+from ...emails import queue_email
 
 
 from ..utils import get_tokens_for_user_util  # Import the utility function
-from accounts.models import UsedToken  # Import the UsedToken model
+from accounts.replay import is_token_used, record_used_token
+from accounts.hashing import ahash_password
+from asgiref.sync import sync_to_async
+from core.async_api import async_api_view
 
 User = get_user_model()
 
@@ -48,24 +51,36 @@ class RegistrationApiView(GenericAPIView):
             )
         serializer = RegistrationSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            email = serializer.validated_data["email"]
-            data = {"email": email}
-            user_obj = get_object_or_404(User, email=email)
-            token = get_tokens_for_user_util(user_obj)  # Use utility function
-
-            email_obj = EmailMessage(
-                "email/activation_email.tpl",
-                {"token": token},
-                "admin@admin.com",
-                [email],
-            )
-            send_email.delay(email_obj)
-            # serializer.data.pop('password')
-            return Response(data, status=status.HTTP_201_CREATED)
+            return Response(self.register(serializer), status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    async def apost(self, request, *args, **kwargs):
+        serializer = RegistrationSerializer(data=request.data)
+        # the email uniqueness check queries the database
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # only the validated password is hashed, in a pool of its own
+        password_hash = await ahash_password(serializer.validated_data["password"])
+        data = await sync_to_async(self.register)(serializer, password_hash)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def register(self, serializer, password_hash=None):
+        with transaction.atomic():
+            # the save_profile signal creates the profile in the same transaction
+            user_obj = serializer.save(password_hash=password_hash)
+        email = user_obj.email
+        token = get_tokens_for_user_util(user_obj)  # Use utility function
+
+        # sent by the celery worker
+        queue_email("email/activation_email.tpl", {"token": token}, email)
+        return {"email": email}
+
+
+def async_registration_view():
+    # authenticated requests get the 403 of the sync view
+    return async_api_view(RegistrationApiView, {"post": "apost"})
+
 
 class CustomObtainAuthToken(ObtainAuthToken):
     serializer_class = CustomAuthTokenSerializer
@@ -149,7 +164,7 @@ class ActivationApiView(APIView):
                 )
 
             # Check if this token JTI has been used before
-            if UsedToken.objects.filter(token_jti=jti).exists():
+            if is_token_used(jti):
                 return Response(
                     {"detail": "This activation link has already been used."},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -184,7 +199,7 @@ class ActivationApiView(APIView):
         user_obj.save()
 
         # Record the token JTI as used
-        UsedToken.objects.create(user=user_obj, token_jti=jti)
+        record_used_token(user_obj, token_payload)
 
         return Response(
             {"details": "Your account has been activated successfully."},
@@ -200,13 +215,7 @@ class ActivationResendApiView(GenericAPIView):
         serializer.is_valid(raise_exception=True)
         user_obj = serializer.validated_data["user"]
         token = get_tokens_for_user_util(user_obj)  # Use utility function
-        email_obj = EmailMessage(
-            "email/activation_email.tpl",
-            {"token": token},
-            "admin@admin.com",
-            [user_obj.email],
-        )
-        send_email.delay(email_obj)
+        queue_email("email/activation_email.tpl", {"token": token}, user_obj.email)
         return Response(
             {"details": "User activation resend successfully."},
             status=status.HTTP_200_OK,
@@ -231,10 +240,7 @@ class ResetPasswordApiView(GenericAPIView):
         user_obj = get_object_or_404(User, email=email)
         token = get_tokens_for_user_util(user_obj)  # Use utility function
 
-        email_obj = EmailMessage(
-            "email/reset_password.tpl", {"token": token}, "admin@admin.com", [email]
-        )
-        send_email.delay(email_obj)
+        queue_email("email/reset_password.tpl", {"token": token}, email)
 
         return Response(
             {"details": "Sent reset password email."}, status=status.HTTP_200_OK
@@ -258,7 +264,7 @@ class ResetPasswordConfirmApiView(GenericAPIView):
                 )
 
             # Check if this token JTI has been used before
-            if UsedToken.objects.filter(token_jti=jti).exists():
+            if is_token_used(jti):
                 return Response(
                     {"detail": "This password reset link has already been used."},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -287,7 +293,7 @@ class ResetPasswordConfirmApiView(GenericAPIView):
         user_obj.save()
 
         # Record the token JTI as used
-        UsedToken.objects.create(user=user_obj, token_jti=jti)
+        record_used_token(user_obj, token_payload)
 
         return Response(
             {"details": "Password has been reset successfully."},
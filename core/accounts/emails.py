@@ -0,0 +1,41 @@
+from functools import cache
+
+from django.conf import settings
+from django.template.loader import get_template
+from mail_templated import EmailMessage
+
+from core.buffers import get_buffer
+
+EMAIL_BUFFER = "emails"
+# loaded when a worker process starts, see accounts.tasks
+ACCOUNT_EMAIL_TEMPLATES = ("email/activation_email.tpl", "email/reset_password.tpl")
+
+
+def queue_email(template_name, context, recipient):
+    """
+    Queue a templated email for ``accounts.tasks.send_queued_emails``. Only the
+    template name, its (JSON-serializable) context and the recipient are
+    queued, the message is rendered by the worker.
+    """
+    get_buffer(EMAIL_BUFFER).push((template_name, context, recipient, 0))
+
+
+@cache
+def get_email_template(template_name):
+    """
+    Load and compile an email template once per process.
+    """
+    return get_template(template_name)
+
+
+def preload_email_templates():
+    for template_name in ACCOUNT_EMAIL_TEMPLATES:
+        get_email_template(template_name)
+
+
+def render_email(template_name, context, recipient):
+    message = EmailMessage(template_name, context, settings.DEFAULT_FROM_EMAIL, [recipient])
+    # a loaded template is only filled in with the context
+    message.template = get_email_template(template_name)
+    message.render()
+    return message
@@ -0,0 +1,28 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def get_executor(workers):
+    with _lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(workers, thread_name_prefix="password-hashing")
+        return _executors[workers]
+
+
+async def ahash_password(password):
+    """
+    Hash ``password`` in a pool of ``ACCOUNTS_HASHING_WORKERS`` threads.
+
+    The pool is separate from the thread the sync parts of async views run in,
+    so a signup spike only queues up behind itself. PBKDF2 releases the GIL,
+    the event loop keeps serving other requests meanwhile.
+    """
+    executor = get_executor(settings.ACCOUNTS_HASHING_WORKERS)
+    return await asyncio.get_running_loop().run_in_executor(executor, make_password, password)
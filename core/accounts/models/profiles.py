@@ -1,14 +1,17 @@
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from core.images import ImageVariantsMixin
 from .users import User
 
 
-class Profile(models.Model):
+class Profile(ImageVariantsMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=250)
     last_name = models.CharField(max_length=250)
     image = models.ImageField(upload_to="profile_images/", null=True, blank=True)
+    # resized copies of the image, written by accounts.tasks.generate_profile_image_variants
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(blank=True)
 
     created_date = models.DateTimeField(auto_now_add=True)
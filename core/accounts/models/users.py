@@ -74,6 +74,8 @@ class UsedToken(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     token_jti = models.CharField(max_length=255, unique=True)  # JTI (JWT ID)
     created_at = models.DateTimeField(auto_now_add=True)
+    # when the token expires, the row is pruned after that by prune_used_tokens
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"Used token {self.token_jti} for {self.user.email}"
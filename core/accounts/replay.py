@@ -0,0 +1,237 @@
+import hashlib
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.utils import timezone as django_timezone
+from django.utils.module_loading import import_string
+
+from .models import UsedToken
+
+REBUILD_CHUNK_SIZE = 10000
+# rows recorded this long before a rebuild started are added again once it's done
+REBUILD_OVERLAP = timedelta(minutes=1)
+# seconds a rebuild may hold the lock before another process can take over
+REBUILD_LOCK_TIMEOUT = 600
+
+
+class BaseReplayFilter:
+    """
+    Bloom filter over the JTIs recorded in ``UsedToken``.
+
+    ``might_contain`` never answers False for a recorded JTI, so the table only
+    has to be queried when it answers True. Rows can't be taken out of a bloom
+    filter, so it is rebuilt from the table after pruning, and whenever it
+    doesn't exist (yet).
+    """
+
+    def __init__(self, capacity=None, error_rate=None):
+        capacity = capacity or settings.ACCOUNTS_REPLAY_FILTER_CAPACITY
+        error_rate = error_rate or settings.ACCOUNTS_REPLAY_FILTER_ERROR_RATE
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+
+    def positions(self, jti):
+        digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, *jtis):
+        raise NotImplementedError
+
+    def might_contain(self, jti):
+        raise NotImplementedError
+
+    def replace(self, jtis):
+        """
+        Swap the filter for one holding exactly ``jtis``.
+        """
+        raise NotImplementedError
+
+    def is_built(self):
+        raise NotImplementedError
+
+    def rebuild(self, only_if_missing=False):
+        """
+        Replace the filter with one holding every JTI in the table, return
+        whether it was rebuilt.
+        """
+        if only_if_missing and self.is_built():
+            return False
+        started = django_timezone.now()
+        self.replace(
+            UsedToken.objects.values_list("token_jti", flat=True).iterator(
+                chunk_size=REBUILD_CHUNK_SIZE
+            )
+        )
+        # tokens used while the new filter was filled may only be in the old one
+        self.add(
+            *UsedToken.objects.filter(created_at__gte=started - REBUILD_OVERLAP).values_list(
+                "token_jti", flat=True
+            )
+        )
+        return True
+
+    @staticmethod
+    def chunked(jtis):
+        chunk = []
+        for jti in jtis:
+            chunk.append(jti)
+            if len(chunk) == REBUILD_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class RedisReplayFilter(BaseReplayFilter):
+    """
+    Keeps the bits in a Redis string on the connection of the ``default`` cache,
+    shared by every web process. A lookup is a single BITFIELD command.
+
+    A rebuild also sets the bit just past the filter, which every lookup reads
+    along with the JTI's bits. A filter lost to a restart, a flush or an
+    eviction, or recreated by an ``add`` since, lacks it and isn't trusted
+    until it has been rebuilt.
+    """
+
+    alias = "default"
+    key = "accounts:used-jti-filter"
+
+    @property
+    def client(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection(self.alias)
+
+    def is_built(self):
+        return bool(self.client.getbit(self.key, self.size))
+
+    def request_rebuild(self):
+        from .tasks import rebuild_replay_filter
+
+        # one lookup queues the rebuild, the others keep asking the database meanwhile
+        if self.client.set(f"{self.key}:requested", 1, nx=True, ex=REBUILD_LOCK_TIMEOUT):
+            rebuild_replay_filter.delay()
+
+    def rebuild(self, only_if_missing=False):
+        """
+        Rebuild under a lock shared with every other process, return False
+        when another rebuild is already running.
+        """
+        client = self.client
+        if not client.set(f"{self.key}:building", 1, nx=True, ex=REBUILD_LOCK_TIMEOUT):
+            return False
+        try:
+            return super().rebuild(only_if_missing)
+        finally:
+            client.delete(f"{self.key}:building", f"{self.key}:requested")
+
+    def _set_bits(self, key, jtis, pipe):
+        for jti in jtis:
+            bitfield = pipe.bitfield(key)
+            for position in self.positions(jti):
+                bitfield.set("u1", position, 1)
+            bitfield.execute()
+
+    def add(self, *jtis):
+        if jtis:
+            pipe = self.client.pipeline(transaction=False)
+            self._set_bits(self.key, jtis, pipe)
+            pipe.execute()
+
+    def might_contain(self, jti):
+        bitfield = self.client.bitfield(self.key)
+        for position in [*self.positions(jti), self.size]:
+            bitfield.get("u1", position)
+        *bits, built = bitfield.execute()
+        if not built:
+            self.request_rebuild()
+            return True
+        return all(bits)
+
+    def replace(self, jtis):
+        client = self.client
+        building_key = f"{self.key}:rebuild"
+        client.delete(building_key)
+        # allocates the whole string up front and marks the filter as built
+        client.setbit(building_key, self.size, 1)
+        for chunk in self.chunked(jtis):
+            pipe = client.pipeline(transaction=False)
+            self._set_bits(building_key, chunk, pipe)
+            pipe.execute()
+        client.rename(building_key, self.key)
+
+
+class LocMemReplayFilter(BaseReplayFilter):
+    """
+    In-process filter for development and tests, built on first use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._bits = None
+
+    def _set_bits(self, bits, jtis):
+        for jti in jtis:
+            for position in self.positions(jti):
+                bits[position >> 3] |= 1 << (position & 7)
+
+    def is_built(self):
+        return self._bits is not None
+
+    def _get_bits(self):
+        if self._bits is None:
+            self.rebuild()
+        return self._bits
+
+    def add(self, *jtis):
+        bits = self._get_bits()
+        with self._lock:
+            self._set_bits(bits, jtis)
+
+    def might_contain(self, jti):
+        bits = self._get_bits()
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.positions(jti))
+
+    def replace(self, jtis):
+        bits = bytearray((self.size + 7) // 8)
+        for chunk in self.chunked(jtis):
+            self._set_bits(bits, chunk)
+        self._bits = bits
+
+
+_filters = {}
+
+
+def get_replay_filter():
+    """
+    Return the filter configured by ``settings.ACCOUNTS_REPLAY_FILTER``.
+    """
+    path = settings.ACCOUNTS_REPLAY_FILTER
+    if path not in _filters:
+        _filters[path] = import_string(path)()
+    return _filters[path]
+
+
+def is_token_used(jti):
+    """
+    Return whether a token with the given JTI has been used already.
+    """
+    if not get_replay_filter().might_contain(jti):
+        return False
+    return UsedToken.objects.filter(token_jti=jti).exists()
+
+
+def record_used_token(user, payload):
+    """
+    Record the token with the given (decoded) payload as used. The row is kept
+    until the token expires, after that the token is rejected anyway.
+    """
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        expires_at = datetime.fromtimestamp(expires_at, tz=timezone.utc)
+    # accounts.signals adds the JTI to the filter
+    return UsedToken.objects.create(user=user, token_jti=payload["jti"], expires_at=expires_at)
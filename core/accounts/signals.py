@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.images import needs_variants
+from .models import Profile, User, UsedToken
+from .api.authentication import credentials_key, forget_jti, user_key
+from .replay import get_replay_filter
+from .tasks import generate_profile_image_variants
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def expire_cached_user(sender, instance, **kwargs):
+    # password, is_active and friends may have changed
+    cache.delete(user_key(instance.pk))
+
+
+@receiver(post_save, sender=UsedToken)
+def revoke_used_token(sender, instance, created, **kwargs):
+    if created:
+        get_replay_filter().add(instance.token_jti)
+    forget_jti(instance.token_jti)
+
+
+@receiver(post_delete, sender=Token)
+def expire_cached_token(sender, instance, **kwargs):
+    cache.delete(credentials_key("token", instance.key))
+
+
+@receiver(post_save, sender=Profile)
+def schedule_image_variants(sender, instance, **kwargs):
+    # resizing takes a while, the request that uploaded the image doesn't wait
+    if needs_variants(instance):
+        transaction.on_commit(lambda: generate_profile_image_variants.delay(instance.pk))
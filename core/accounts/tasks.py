@@ -1,6 +1,106 @@
+import logging
+from collections import deque
+
 from celery import shared_task
+from celery.signals import worker_process_init
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from core.buffers import get_buffer
+from core.images import update_image_variants
+from .emails import EMAIL_BUFFER, preload_email_templates, render_email
+from .models import Profile, UsedToken
+from .replay import get_replay_filter
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
 def send_email(email_obj):
-    email_obj.send()
\ No newline at end of file
+    email_obj.send()
+
+
+@worker_process_init.connect
+def load_email_templates(**kwargs):
+    preload_email_templates()
+
+
+@shared_task
+def send_queued_emails(batch_size=None):
+    """
+    Render and send the emails queued by ``accounts.emails.queue_email`` over a
+    single SMTP connection, ``batch_size`` of them at a time, until the queue is
+    empty. A failed email is queued again until it has been tried
+    ``EMAIL_MAX_ATTEMPTS`` times.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    email_buffer = get_buffer(EMAIL_BUFFER)
+    pending = deque(email_buffer.pop_many(batch_size))
+    if not pending:
+        return 0
+
+    sent = 0
+    retry = []
+    connection = get_connection()
+    try:
+        connection.open()
+        while pending:
+            template_name, context, recipient, attempts = pending.popleft()
+            try:
+                connection.send_messages([render_email(template_name, context, recipient)])
+                sent += 1
+            except Exception:
+                logger.exception("Sending %s to %s failed", template_name, recipient)
+                if attempts + 1 < settings.EMAIL_MAX_ATTEMPTS:
+                    retry.append((template_name, context, recipient, attempts + 1))
+                # the server may have hung up, carry on over a new connection
+                connection.close()
+                connection.open()
+            if not pending:
+                pending.extend(email_buffer.pop_many(batch_size))
+    finally:
+        connection.close()
+        # emails that weren't tried yet keep their attempt count
+        email_buffer.push(*retry, *pending)
+    return sent
+
+@shared_task
+def prune_used_tokens():
+    """
+    Delete the used tokens that have expired, they can't be replayed anymore,
+    and rebuild the replay filter without them.
+    """
+    now = timezone.now()
+    expired = Q(expires_at__lt=now) | Q(
+        # recorded before expires_at existed, access tokens never outlive their lifetime
+        expires_at__isnull=True,
+        created_at__lt=now - api_settings.ACCESS_TOKEN_LIFETIME,
+    )
+    deleted, _ = UsedToken.objects.filter(expired).delete()
+    if deleted:
+        # skipped while another rebuild runs, the pruned JTIs it may still add
+        # only cost a query until the next prune
+        get_replay_filter().rebuild()
+    return deleted
+
+
+@shared_task
+def rebuild_replay_filter():
+    """
+    Rebuild the replay filter when it has gone missing, lookups ask the
+    database until it's done.
+    """
+    return get_replay_filter().rebuild(only_if_missing=True)
+
+
+@shared_task
+def generate_profile_image_variants(profile_id):
+    """
+    Generate the resized variants of the image of a profile. Does nothing when
+    the stored ones belong to its current image.
+    """
+    profile = Profile.objects.filter(pk=profile_id).only("id", "image", "image_variants").first()
+    return profile is not None and update_image_variants(profile)
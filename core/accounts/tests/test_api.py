@@ -1,9 +1,16 @@
 import pytest
+import threading
+from unittest.mock import patch
 from rest_framework.test import APIClient
-from django.urls import reverse
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.hashers import make_password
+from django.test import AsyncClient
+from django.urls import resolve, reverse
 from django.utils import timezone
 from blog.models import Post, Category
 from accounts.models import User, Profile
+from accounts.emails import EMAIL_BUFFER
+from core.buffers import get_buffer
 
 @pytest.fixture
 def api_client():
@@ -109,3 +116,90 @@ class TestCategoryModelViewSet:
         data = {"name": "New Category"}
         response = api_client.post(url, data)
         assert response.status_code == 401
+
+@pytest.mark.django_db
+class TestRegistrationApiView:
+    url = reverse("accounts:api-v1:registration")
+
+    def test_registration(self, api_client):
+        data = {"email": "New@Example.com", "password": "a-Strong-pass123", "password1": "a-Strong-pass123"}
+        response = api_client.post(self.url, data)
+        assert response.status_code == 201
+        assert response.data == {"email": "New@example.com"}
+        user = User.objects.get(email="New@example.com")
+        assert user.check_password("a-Strong-pass123")
+        assert Profile.objects.filter(user=user).exists()
+
+    def test_registration_hashes_the_validated_password(self, api_client):
+        data = {"email": "new@example.com", "password": " a-Strong-pass123 ", "password1": " a-Strong-pass123 "}
+        response = api_client.post(self.url, data)
+        assert response.status_code == 201
+        # the serializer field trims the password
+        assert User.objects.get(email="new@example.com").check_password("a-Strong-pass123")
+
+    def test_registration_with_weak_password(self, api_client):
+        data = {"email": "new@example.com", "password": "123", "password1": "123"}
+        with patch("django.contrib.auth.base_user.make_password") as make_password:
+            response = api_client.post(self.url, data)
+        make_password.assert_not_called()
+        assert response.status_code == 400
+        assert "non_field_errors" in response.data
+        assert not User.objects.filter(email="new@example.com").exists()
+
+    def test_registration_with_taken_email(self, api_client, create_user):
+        create_user(email="taken@example.com")
+        data = {"email": "taken@example.com", "password": "a-Strong-pass123", "password1": "a-Strong-pass123"}
+        with patch("django.contrib.auth.base_user.make_password") as make_password:
+            response = api_client.post(self.url, data)
+        make_password.assert_not_called()
+        assert response.status_code == 400
+        assert "email" in response.data
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("async_views")
+class TestAsyncRegistrationApiView:
+    url = reverse("accounts:api-v1:registration")
+
+    def post(self, data):
+        return async_to_sync(AsyncClient().post)(self.url, data, content_type="application/json")
+
+    def test_url_uses_async_view(self):
+        assert iscoroutinefunction(resolve(self.url).func)
+
+    def test_registration(self):
+        threads = []
+
+        def hash_password(password):
+            threads.append(threading.current_thread().name)
+            return make_password(password)
+
+        data = {"email": "new@example.com", "password": " a-Strong-pass123 ", "password1": " a-Strong-pass123 "}
+        with patch("accounts.hashing.make_password", wraps=hash_password) as hasher:
+            response = self.post(data)
+        assert response.status_code == 201
+        assert response.json() == {"email": "new@example.com"}
+        # the validated password, hashed in the pool
+        hasher.assert_called_once_with("a-Strong-pass123")
+        assert threads[0].startswith("password-hashing")
+        user = User.objects.get(email="new@example.com")
+        assert user.check_password("a-Strong-pass123")
+        assert Profile.objects.filter(user=user).exists()
+        assert len(get_buffer(EMAIL_BUFFER)) == 1
+
+    def test_registration_with_weak_password(self):
+        data = {"email": "new@example.com", "password": "123", "password1": "123"}
+        with patch("accounts.hashing.make_password") as hasher:
+            response = self.post(data)
+        hasher.assert_not_called()
+        assert response.status_code == 400
+        assert "non_field_errors" in response.json()
+        assert not User.objects.filter(email="new@example.com").exists()
+
+    def test_registration_when_logged_in(self, create_user):
+        create_user(email="user@example.com")
+        client = AsyncClient()
+        async_to_sync(client.aforce_login)(User.objects.get(email="user@example.com"))
+        data = {"email": "new@example.com", "password": "a-Strong-pass123", "password1": "a-Strong-pass123"}
+        response = async_to_sync(client.post)(self.url, data, content_type="application/json")
+        assert response.status_code == 403
+
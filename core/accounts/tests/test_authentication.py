@@ -0,0 +1,96 @@
+import base64
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from accounts.api.utils import get_tokens_for_user_util
+from accounts.models import UsedToken
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        user = django_user_model.objects.create_user(**kwargs)
+        user.is_verified = True
+        user.save()
+        return user
+    return make_user
+
+@pytest.fixture
+def user(create_user):
+    return create_user(email='test@example.com')
+
+def basic(email, password):
+    return "Basic " + base64.b64encode(f"{email}:{password}".encode()).decode()
+
+def account_queries(queries):
+    tables = ("accounts_user", "authtoken_token", "accounts_usedtoken")
+    return [q for q in queries if any(table in q["sql"] for table in tables)]
+
+@pytest.mark.django_db
+class TestAPIAuthentication:
+    url = reverse("blog:api-v1:category-list")
+
+    @pytest.mark.parametrize("scheme", ["jwt", "token", "basic"])
+    def test_repeat_requests_do_not_query_accounts(self, api_client, user, scheme):
+        if scheme == "jwt":
+            header = f"Bearer {get_tokens_for_user_util(user)}"
+        elif scheme == "token":
+            header = f"Token {Token.objects.create(user=user).key}"
+        else:
+            header = basic(user.email, "password123")
+        api_client.credentials(HTTP_AUTHORIZATION=header)
+        assert api_client.get(self.url).status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get(self.url).status_code == 200
+        assert account_queries(queries) == []
+
+    def test_unauthenticated_request_gets_basic_challenge(self, api_client):
+        response = api_client.get(self.url)
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"] == 'Basic realm="api"'
+
+    def test_wrong_password(self, api_client, user):
+        api_client.credentials(HTTP_AUTHORIZATION=basic(user.email, "wrong"))
+        assert api_client.get(self.url).status_code == 401
+
+    def test_password_change_invalidates_basic_credentials(self, api_client, user):
+        api_client.credentials(HTTP_AUTHORIZATION=basic(user.email, "password123"))
+        assert api_client.get(self.url).status_code == 200
+        user.set_password("new-password123")
+        user.save()
+        assert api_client.get(self.url).status_code == 401
+
+    def test_used_token_is_revoked(self, api_client, user):
+        token = get_tokens_for_user_util(user)
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert api_client.get(self.url).status_code == 200
+        jti = api_client.get(self.url).wsgi_request.auth["jti"]
+        UsedToken.objects.create(user=user, token_jti=jti)
+        assert api_client.get(self.url).status_code == 401
+
+    def test_inactive_user_is_rejected(self, api_client, user):
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user_util(user)}")
+        assert api_client.get(self.url).status_code == 200
+        user.is_active = False
+        user.save()
+        assert api_client.get(self.url).status_code == 401
+
+    def test_logout_invalidates_auth_token(self, api_client, user):
+        token = Token.objects.create(user=user)
+        api_client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        assert api_client.get(self.url).status_code == 200
+        token.delete()
+        assert api_client.get(self.url).status_code == 401
+
+    def test_session(self, api_client, user):
+        api_client.force_login(user)
+        assert api_client.get(self.url).status_code == 200
@@ -0,0 +1,33 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts import emails
+from accounts.emails import get_email_template, preload_email_templates, render_email
+
+
+class TestEmailTemplates:
+    def test_templates_are_compiled_once(self, monkeypatch):
+        get_email_template.cache_clear()
+        loaded = []
+        get_template = emails.get_template
+        monkeypatch.setattr(emails, "get_template", lambda name: loaded.append(name) or get_template(name))
+
+        preload_email_templates()
+        first = render_email("email/activation_email.tpl", {"token": "first"}, "first@example.com")
+        second = render_email("email/activation_email.tpl", {"token": "second"}, "second@example.com")
+
+        assert sorted(loaded) == ["email/activation_email.tpl", "email/reset_password.tpl"]
+        assert "first" in first.body and "second" in second.body
+        assert first.subject == second.subject == "Confirmation Email"
+
+    @pytest.mark.django_db
+    def test_registration_does_not_render_templates(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("template loaded in the request")
+
+        monkeypatch.setattr(emails, "get_template", fail)
+        monkeypatch.setattr("mail_templated.message.get_template", fail)
+        get_email_template.cache_clear()
+        url = reverse("accounts:api-v1:registration")
+        data = {"email": "new@example.com", "password": "a-Strong-pass123", "password1": "a-Strong-pass123"}
+        assert APIClient().post(url, data).status_code == 201
@@ -0,0 +1,119 @@
+import fakeredis
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.api.utils import get_tokens_for_user_util
+from accounts.models import UsedToken
+from accounts.replay import LocMemReplayFilter, RedisReplayFilter, get_replay_filter, is_token_used
+from accounts.tasks import prune_used_tokens, rebuild_replay_filter
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def user(create_user):
+    return create_user(email='test@example.com')
+
+@pytest.mark.django_db
+class TestReplayFilter:
+    def test_filter_is_built_from_the_table(self, user):
+        UsedToken.objects.create(user=user, token_jti="recorded")
+        replay_filter = LocMemReplayFilter(capacity=1000)
+        assert replay_filter.might_contain("recorded")
+        assert not replay_filter.might_contain("unknown")
+
+    def test_recording_a_token_adds_it(self, user):
+        assert not is_token_used("jti")
+        UsedToken.objects.create(user=user, token_jti="jti")
+        assert get_replay_filter().might_contain("jti")
+        assert is_token_used("jti")
+
+    def test_unused_token_does_not_query_the_table(self, user):
+        get_replay_filter().might_contain("warm-up")
+        with CaptureQueriesContext(connection) as queries:
+            assert not is_token_used("unknown")
+        assert len(queries) == 0
+
+    def test_activation_link_cannot_be_replayed(self, api_client, user):
+        url = reverse("accounts:api-v1:activation", kwargs={"token": get_tokens_for_user_util(user)})
+        assert api_client.get(url).status_code == 200
+        used = UsedToken.objects.get(user=user)
+        assert used.expires_at > timezone.now()
+        user.is_verified = False
+        user.save()
+        response = api_client.get(url)
+        assert response.status_code == 400
+        assert response.data["detail"] == "This activation link has already been used."
+
+    def test_prune_used_tokens(self, user):
+        now = timezone.now()
+        UsedToken.objects.create(user=user, token_jti="expired", expires_at=now - timedelta(minutes=1))
+        UsedToken.objects.create(user=user, token_jti="valid", expires_at=now + timedelta(minutes=1))
+        legacy = UsedToken.objects.create(user=user, token_jti="legacy")
+        UsedToken.objects.filter(pk=legacy.pk).update(created_at=now - timedelta(days=1))
+
+        assert prune_used_tokens() == 2
+        assert list(UsedToken.objects.values_list("token_jti", flat=True)) == ["valid"]
+        assert not get_replay_filter().might_contain("expired")
+        assert get_replay_filter().might_contain("valid")
+
+
+@pytest.fixture
+def rebuild_delay():
+    with patch("accounts.tasks.rebuild_replay_filter.delay") as delay:
+        yield delay
+
+@pytest.fixture
+def redis_filter(settings, rebuild_delay):
+    settings.ACCOUNTS_REPLAY_FILTER = "accounts.replay.RedisReplayFilter"
+    settings.ACCOUNTS_REPLAY_FILTER_CAPACITY = 1000
+    with patch.object(RedisReplayFilter, "client", fakeredis.FakeRedis()):
+        yield get_replay_filter()
+
+
+@pytest.mark.django_db
+class TestRedisReplayFilter:
+    def test_used_token_is_rejected_after_the_filter_is_lost(self, redis_filter, rebuild_delay, user):
+        UsedToken.objects.create(user=user, token_jti="used")
+        assert redis_filter.rebuild()
+        assert not is_token_used("unknown")
+
+        redis_filter.client.delete(redis_filter.key)
+        assert is_token_used("used")
+        # recreating the key with the next JTI doesn't make it trusted again
+        UsedToken.objects.create(user=user, token_jti="next")
+        assert is_token_used("used")
+        rebuild_delay.assert_called_once_with()
+
+        assert rebuild_replay_filter()
+        assert redis_filter.might_contain("used")
+        assert redis_filter.might_contain("next")
+        with CaptureQueriesContext(connection) as queries:
+            assert not is_token_used("unknown")
+        assert len(queries) == 0
+
+    def test_rebuild_only_if_missing(self, redis_filter):
+        assert rebuild_replay_filter()
+        assert not rebuild_replay_filter()
+
+    def test_prune_skips_the_rebuild_while_another_runs(self, redis_filter, user):
+        UsedToken.objects.create(user=user, token_jti="expired", expires_at=timezone.now() - timedelta(minutes=1))
+        redis_filter.client.set(f"{redis_filter.key}:building", 1)
+        with patch.object(RedisReplayFilter, "replace") as replace:
+            assert prune_used_tokens() == 1
+        replace.assert_not_called()
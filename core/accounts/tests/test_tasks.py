@@ -0,0 +1,109 @@
+import io
+import pytest
+from unittest.mock import patch
+from PIL import Image
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.emails import EMAIL_BUFFER, queue_email
+from accounts.models import Profile
+from accounts.tasks import generate_profile_image_variants, send_queued_emails
+from core.buffers import get_buffer
+
+
+class FlakyBackend(EmailBackend):
+    """
+    Fails to send to flaky@example.com and counts the connections it opens.
+    """
+
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any("flaky@example.com" in message.to for message in messages):
+            raise ConnectionError("connection reset")
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def flaky_backend(settings):
+    settings.EMAIL_BACKEND = "accounts.tests.test_tasks.FlakyBackend"
+    FlakyBackend.opened = 0
+    return FlakyBackend
+
+
+class TestSendQueuedEmails:
+    def test_send_queued_emails(self):
+        for i in range(5):
+            queue_email("email/activation_email.tpl", {"token": f"token-{i}"}, f"user{i}@example.com")
+
+        assert send_queued_emails(batch_size=2) == 5
+        assert len(mail.outbox) == 5
+        message = mail.outbox[0]
+        assert message.subject == "Confirmation Email"
+        assert message.to == ["user0@example.com"]
+        assert "token-0" in message.body
+        assert len(get_buffer(EMAIL_BUFFER)) == 0
+
+    def test_send_queued_emails_without_emails(self, flaky_backend):
+        assert send_queued_emails() == 0
+        assert flaky_backend.opened == 0
+
+    def test_failed_emails_are_retried(self, settings, flaky_backend):
+        settings.EMAIL_MAX_ATTEMPTS = 2
+        queue_email("email/reset_password.tpl", {"token": "a"}, "first@example.com")
+        queue_email("email/reset_password.tpl", {"token": "b"}, "flaky@example.com")
+        queue_email("email/reset_password.tpl", {"token": "c"}, "last@example.com")
+
+        assert send_queued_emails() == 2
+        assert [message.to for message in mail.outbox] == [["first@example.com"], ["last@example.com"]]
+        # one connection, and a new one after the failure
+        assert flaky_backend.opened == 2
+        assert len(get_buffer(EMAIL_BUFFER)) == 1
+
+        # the second failure is the last attempt
+        assert send_queued_emails() == 0
+        assert len(get_buffer(EMAIL_BUFFER)) == 0
+
+
+@pytest.mark.django_db
+class TestRegistrationEmail:
+    def test_registration_queues_activation_email(self):
+        url = reverse("accounts:api-v1:registration")
+        data = {"email": "new@example.com", "password": "a-Strong-pass123", "password1": "a-Strong-pass123"}
+        response = APIClient().post(url, data)
+        assert response.status_code == 201
+        assert len(mail.outbox) == 0
+
+        assert send_queued_emails() == 1
+        assert mail.outbox[0].to == ["new@example.com"]
+
+
+@pytest.mark.django_db
+class TestGenerateProfileImageVariants:
+    @patch("accounts.signals.generate_profile_image_variants.delay")
+    def test_generate_profile_image_variants(self, mock_delay, django_user_model, settings, tmp_path, django_capture_on_commit_callbacks):
+        settings.MEDIA_ROOT = tmp_path
+        settings.IMAGE_VARIANT_WIDTHS = [320, 640, 1280]
+        user = django_user_model.objects.create_user(email="test@example.com", password="password123")
+        profile = Profile.objects.get(user=user)
+        buffer = io.BytesIO()
+        Image.new("RGBA", (500, 500), (0, 0, 0, 0)).save(buffer, "PNG")
+        with django_capture_on_commit_callbacks(execute=True):
+            profile.image.save("me.png", ContentFile(buffer.getvalue()), save=True)
+        mock_delay.assert_called_once_with(profile.pk)
+
+        assert generate_profile_image_variants(profile.pk)
+        profile.refresh_from_db()
+        assert profile.image_srcsets == {
+            "webp": "/media/variants/profile_images/me.png/320w.webp 320w",
+            "jpeg": "/media/variants/profile_images/me.png/320w.jpeg 320w",
+        }
+        # transparency becomes white in JPEG
+        with Image.open(tmp_path / "variants/profile_images/me.png/320w.jpeg") as image:
+            assert image.getpixel((0, 0)) == (255, 255, 255)
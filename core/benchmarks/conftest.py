@@ -0,0 +1,113 @@
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# timed requests per endpoint, after one warm up request
+ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", 30))
+# size of the data the endpoint benchmarks run against
+DATASET = {
+    "users": int(os.environ.get("BENCHMARK_USERS", 20)),
+    "posts": int(os.environ.get("BENCHMARK_POSTS", 1000)),
+    "comments": int(os.environ.get("BENCHMARK_COMMENTS", 5)),
+}
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    Put a SQLite test database in a file. In memory, a connection writing
+    while another one does raises "database table is locked" instead of
+    waiting for it, which breaks the benchmarks sending concurrent requests.
+    """
+    for alias, database in settings.DATABASES.items():
+        if database["ENGINE"] == "django.db.backends.sqlite3":
+            name = os.path.join(tempfile.gettempdir(), f"django-blog-benchmarks-{alias}.sqlite3")
+            database.setdefault("TEST", {})["NAME"] = name
+
+
+def percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)]
+
+
+class EndpointBenchmarks:
+    """
+    Collects the latency percentiles and query counts of the endpoint
+    benchmarks and compares them with the results of an earlier run.
+    """
+
+    def __init__(self, baseline=None, tolerance=0.5):
+        self.baseline = baseline or {}
+        self.tolerance = tolerance
+        self.results = {}
+
+    def measure(self, name, request, status=200, rounds=ROUNDS, setup=None):
+        """
+        Time ``rounds`` calls of ``request``, a function sending one request
+        with the test client and returning the response. ``setup`` is called
+        untimed before each of them.
+        """
+        assert request().status_code == status
+        timings, queries = [], []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == status
+            queries.append(len(captured))
+        result = {
+            "rounds": rounds,
+            "mean_ms": round(statistics.mean(timings), 3),
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "queries": max(queries),
+        }
+        self.results[name] = result
+        print(f"\n{name}: p50 {result['p50_ms']}ms, p95 {result['p95_ms']}ms, {result['queries']} queries")
+
+        regressions = self.regressions(name, result)
+        if regressions:
+            pytest.fail(f"{name} regressed: " + ", ".join(regressions), pytrace=False)
+        return result
+
+    def regressions(self, name, result):
+        previous = self.baseline.get("results", {}).get(name)
+        if previous is None:
+            return []
+        regressions = []
+        # the median, the tail of a few dozen rounds is mostly noise
+        if result["p50_ms"] > previous["p50_ms"] * (1 + self.tolerance):
+            regressions.append(f"p50 {previous['p50_ms']}ms -> {result['p50_ms']}ms")
+        # more queries is a regression whatever the machine
+        if result["queries"] > previous["queries"]:
+            regressions.append(f"{previous['queries']} -> {result['queries']} queries")
+        return regressions
+
+    def dump(self, path, dataset):
+        with open(path, "w") as file:
+            json.dump({"database": connection.vendor, "dataset": dataset, "results": self.results}, file, indent=2)
+
+
+@pytest.fixture(scope="session")
+def endpoint_benchmarks(request):
+    config = request.config
+    baseline = None
+    if config.getoption("--benchmark-baseline"):
+        with open(config.getoption("--benchmark-baseline")) as file:
+            baseline = json.load(file)
+    benchmarks = EndpointBenchmarks(baseline, config.getoption("--benchmark-tolerance"))
+    yield benchmarks
+    if config.getoption("--benchmark-json") and benchmarks.results:
+        benchmarks.dump(config.getoption("--benchmark-json"), DATASET)
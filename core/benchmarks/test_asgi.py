@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.test import AsyncRequestFactory, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from blog.models import Post, Category
+from accounts.models import Profile
+
+# clients connecting evenly over RAMP_SECONDS, each uploading its comment in
+# CHUNKS pieces over UPLOAD_SECONDS, so about 150 of them are connected at once
+CLIENTS = 300
+RAMP_SECONDS = 6.0
+CHUNKS = 10
+UPLOAD_SECONDS = 3.0
+# threads of a gthread worker in the WSGI runs that don't get one thread per client
+WSGI_THREADS = 16
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def comment_body(django_user_model, settings):
+    # the comment is queued, the benchmark measures the web side only
+    settings.COMMENT_BATCH_INGESTION = True
+    user = django_user_model.objects.create_user(email="bench@example.com", password="password123")
+    # bulk_create skips the receivers, committing would queue celery tasks
+    (post,) = Post.objects.bulk_create([
+        Post(
+            author=Profile.objects.get(user=user),
+            title="Benchmark Post",
+            slug="benchmark-post",
+            content="Lorem ipsum dolor sit amet.",
+            status=True,
+            category=Category.objects.create(name="Benchmark"),
+            published_date=timezone.now(),
+        )
+    ])
+    data = {"post": post.pk, "name": "Reader", "email": "reader@example.com", "message": "Nice post. " * 20}
+    return json.dumps(data).encode()
+
+
+def start_times():
+    return [index * RAMP_SECONDS / CLIENTS for index in range(CLIENTS)]
+
+
+def chunks(body):
+    size = -(-len(body) // CHUNKS)
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class PeakThreads:
+    """
+    Samples the number of live threads until the block exits.
+    """
+
+    def __enter__(self):
+        self.baseline = threading.active_count()
+        self.peak = self.baseline
+        self.done = threading.Event()
+        self.sampler = threading.Thread(target=self.sample)
+        self.sampler.start()
+        return self
+
+    def sample(self):
+        while not self.done.wait(0.005):
+            self.peak = max(self.peak, threading.active_count() - 1)
+
+    def __exit__(self, *exc_info):
+        self.done.set()
+        self.sampler.join()
+
+    @property
+    def added(self):
+        return self.peak - self.baseline
+
+
+class SlowInput:
+    """
+    ``wsgi.input`` of a client sending its body slowly, the reading thread
+    blocks like it would on the socket.
+    """
+
+    def __init__(self, body):
+        self.pieces = chunks(body)
+
+    def read(self, size=-1):
+        data = b""
+        while self.pieces and (size < 0 or len(data) < size):
+            time.sleep(UPLOAD_SECONDS / CHUNKS)
+            data += self.pieces.pop(0)
+        return data
+
+    # only read() is used for a JSON body
+    readline = read
+
+
+def run_wsgi(body, threads):
+    application = get_wsgi_application()
+    url = reverse("comment:api-v1:create")
+
+    def request():
+        environ = RequestFactory().generic("POST", url, body, "application/json").environ
+        environ["wsgi.input"] = SlowInput(body)
+        statuses = []
+        response = application(environ, lambda status, headers: statuses.append(status))
+        b"".join(response)
+        response.close()
+        return statuses[0]
+
+    with PeakThreads() as peak:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            futures = []
+            for start in start_times():
+                time.sleep(max(0, started + start - time.perf_counter()))
+                futures.append(executor.submit(request))
+            statuses = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+    assert set(statuses) == {"202 Accepted"}
+    return elapsed, peak.added
+
+
+def run_asgi(body):
+    application = get_asgi_application()
+    url = reverse("comment:api-v1:create")
+
+    async def request(start):
+        await asyncio.sleep(start)
+        scope = AsyncRequestFactory().generic("POST", url, body, "application/json").scope
+        pieces = chunks(body)
+        statuses = []
+
+        async def receive():
+            if not pieces:
+                # the client keeps the connection open, Django waits for a disconnect
+                await asyncio.Event().wait()
+            await asyncio.sleep(UPLOAD_SECONDS / CHUNKS)
+            piece = pieces.pop(0)
+            return {"type": "http.request", "body": piece, "more_body": bool(pieces)}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await application(scope, receive, send)
+        return statuses[0]
+
+    async def run():
+        return await asyncio.gather(*(request(start) for start in start_times()))
+
+    with PeakThreads() as peak:
+        started = time.perf_counter()
+        statuses = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+    assert set(statuses) == {202}
+    return elapsed, peak.added
+
+
+def report(mode, elapsed, threads):
+    print(f"{mode}: {CLIENTS / elapsed:.1f} requests/sec, {elapsed:.2f}s, peak {threads} extra threads")
+
+
+def test_slow_clients_wsgi(comment_body):
+    print(f"\n{CLIENTS} clients in {RAMP_SECONDS}s uploading a comment over {UPLOAD_SECONDS}s each")
+    report(f"wsgi, {WSGI_THREADS} threads", *run_wsgi(comment_body, WSGI_THREADS))
+    report(f"wsgi, {CLIENTS} threads", *run_wsgi(comment_body, CLIENTS))
+
+
+def test_slow_clients_asgi(comment_body, async_views):
+    print(f"\n{CLIENTS} clients in {RAMP_SECONDS}s uploading a comment over {UPLOAD_SECONDS}s each")
+    report("asgi", *run_asgi(comment_body))
@@ -0,0 +1,122 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from blog.cache import bump_generation
+from blog.models import Post
+from accounts.models import Profile
+from .conftest import DATASET
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    """
+    Seed the benchmark data once for the module, outside the transaction of
+    every test, and flush it afterwards.
+    """
+    with django_db_blocker.unblock(), override_settings(CACHES=LOCMEM_CACHES):
+        call_command(
+            "add_dummy_data",
+            "--users", str(DATASET["users"]),
+            "--posts", str(DATASET["posts"]),
+            "--comments", str(DATASET["comments"]),
+            "--seed", "1",
+            stdout=StringIO(),
+        )
+        post = Post.objects.filter(status=True).order_by("id").first()
+        author = Profile.objects.annotate(posts=Count("post")).order_by("-posts").first()
+        yield {
+            "post": post,
+            "author": author,
+            "category": post.category_id,
+            # a word of a title, so searching finds posts
+            "word": post.title.split()[0].lower(),
+        }
+    with django_db_blocker.unblock():
+        call_command("flush", interactive=False)
+
+
+@pytest.mark.parametrize("name, params", [
+    ("home", {}),
+    ("home page 2", {"page": 2}),
+    ("home query", {"query": "word"}),
+    ("home category", {"category": "category"}),
+])
+def test_home(client, dataset, endpoint_benchmarks, name, params):
+    url = reverse("blog:home")
+    params = {key: dataset[value] if value in dataset else value for key, value in params.items()}
+    endpoint_benchmarks.measure(name, lambda: client.get(url, params))
+
+
+def test_post_detail(client, dataset, endpoint_benchmarks):
+    url = reverse("blog:post-detail", kwargs={"slug": dataset["post"].slug})
+    endpoint_benchmarks.measure("post detail", lambda: client.get(url))
+
+
+@pytest.mark.parametrize("name, params", [
+    ("post list", {}),
+    ("post list query", {"query": "word"}),
+])
+def test_post_list(client, dataset, endpoint_benchmarks, name, params):
+    client.force_login(dataset["author"].user)
+    url = reverse("blog:post-list")
+    params = {key: dataset[value] for key, value in params.items()}
+    endpoint_benchmarks.measure(name, lambda: client.get(url, params))
+
+
+@pytest.mark.parametrize("name, params", [
+    ("api post list", {}),
+    ("api post search", {"search": "word"}),
+])
+def test_post_api_list(dataset, endpoint_benchmarks, name, params):
+    client = APIClient()
+    url = reverse("blog:api-v1:post-list")
+    params = {key: dataset[value] for key, value in params.items()}
+    # a new generation every round, so the view builds the response instead of reading it from the cache
+    endpoint_benchmarks.measure(name, lambda: client.get(url, params), setup=lambda: bump_generation("posts"))
+
+
+def test_post_api_retrieve(dataset, endpoint_benchmarks):
+    client = APIClient()
+    pk = dataset["post"].pk
+    url = reverse("blog:api-v1:post-detail", kwargs={"pk": pk})
+    endpoint_benchmarks.measure("api post retrieve", lambda: client.get(url), setup=lambda: bump_generation(f"post:{pk}"))
+
+
+@pytest.mark.parametrize("name, url_name, kwargs", [
+    ("api post list, cached", "blog:api-v1:post-list", {}),
+    ("api post retrieve, cached", "blog:api-v1:post-detail", {"pk": "post"}),
+])
+def test_post_api_cached(dataset, endpoint_benchmarks, name, url_name, kwargs):
+    # anonymous responses answered from the response cache filled by the warm up request
+    client = APIClient()
+    url = reverse(url_name, kwargs={key: dataset[value].pk for key, value in kwargs.items()})
+    endpoint_benchmarks.measure(name, lambda: client.get(url))
+
+
+def test_create_comment(dataset, endpoint_benchmarks, settings):
+    # queued, so no celery broker is needed
+    settings.COMMENT_BATCH_INGESTION = True
+    client = APIClient()
+    url = reverse("comment:api-v1:create")
+    data = json.dumps({"post": dataset["post"].pk, "name": "Reader", "email": "reader@example.com", "message": "Nice post."})
+    endpoint_benchmarks.measure(
+        "api create comment", lambda: client.post(url, data, content_type="application/json"), status=202
+    )
+
+
+def test_jwt_login(dataset, endpoint_benchmarks):
+    client = APIClient()
+    url = reverse("accounts:api-v1:token-create")
+    data = {"email": dataset["author"].user.email, "password": "password123"}
+    # password hashing dominates, fewer rounds are enough
+    endpoint_benchmarks.measure("api jwt login", lambda: client.post(url, data), rounds=10)
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+from django.core.asgi import get_asgi_application
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+
+# signups arriving at once on one ASGI worker
+REQUESTS = 40
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db(transaction=True)]
+
+
+def requests_per_second(prefix):
+    application = get_asgi_application()
+    url = reverse("accounts:api-v1:registration")
+
+    async def request(index):
+        body = (
+            f'{{"email": "{prefix}-{index}@example.com", '
+            '"password": "a-Strong-pass123", "password1": "a-Strong-pass123"}'
+        ).encode()
+        scope = AsyncRequestFactory().generic("POST", url, body, "application/json").scope
+        statuses = []
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            if not messages:
+                # the client keeps the connection open, Django waits for a disconnect
+                await asyncio.Event().wait()
+            return messages.pop()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await application(scope, receive, send)
+        return statuses[0]
+
+    async def run():
+        return await asyncio.gather(*(request(index) for index in range(REQUESTS)))
+
+    started = time.perf_counter()
+    statuses = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {201}
+    return REQUESTS / elapsed
+
+
+def test_registration_throughput(settings, request):
+    # the sync view, hashing in the one thread all the sync views of the worker share
+    inline = requests_per_second("inline")
+    request.getfixturevalue("async_views")
+    settings.ACCOUNTS_HASHING_WORKERS = 4
+    pooled = requests_per_second("pooled")
+    print(f"\n{REQUESTS} concurrent registrations over ASGI")
+    print(f"sync view, hashing on the request thread: {inline:.2f} requests/sec")
+    print(f"async view, hashing in a pool of 4 threads: {pooled:.2f} requests/sec ({pooled / inline:.2f}x)")
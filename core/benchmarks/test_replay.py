@@ -0,0 +1,33 @@
+import os
+import time
+import uuid
+
+import pytest
+from accounts.replay import LocMemReplayFilter
+
+# JTIs recorded in the filter, the default is what a busy site collects in a year
+JTIS = int(os.environ.get("REPLAY_BENCHMARK_JTIS", 10_000_000))
+LOOKUPS = 100_000
+ERROR_RATE = 0.001
+
+pytestmark = [pytest.mark.benchmark]
+
+
+def test_replay_filter_lookups():
+    recorded = (uuid.UUID(int=i).hex for i in range(JTIS))
+    replay_filter = LocMemReplayFilter(capacity=JTIS, error_rate=ERROR_RATE)
+    started = time.perf_counter()
+    replay_filter.replace(recorded)
+    built = time.perf_counter() - started
+
+    unknown = [uuid.uuid4().hex for _ in range(LOOKUPS)]
+    started = time.perf_counter()
+    false_positives = sum(replay_filter.might_contain(jti) for jti in unknown)
+    lookups_per_second = LOOKUPS / (time.perf_counter() - started)
+
+    step = max(1, JTIS // LOOKUPS)
+    assert all(replay_filter.might_contain(uuid.UUID(int=i).hex) for i in range(0, JTIS, step))
+    print(f"\nfilter of {JTIS:,} JTIs: {replay_filter.size / 8 / 2**20:.1f} MiB, built in {built:.1f}s")
+    print(f"lookups of unused JTIs: {lookups_per_second:,.0f}/sec, "
+          f"{false_positives / LOOKUPS:.3%} fall back to the database")
+    assert false_positives / LOOKUPS < ERROR_RATE * 2
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.request import Request
+from blog.api.v1.serializers import PostSerializer
+from blog.models import Post, Category
+from accounts.models import Profile
+
+ROWS = 100
+ROUNDS = 20
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(django_user_model):
+    user = django_user_model.objects.create_user(email="bench@example.com", password="password123")
+    profile = Profile.objects.get(user=user)
+    categories = [Category.objects.create(name=f"Category {i}") for i in range(4)]
+    Post.objects.bulk_create(
+        Post(
+            author=profile,
+            title=f"Benchmark Post {i}",
+            slug=f"benchmark-post-{i}",
+            content="Lorem ipsum dolor sit amet. " * 50,
+            status=True,
+            category=categories[i % 4],
+            image=f"post-{i}.jpg" if i % 3 else None,
+            published_date=timezone.now(),
+        )
+        for i in range(ROWS)
+    )
+    return list(Post.objects.order_by("-id"))
+
+
+@pytest.fixture
+def context():
+    request = Request(RequestFactory().get("/blog/api/v1/post/"))
+    request.parser_context = {"kwargs": {}}
+    return {"request": request}
+
+
+def rows_per_second(serialize, rows):
+    serialize()  # warm up caches
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        serialize()
+    return rows * ROUNDS / (time.perf_counter() - started)
+
+
+def test_post_list_serializer_throughput(posts, context):
+    def per_row():
+        # what PostSerializer(many=True) did before the list fast path
+        return [PostSerializer(post, context=context).data for post in posts]
+
+    def fast_path():
+        return PostSerializer(posts, many=True, context=context).data
+
+    before = rows_per_second(per_row, len(posts))
+    after = rows_per_second(fast_path, len(posts))
+    print(f"\nPostSerializer per row: {before:,.0f} rows/sec")
+    print(f"PostListSerializer:     {after:,.0f} rows/sec ({after / before:.1f}x)")
+    assert after > before
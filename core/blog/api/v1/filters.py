@@ -1,5 +1,7 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 from ...models import Post
+from ...search import get_search_backend
 
 
 class PostFilters(filters.FilterSet):
@@ -11,3 +13,16 @@ class PostFilters(filters.FilterSet):
             "status": ["exact"],
             "category__name": ["exact"],
         }
+
+
+class PostSearchFilter(SearchFilter):
+    """
+    Same ``?search=`` parameter as DRF's SearchFilter, but matches and ranks
+    posts with the blog search backend instead of LIKE lookups.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return get_search_backend().search(queryset, query)
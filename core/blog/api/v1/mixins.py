@@ -0,0 +1,172 @@
+import hashlib
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from core.async_api import apaginate
+
+from ...cache import aget_categories, aget_generations, get_generations
+
+
+class ResponseCacheMixin:
+    """
+    Cache list and retrieve responses of anonymous users and answer
+    conditional GETs for everyone.
+
+    Cache keys embed the generations bumped by the post and category receivers
+    in ``blog.signals``, so a save or delete expires exactly the entries it
+    affects. The ETag is derived from the same key.
+
+    ``alist`` and ``aretrieve`` are the async versions used in ASGI mode (see
+    ``core.async_api``), only anonymous requests are passed to them.
+    """
+
+    cache_timeout = settings.BLOG_API_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        (posts,) = get_generations("posts")
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        key = self.response_cache_key("list", posts, params)
+        return self.cached_response(request, key, self.build_list_response)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        post, categories = get_generations(f"post:{pk}", "categories")
+        key = self.response_cache_key("retrieve", pk, post, categories)
+        return self.cached_response(request, key, self.build_retrieve_response)
+
+    def response_cache_key(self, action, *parts):
+        # links in the responses are absolute, so they depend on the host
+        parts = (self.request.build_absolute_uri("/"), *parts)
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+        return f"blog:api:{self.basename}:{action}:{digest}"
+
+    def cached_response(self, request, key, build):
+        entry = None
+        if not request.user.is_authenticated:
+            entry = cache.get(key)
+        if entry is None:
+            response = build()
+            if response.status_code != 200:
+                return response
+            entry = {"data": response.data, "last_modified": response.last_modified}
+            if not request.user.is_authenticated:
+                cache.set(key, entry, self.cache_timeout)
+        return self.entry_response(request, key, entry)
+
+    def entry_response(self, request, key, entry):
+        etag = quote_etag(key.rsplit(":", 1)[-1])
+        last_modified = entry["last_modified"]
+        headers = {"ETag": etag}
+        if last_modified is not None:
+            headers["Last-Modified"] = http_date(last_modified.timestamp())
+        response = Response(entry["data"], headers=headers)
+        return get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified.timestamp() if last_modified else None,
+            response=response,
+        )
+
+    def build_list_response(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        serializer = self.get_serializer(rows, many=True)
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(serializer.data)
+        response.last_modified = max((row.updated_date for row in rows), default=None)
+        return response
+
+    def build_retrieve_response(self):
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        response.last_modified = instance.updated_date
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        (posts,) = await aget_generations("posts")
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        key = self.response_cache_key("list", posts, params)
+        return await self.acached_response(request, key, self.abuild_list_response)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        post, categories = await aget_generations(f"post:{pk}", "categories")
+        key = self.response_cache_key("retrieve", pk, post, categories)
+        return await self.acached_response(request, key, self.abuild_retrieve_response)
+
+    async def acached_response(self, request, key, build):
+        entry = await cache.aget(key)
+        if entry is None:
+            response = await build()
+            if response.status_code != 200:
+                return response
+            entry = {"data": response.data, "last_modified": response.last_modified}
+            await cache.aset(key, entry, self.cache_timeout)
+        return self.entry_response(request, key, entry)
+
+    async def afilter_queryset(self, queryset):
+        filterset_class = getattr(self, "filterset_class", None)
+        if filterset_class and set(filterset_class.base_filters) & set(self.request.query_params):
+            # validating related filter values queries the database
+            return await sync_to_async(self.filter_queryset)(queryset)
+        return self.filter_queryset(queryset)
+
+    async def abuild_list_response(self):
+        paginator = self.paginator
+        cursor_pagination_class = getattr(paginator, "cursor_pagination_class", None)
+        if cursor_pagination_class and cursor_pagination_class.is_requested(self.request):
+            # rare enough to be left to the sync version
+            return await sync_to_async(self.build_list_response)()
+
+        # a category missing from the cached ones is read from the post
+        queryset = await self.afilter_queryset(self.get_queryset().select_related("category"))
+        page_size = paginator.get_page_size(self.request) if paginator else None
+        if page_size:
+            django_paginator = paginator.django_paginator_class(queryset, page_size)
+            # counted first, ?page=last needs it
+            django_paginator.count = await queryset.acount()
+            page_number = paginator.get_page_number(self.request, django_paginator)
+            try:
+                page = await apaginate(django_paginator, page_number)
+            except InvalidPage as exc:
+                raise NotFound(
+                    paginator.invalid_page_message.format(page_number=page_number, message=str(exc))
+                )
+            paginator.page, paginator.request = page, self.request
+            if paginator.template is not None and django_paginator.num_pages > 1:
+                paginator.display_page_controls = True
+            rows = page.object_list
+        else:
+            rows = [row async for row in queryset]
+
+        context = {**self.get_serializer_context(), "categories": await aget_categories()}
+        data = self.get_serializer(rows, many=True, context=context).data
+        response = paginator.get_paginated_response(data) if page_size else Response(data)
+        response.last_modified = max((row.updated_date for row in rows), default=None)
+        return response
+
+    async def abuild_retrieve_response(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup = {self.lookup_field: self.kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        try:
+            # the representation embeds the category
+            instance = await queryset.select_related("category").aget(**lookup)
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        response = Response(self.get_serializer(instance).data)
+        response.last_modified = instance.updated_date
+        return response
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class PostCursorPagination(CursorPagination):
+    """
+    Keyset pagination on ``(published_date, id)``.
+
+    Every page is fetched with an indexed range condition on the last row of
+    the previous one, so deep pages cost the same as the first and no COUNT is
+    issued. ``?ordering=published_date`` flips the direction, ``id`` always
+    follows it and breaks ties.
+    """
+
+    ordering = ("-published_date",)
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            request.query_params.get("pagination") == "cursor"
+            or cls.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor.reverse if self.cursor else False
+        position = self.decode_position(self.cursor.position) if self.cursor else None
+
+        # walking backwards means reading the rows on the other side of the key
+        descending = self.ordering[0].startswith("-") != reverse
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}published_date", f"{prefix}id")
+        if position is not None:
+            published_date, pk = position
+            if descending:
+                queryset = queryset.filter(
+                    Q(published_date__lte=published_date),
+                    Q(published_date__lt=published_date) | Q(id__lt=pk),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(published_date__gte=published_date),
+                    Q(published_date__gt=published_date) | Q(id__gt=pk),
+                )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+        return self.page
+
+    def decode_position(self, position):
+        try:
+            published_date, pk = position.rsplit("|", 1)
+            return datetime.fromisoformat(published_date), int(pk)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_position(self, post):
+        return f"{post.published_date.isoformat()}|{post.pk}"
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self.encode_position(self.page[-1])
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self.encode_position(self.page[0])
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class PostPagination(PageNumberPagination):
+    """
+    Page number pagination, unless the client opts in to keyset pagination
+    with ``?pagination=cursor``; the links of that mode carry a ``cursor``.
+    """
+
+    cursor_pagination_class = PostCursorPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_pagination_class.is_requested(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                "name": "pagination",
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` to paginate with cursors instead of page numbers.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            *self.cursor_pagination_class().get_schema_operation_parameters(view),
+        ]
+        return parameters
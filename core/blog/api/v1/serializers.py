@@ -1,6 +1,9 @@
 from rest_framework import serializers
+from django.urls import reverse
 from ...models import Post, Category
+from ...cache import get_categories
 from accounts.models import Profile
+from core.images import image_srcsets
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -9,10 +12,71 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
+class PostListSerializer(serializers.ListSerializer):
+    """
+    Read-only fast path for ``PostSerializer(many=True)``.
+
+    Builds the list representation straight from the model fields instead of
+    running every field of every row through ``PostSerializer``. URL prefixes are
+    worked out once per page and categories come from the cached category map,
+    so a page costs no extra queries. The output matches the list output of
+    ``PostSerializer``.
+    """
+
+    def to_representation(self, data):
+        request = self.context.get("request")
+        host = request.build_absolute_uri("/")[:-1]
+        # build_absolute_uri(pk) resolves the pk against the current path
+        absolute_prefix = request.build_absolute_uri("./")
+        relative_url = reverse("blog:api-v1:post-detail", kwargs={"pk": "__pk__"})
+        categories = {
+            category.id: {"id": category.id, "name": category.name}
+            # async views load them up front
+            for category in self.context.get("categories") or get_categories()
+        }
+        # what CategorySerializer renders for a post without a category
+        no_category = CategorySerializer(None).data
+        datetime_field = serializers.DateTimeField()
+
+        def absolute(url):
+            return host + url if url.startswith("/") else url
+
+        rows = []
+        for post in data:
+            image = None
+            if post.image:
+                image = absolute(post.image.url)
+            if post.category_id is None:
+                category = no_category
+            else:
+                category = categories.get(post.category_id)
+                if category is None:
+                    category = CategorySerializer(post.category).data
+            rows.append(
+                {
+                    "id": post.pk,
+                    "author": post.author_id,
+                    "image": image,
+                    "image_srcset": image_srcsets(post, build_url=absolute),
+                    "title": post.title,
+                    "snippet": post.get_snippet(),
+                    "category": category,
+                    "status": post.status,
+                    "relative_url": relative_url.replace("__pk__", str(post.pk)),
+                    "absolute_url": f"{absolute_prefix}{post.pk}",
+                    "created_date": datetime_field.to_representation(post.created_date),
+                    "published_date": datetime_field.to_representation(post.published_date),
+                }
+            )
+        return rows
+
+
 class PostSerializer(serializers.ModelSerializer):
     snippet = serializers.ReadOnlyField(source="get_snippet")
     relative_url = serializers.URLField(source="get_absolute_api_url", read_only=True)
     absolute_url = serializers.SerializerMethodField(method_name="get_abs_url")
+    image_srcset = serializers.SerializerMethodField()
+    content_html = serializers.ReadOnlyField(source="html_content")
 
     class Meta:
         model = Post
@@ -20,8 +84,10 @@ class PostSerializer(serializers.ModelSerializer):
             "id",
             "author",
             "image",
+            "image_srcset",
             "title",
             "content",
+            "content_html",
             "snippet",
             "category",
             "status",
@@ -31,11 +97,16 @@ class PostSerializer(serializers.ModelSerializer):
             "published_date",
         ]
         read_only_fields = ["author"]
+        list_serializer_class = PostListSerializer
 
     def get_abs_url(self, obj):
         request = self.context.get("request")
         return request.build_absolute_uri(obj.pk)
 
+    def get_image_srcset(self, obj):
+        request = self.context.get("request")
+        return image_srcsets(obj, build_url=request.build_absolute_uri)
+
     def to_representation(self, instance):
         request = self.context.get("request")
         rep = super().to_representation(instance)
@@ -45,6 +116,7 @@ class PostSerializer(serializers.ModelSerializer):
             rep.pop("absolute_url", None)
         else:
             rep.pop("content", None)
+            rep.pop("content_html", None)
         rep["category"] = CategorySerializer(
             instance.category, context={"request": request}
         ).data
@@ -1,5 +1,6 @@
 from . import viewsets
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -8,4 +9,11 @@ router.register("category", viewsets.CategoryModelViewSet, basename="category")
 
 app_name="api-v1"
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = router.urls
+
+if settings.ASYNC_VIEWS:
+    # the router's post routes, with anonymous reads answered by the async handlers
+    urlpatterns = [
+        re_path(r"^post/$", viewsets.async_post_list_view(), name="post-list"),
+        re_path(r"^post/(?P<pk>[^/.]+)/$", viewsets.async_post_detail_view(), name="post-detail"),
+    ] + urlpatterns
@@ -3,21 +3,60 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from .permissions import IsOwnerOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from ...models import Post, Category
-from .filters import PostFilters
-from rest_framework.pagination import PageNumberPagination
+from .filters import PostFilters, PostSearchFilter
+from .paginations import PostPagination
+from .mixins import ResponseCacheMixin
+from core.async_api import async_api_view
 
 
-class PostModelViewSet(viewsets.ModelViewSet):
+class PostModelViewSet(ResponseCacheMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     serializer_class = PostSerializer
-    queryset = Post.objects.filter(status=True)
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    queryset = Post.objects.all()
+    filter_backends = [DjangoFilterBackend, PostSearchFilter, OrderingFilter]
     filterset_class = PostFilters
-    search_fields = ["title", "content"]
     ordering_fields = ["published_date"]
-    pagination_class = PageNumberPagination
+    pagination_class = PostPagination
+
+    def get_queryset(self):
+        # filtered per request, the visible posts depend on the time
+        queryset = super().get_queryset()
+        if self.action in ("update", "partial_update", "destroy"):
+            # authors edit their drafts and scheduled posts too
+            return queryset.filter(author__user_id=self.request.user.pk)
+        if self.action == "retrieve":
+            # authors read their own drafts and scheduled posts, the cached
+            # anonymous responses only ever hold visible ones
+            return queryset.visible_to(self.request.user)
+        queryset = queryset.visible()
+        if self.action == "list":
+            # only the detail representation has the rendered content
+            queryset = queryset.defer("content_html")
+        return queryset
+
+
+def async_post_list_view():
+    return async_api_view(
+        PostModelViewSet,
+        {"get": "alist"},
+        {"get": "list", "post": "create"},
+        basename="post",
+        detail=False,
+        suffix="List",
+    )
+
+
+def async_post_detail_view():
+    return async_api_view(
+        PostModelViewSet,
+        {"get": "aretrieve"},
+        {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"},
+        basename="post",
+        detail=True,
+        suffix="Instance",
+    )
 
 
 class CategoryModelViewSet(viewsets.ModelViewSet):
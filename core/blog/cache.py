@@ -0,0 +1,74 @@
+import time
+
+from django.core.cache import cache
+
+from .models import Category
+
+CATEGORIES_CACHE_KEY = "blog:categories"
+
+
+def get_categories():
+    """
+    Return every category, served from the cache once it has been loaded.
+    """
+    categories = cache.get(CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = list(Category.objects.order_by("id"))
+        cache.set(CATEGORIES_CACHE_KEY, categories, timeout=None)
+    return categories
+
+
+async def aget_categories():
+    """
+    Async version of ``get_categories``.
+    """
+    categories = await cache.aget(CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = [category async for category in Category.objects.order_by("id")]
+        await cache.aset(CATEGORIES_CACHE_KEY, categories, timeout=None)
+    return categories
+
+
+def invalidate_categories():
+    cache.delete(CATEGORIES_CACHE_KEY)
+
+
+def generation_key(name):
+    return f"blog:generation:{name}"
+
+
+def get_generations(*names):
+    """
+    Return the current generation of each name. Cached data whose key embeds a
+    generation goes stale as soon as ``bump_generation`` is called for it.
+    """
+    keys = [generation_key(name) for name in names]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # start from the clock so a lost counter never reuses old keys
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+async def aget_generations(*names):
+    """
+    Async version of ``get_generations``.
+    """
+    keys = [generation_key(name) for name in names]
+    generations = await cache.aget_many(keys)
+    for key in keys:
+        if key not in generations:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            generations[key] = await cache.aget(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(*names):
+    for name in names:
+        key = generation_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
@@ -0,0 +1,118 @@
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseViewCounter:
+    """
+    Accumulates post page hits outside of the posts table so they can be
+    written back in batches by ``blog.tasks.flush_post_views``.
+    """
+
+    def hit(self, post_id, amount=1):
+        """
+        Record ``amount`` hits for a post and return its pending (unflushed) count.
+        """
+        raise NotImplementedError
+
+    async def ahit(self, post_id, amount=1):
+        """
+        Async version of ``hit``, run in a thread so the event loop doesn't
+        wait on the backend. The counters don't touch the database, so it
+        doesn't have to queue up for the thread of the sync code.
+        """
+        return await sync_to_async(self.hit, thread_sensitive=False)(post_id, amount)
+
+    def pending(self, post_id):
+        """
+        Return the number of hits recorded for a post that have not been flushed yet.
+        """
+        raise NotImplementedError
+
+    def drain(self):
+        """
+        Atomically take every pending count and return them as ``{post_id: hits}``.
+        """
+        raise NotImplementedError
+
+
+class RedisViewCounter(BaseViewCounter):
+    """
+    Keeps pending hits in a Redis hash on the connection of the ``default`` cache,
+    so every web process and the celery worker share the same counters.
+    """
+
+    key = "blog:post-views"
+    draining_key = "blog:post-views:draining"
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def client(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection(self.alias)
+
+    def hit(self, post_id, amount=1):
+        return self.client.hincrby(self.key, post_id, amount)
+
+    def pending(self, post_id):
+        return int(self.client.hget(self.key, post_id) or 0)
+
+    def drain(self):
+        # one MULTI/EXEC: hits arriving after it land in a fresh hash and are
+        # picked up by the next flush, and there is no step in between a
+        # crashed worker could leave buffered hits behind at
+        pipe = self.client.pipeline()
+        pipe.hgetall(self.key)
+        # left behind by a drain that renamed the hash first and didn't finish
+        pipe.hgetall(self.draining_key)
+        pipe.delete(self.key, self.draining_key)
+        pending, interrupted, _ = pipe.execute()
+        counts = defaultdict(int)
+        for hashes in (pending, interrupted):
+            for post_id, hits in hashes.items():
+                counts[int(post_id)] += int(hits)
+        return dict(counts)
+
+
+class LocMemViewCounter(BaseViewCounter):
+    """
+    In-process counter for development and tests. Counts are not shared between
+    processes, so the flush task has to run in the process that records hits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+
+    def hit(self, post_id, amount=1):
+        with self._lock:
+            self._counts[post_id] += amount
+            return self._counts[post_id]
+
+    def pending(self, post_id):
+        with self._lock:
+            return self._counts.get(post_id, 0)
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = dict(self._counts), defaultdict(int)
+        return counts
+
+
+_counters = {}
+
+
+def get_view_counter():
+    """
+    Return the counter configured by ``settings.BLOG_VIEW_COUNTER``.
+    """
+    path = settings.BLOG_VIEW_COUNTER
+    if path not in _counters:
+        _counters[path] = import_string(path)()
+    return _counters[path]
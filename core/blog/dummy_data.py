@@ -0,0 +1,150 @@
+"""
+The generating side of the ``add_dummy_data`` command. It runs in spawned
+processes that import this module before Django is set up, so the models
+are only imported inside the functions.
+"""
+import random
+from collections import Counter
+from datetime import timedelta
+
+import django
+import faker
+from django.apps import apps
+
+
+categories = ["Tech", "AI", "Blockchain", "Machine Learning"]
+
+# set in every worker by init_worker, too big to send along with each chunk
+_author_ids = []
+_category_ids = []
+
+
+def init_worker(author_ids, category_ids):
+    if not apps.ready:
+        django.setup()
+    _author_ids[:] = author_ids
+    _category_ids[:] = category_ids
+
+
+def seeded(seed, kind, index):
+    """
+    A random generator and a Faker for chunk ``index`` of ``kind``. They only
+    depend on the seed, so the data doesn't depend on the number of workers.
+    """
+    rng = random.Random(f"{seed}:{kind}:{index}")
+    fake = faker.Faker()
+    fake.seed_instance(rng.getrandbits(64))
+    return rng, fake
+
+
+def generate_users(task):
+    from django.db import transaction
+    from accounts.models import Profile, User
+
+    rng, fake = seeded(task["seed"], "users", task["index"])
+    users = [
+        User(
+            email=f"{fake.user_name()}.{number}@example.com",
+            password=task["password"],
+            is_verified=True,
+        )
+        for number in range(task["first"], task["first"] + task["count"])
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        # bulk_create sends no post_save, so the profiles aren't created for us
+        Profile.objects.bulk_create(
+            Profile(user=user, first_name=fake.first_name(), last_name=fake.last_name(), bio=fake.text())
+            for user in users
+        )
+    return {"users": len(users), "profiles": len(users)}
+
+
+def comment_tree(rng, average, max_depth):
+    """
+    Return the depth and the parent (an index into the list, or None) of
+    every comment of a post.
+    """
+    tree = []
+    for index in range(rng.randint(0, 2 * average)):
+        parent = rng.randrange(index) if index and rng.random() < 0.5 else None
+        if parent is not None and tree[parent][0] < max_depth:
+            tree.append((tree[parent][0] + 1, parent))
+        else:
+            tree.append((0, None))
+    return tree
+
+
+def generate_posts(task):
+    from django.db import transaction
+    from comment.models import Comment
+    from .models import Category, Post
+    from .rendering import RENDERER_VERSION, render_content
+
+    rng, fake = seeded(task["seed"], "posts", task["index"])
+    posts, trees = [], []
+    for number in range(task["first"], task["first"] + task["count"]):
+        content = "\n\n".join(fake.paragraphs(nb=rng.randint(3, 8)))
+        tree = comment_tree(rng, task["comments"], task["reply_depth"])
+        posts.append(
+            Post(
+                author_id=rng.choice(_author_ids),
+                title=fake.sentence(),
+                slug=f"{fake.slug()}-{number}",
+                content=content,
+                # rendered here, in the worker, instead of once per save
+                content_html=render_content(content),
+                content_html_version=RENDERER_VERSION,
+                status=rng.random() < 0.8,
+                category_id=rng.choice(_category_ids) if _category_ids else None,
+                views=rng.randint(0, 5000),
+                read_time=rng.randint(1, 15),
+                comment_count=len(tree),
+                published_date=task["now"] - timedelta(seconds=rng.randint(0, 2 * 365 * 24 * 60 * 60)),
+            )
+        )
+        trees.append(tree)
+
+    comments = [
+        [
+            Comment(name=fake.name(), email=fake.email(), message=fake.paragraph()[:500])
+            for _ in tree
+        ]
+        for tree in trees
+    ]
+    with transaction.atomic():
+        Post.objects.bulk_create(posts)
+        # a level at a time, the replies need the ids of the level above
+        for depth in range(task["reply_depth"] + 1):
+            level = []
+            for post, tree, post_comments in zip(posts, trees, comments):
+                for comment, (comment_depth, parent) in zip(post_comments, tree):
+                    if comment_depth == depth:
+                        comment.post = post
+                        comment.reply_to = post_comments[parent] if parent is not None else None
+                        level.append(comment)
+            Comment.objects.bulk_create(level)
+    # bulk_create skips the receivers that count the posts of a category. Done
+    # after the commit and in id order, the workers all update the same rows
+    counts = Counter(post.category_id for post in posts if post.category_id)
+    for category_id in sorted(counts):
+        Category.objects.filter(pk=category_id).add_posts(counts[category_id])
+    return {"posts": len(posts), "comments": sum(len(tree) for tree in trees)}
+
+
+def generate_tokens(task):
+    from accounts.models import UsedToken
+
+    rng, _ = seeded(task["seed"], "tokens", task["index"])
+    user_ids = task["user_ids"]
+    tokens = [
+        UsedToken(
+            user_id=rng.choice(user_ids),
+            token_jti=f"{rng.getrandbits(128):032x}-{number}",
+            # about half of them expired already, for prune_used_tokens
+            expires_at=task["now"] + timedelta(minutes=rng.randint(-60 * 24, 60 * 24)),
+        )
+        for number in range(task["first"], task["first"] + task["count"])
+    ]
+    UsedToken.objects.bulk_create(tokens)
+    return {"used tokens": len(tokens)}
@@ -1,62 +1,150 @@
-from datetime import datetime
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from ...models import Post, Category
-from comment.models import Comment
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
-from accounts.models import Profile, User
-import faker
-import random
-
+from django.db.models import Max
+from django.utils import timezone
 
-categories = ["Tech", "AI", "Blockchain", "Machine Learning"]
+from ...cache import bump_generation, invalidate_categories
+from ...dummy_data import categories, generate_posts, generate_tokens, generate_users, init_worker, seeded
+from ...models import Post, Category
+from ...search import get_search_backend
+from accounts.models import Profile, User, UsedToken
+from accounts.replay import get_replay_filter
 
 
 class Command(BaseCommand):
-    help = "Add dummy data - you have parse user email"
+    help = (
+        "Generate dummy users, categories, posts with comment trees and used tokens in bulk, "
+        "the same seed generates the same data"
+    )
 
     def add_arguments(self, parser):
-        parser.add_argument("user", nargs="+", type=str)
+        parser.add_argument("user", nargs="?", type=str, help="email of an existing user to fake the profile of and add as an author")
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--categories", type=int, default=len(categories))
+        parser.add_argument("--posts", type=int, default=10)
+        parser.add_argument("--comments", type=int, default=5, help="average number of comments per post")
+        parser.add_argument("--reply-depth", type=int, default=3, help="deepest level of replies to comments")
+        parser.add_argument("--tokens", type=int, default=0, help="used activation and reset tokens")
+        parser.add_argument("--password", default="password123", help="password of the generated users")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="rows of a chunk generated and inserted at once")
+        parser.add_argument("--workers", type=int, default=1, help="generating processes, 1 generates in this one")
+        parser.add_argument("--seed", type=int, default=0)
 
     def handle(self, *args, **options):
-        user_email = options["user"][0]
-        fake = faker.Faker()
-        try:
-            print("Faking the user's profile")
-            user = User.objects.get(email=user_email)
-            print("User found successfully.")
-            profile = Profile.objects.get(user=user)
-            profile.first_name = fake.first_name()
-            profile.last_name = fake.last_name()
-            profile.bio = fake.text()
-            profile.save()
-            print("Profile detail generated successfully.")
-
-            print("=" * 15)
-
-            print("Creating categories...")
-            for c in categories:
-                Category.objects.get_or_create(name=c)
-            print("Categories created successfully.")
-
-            print("=" * 15)
-
-            print("Generating 10 posts with random details...")
-            for _ in range(10):
-                post = Post()
-                post.title = fake.sentence()
-                post.category = Category.objects.get(name=random.choice(categories))
-                post.status = random.choice([True, False])
-                post.slug = fake.slug()
-                post.published_date = datetime.now()
-                post.content = fake.text()
-                post.author = profile
-                post.save()
-            print("Created posts successfully")
+        self.options = options
+        self.now = timezone.now()
+        started = time.perf_counter()
+        self.total_rows = 0
+
+        author_ids = []
+        if options["user"]:
+            author_ids.append(self.fake_profile(options["user"]))
+        if options["users"]:
+            first = (User.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+            self.run(generate_users, self.chunks("users", options["users"], first, password=make_password(options["password"])))
+        # the generated ones have the highest ids
+        user_ids = list(User.objects.order_by("-id").values_list("id", flat=True)[: options["users"]])
+        author_ids += Profile.objects.filter(user_id__in=user_ids).values_list("id", flat=True)
+        if not author_ids:
+            author_ids = list(Profile.objects.values_list("id", flat=True)[:1000])
+        if options["posts"] and not author_ids:
+            raise CommandError("The posts need an author, generate users or pass the email of one")
+
+        category_ids = self.create_categories(options["categories"])
+
+        if options["posts"]:
+            first = (Post.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+            chunks = self.chunks(
+                "posts", options["posts"], first, comments=options["comments"], reply_depth=options["reply_depth"]
+            )
+            self.run(generate_posts, chunks, author_ids, category_ids)
+            self.timed("search index", get_search_backend().rebuild)
 
+        if options["tokens"]:
+            token_user_ids = user_ids or list(User.objects.values_list("id", flat=True)[:1000])
+            if not token_user_ids:
+                raise CommandError("The tokens need users, generate some first")
+            first = (UsedToken.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+            self.run(generate_tokens, self.chunks("tokens", options["tokens"], first, user_ids=token_user_ids))
+            self.timed("replay filter", get_replay_filter().rebuild)
+
+        # everything cached about posts and categories is stale now
+        invalidate_categories()
+        bump_generation("posts", "categories")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"{self.total_rows} rows in {elapsed:.1f}s, {self.total_rows / elapsed:,.0f} rows/sec")
+        )
+
+    def fake_profile(self, email):
+        try:
+            profile = Profile.objects.get(user__email=email)
         except Profile.DoesNotExist:
-            print("User can not be found")
+            raise CommandError(f"No user with the email {email}")
+        _, fake = seeded(self.options["seed"], "profile", 0)
+        profile.first_name = fake.first_name()
+        profile.last_name = fake.last_name()
+        profile.bio = fake.text()
+        profile.save()
+        return profile.id
+
+    def create_categories(self, count):
+        _, fake = seeded(self.options["seed"], "categories", 0)
+        names = categories[:count]
+        while len(names) < count:
+            name = fake.unique.word().title()
+            if name not in names:
+                names.append(name)
+        existing = set(Category.objects.filter(name__in=names).values_list("name", flat=True))
+        created = Category.objects.bulk_create(Category(name=name) for name in names if name not in existing)
+        self.report("categories", len(created), 0)
+        return list(Category.objects.values_list("id", flat=True))
+
+    def chunks(self, kind, count, first, **extra):
+        size = self.options["chunk_size"]
+        return [
+            {
+                "seed": self.options["seed"],
+                "index": index,
+                "first": first + start,
+                "count": min(size, count - start),
+                "now": self.now,
+                **extra,
+            }
+            for index, start in enumerate(range(0, count, size))
+        ]
 
-        except Exception as e:
-            print("Something went wrong:", e)
+    def run(self, function, tasks, author_ids=(), category_ids=()):
+        """
+        Run ``function`` over the chunks, in a pool of spawned processes when
+        there are several workers, and report the rows it inserted.
+        """
+        started = time.perf_counter()
+        workers = min(self.options["workers"], len(tasks))
+        if workers <= 1:
+            init_worker(author_ids, category_ids)
+            results = list(map(function, tasks))
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                workers, mp_context=context, initializer=init_worker, initargs=(author_ids, category_ids)
+            ) as executor:
+                results = list(executor.map(function, tasks))
+        elapsed = time.perf_counter() - started
+        for table in results[0] if results else []:
+            self.report(table, sum(result[table] for result in results), elapsed)
 
+    def timed(self, name, function):
+        started = time.perf_counter()
+        function()
+        self.stdout.write(f"{name} rebuilt in {time.perf_counter() - started:.1f}s")
 
+    def report(self, table, rows, elapsed):
+        self.total_rows += rows
+        rate = f", {rows / elapsed:,.0f} rows/sec" if elapsed else ""
+        self.stdout.write(f"{table}: {rows} rows in {elapsed:.1f}s{rate}")
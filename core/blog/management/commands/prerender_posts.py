@@ -0,0 +1,32 @@
+import shutil
+from pathlib import Path
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from ...models import Post
+from ...prerender import PAGE_DIR, prerender_posts
+
+CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Write the pre-rendered pages of every published post, e.g. after turning BLOG_PRERENDER_POSTS on"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="remove every pre-rendered page instead, e.g. after turning BLOG_PRERENDER_POSTS off",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            shutil.rmtree(Path(default_storage.path(PAGE_DIR)), ignore_errors=True)
+            self.stdout.write("Pre-rendered pages removed.")
+            return
+
+        post_ids = list(Post.objects.visible().values_list("id", flat=True))
+        written = 0
+        for start in range(0, len(post_ids), CHUNK_SIZE):
+            written += prerender_posts(post_ids[start : start + CHUNK_SIZE])
+        self.stdout.write(f"{written} pages written.")
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...cache import bump_generation
+from ...models import Post
+from ...prerender import prerender_posts
+from ...rendering import RENDERER_VERSION, render_content
+
+
+class Command(BaseCommand):
+    help = "Render the content of the posts whose HTML is missing or comes from an older renderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="rendering processes")
+        parser.add_argument("--chunk-size", type=int, default=200, help="posts loaded and written at once")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        post_ids = list(
+            Post.objects.exclude(content_html_version=RENDERER_VERSION).order_by("id").values_list("id", flat=True)
+        )
+        chunk_size = options["chunk_size"]
+        rendered = 0
+        # fresh interpreters that only render, nothing like the database connection is inherited
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=options["workers"], mp_context=context) as executor:
+            for start in range(0, len(post_ids), chunk_size):
+                rows = list(Post.objects.filter(pk__in=post_ids[start : start + chunk_size]).values_list("id", "content"))
+                htmls = executor.map(render_content, [content for _, content in rows], chunksize=16)
+                rendered += len(self.store(rows, htmls))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{rendered} posts rendered with {RENDERER_VERSION} in {elapsed:.1f}s")
+
+    def store(self, rows, htmls):
+        updated = []
+        with transaction.atomic():
+            for (pk, content), html in zip(rows, htmls):
+                # a post edited meanwhile was rendered by its save, keep that
+                if Post.objects.filter(pk=pk, content=content).update(
+                    content_html=html, content_html_version=RENDERER_VERSION
+                ):
+                    updated.append(pk)
+        if updated:
+            bump_generation(*(f"post:{pk}" for pk in updated))
+            if settings.BLOG_PRERENDER_POSTS:
+                prerender_posts(updated)
+        return updated
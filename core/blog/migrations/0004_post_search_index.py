@@ -0,0 +1,42 @@
+from django.db import migrations
+
+from blog.search import FTS_TABLE, SEARCH_INDEX_NAME, PostgresSearchBackend
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+
+        Post = apps.get_model("blog", "Post")
+        schema_editor.add_index(
+            Post,
+            GinIndex(PostgresSearchBackend.search_vector(), name=SEARCH_INDEX_NAME),
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, content)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, content) "
+            f"SELECT id, title, content FROM blog_post"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_alter_post_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
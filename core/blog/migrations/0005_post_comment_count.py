@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("comment", "Comment")
+    active_comments = (
+        Comment.objects.filter(post=OuterRef("pk"), is_active=True)
+        .order_by()
+        .values("post")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Post.objects.update(comment_count=Coalesce(Subquery(active_comments), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_search_index'),
+        ('comment', '0003_alter_comment_reply_to'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['published_date', 'id'], name='blog_post_pub_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_profile_image_variants'),
+        ('blog', '0008_post_content_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'id'], name='blog_post_author_id_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:30
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def queue_future_posts(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Post.objects.filter(status=True, published_date__gt=timezone.now()).update(scheduled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_profile_image_variants'),
+        ('blog', '0009_post_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='scheduled',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'published_date'], name='blog_post_status_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('scheduled', True)), fields=['published_date'], name='blog_post_publish_queue_idx'),
+        ),
+        migrations.RunPython(queue_future_posts, migrations.RunPython.noop),
+    ]
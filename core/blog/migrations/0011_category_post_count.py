@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:35
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_posts(apps, schema_editor):
+    Category = apps.get_model("blog", "Category")
+    Post = apps.get_model("blog", "Post")
+    posts = (
+        Post.objects.filter(category=OuterRef("pk"))
+        .order_by()
+        .values("category")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Category.objects.update(post_count=Coalesce(Subquery(posts), 0))
+    # the empty ones start their grace period now
+    Category.objects.filter(post_count__gt=0).update(emptied_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_scheduled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='emptied_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('post_count', 0)), fields=['emptied_at'], name='blog_category_unused_idx'),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -1,29 +1,120 @@
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from core.images import ImageVariantsMixin
+from .rendering import RENDERER_VERSION, render_content
+
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """
+        The posts readers see: published, and due unless scheduled for later.
+        """
+        return self.filter(status=True, published_date__lte=timezone.now())
+
+    def visible_to(self, user):
+        """
+        The ``visible`` posts, plus the drafts and scheduled posts of ``user``
+        for their author to preview.
+        """
+        if not user.is_authenticated:
+            return self.visible()
+        return self.visible() | self.filter(author__user_id=user.pk)
+
+    def due(self):
+        """
+        The scheduled posts whose publish date has come.
+        """
+        return self.filter(scheduled=True, published_date__lte=timezone.now())
+
+    def add_comments(self, count):
+        """
+        Add ``count`` active comments, or remove them when negative, from the
+        comment count of the posts.
+        """
+        if count > 0:
+            return self.update(comment_count=F("comment_count") + count)
+        return self.filter(comment_count__gte=-count).update(comment_count=F("comment_count") + count)
+
 
 # Create your models here.
-class Post(models.Model):
+class Post(ImageVariantsMixin, models.Model):
     """
     this is a class to define posts for blog app
     """
 
     author = models.ForeignKey("accounts.Profile", on_delete=models.CASCADE)
     image = models.ImageField(null=True, blank=True)
+    # resized copies of the image, written by blog.tasks.generate_post_image_variants
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     title = models.CharField(max_length=250)
     slug = models.SlugField(max_length=250, unique=True)
     read_time = models.IntegerField(default=2)
     views = models.IntegerField(default=0)
+    # active comments, kept up to date by comment.tasks.create_comment_task
+    comment_count = models.PositiveIntegerField(default=0)
     content = models.TextField()
+    # content rendered on save, the version tells rerender_posts which rows are stale
+    content_html = models.TextField(blank=True, editable=False)
+    content_html_version = models.CharField(max_length=50, blank=True, editable=False)
     status = models.BooleanField()
+    # published with a future date, blog.tasks.publish_scheduled_posts clears it once due
+    scheduled = models.BooleanField(default=False, editable=False)
     category = models.ForeignKey("Category", related_name="posts", on_delete=models.SET_NULL, null=True)
 
     created_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
     published_date = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            # keyset pagination of the post API walks (published_date, id)
+            models.Index(fields=["published_date", "id"], name="blog_post_pub_date_id_idx"),
+            # the author's post list, newest first
+            models.Index(fields=["author", "id"], name="blog_post_author_id_idx"),
+            # Post.objects.visible()
+            models.Index(fields=["status", "published_date"], name="blog_post_status_pub_date_idx"),
+            # the publish queue, only the few scheduled posts are in it
+            models.Index(
+                fields=["published_date"], condition=models.Q(scheduled=True), name="blog_post_publish_queue_idx"
+            ),
+        ]
+
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"status", "published_date"} & set(update_fields):
+            self.scheduled = bool(self.status) and self.published_date > timezone.now()
+            if update_fields is not None:
+                update_fields = kwargs["update_fields"] = {*update_fields, "scheduled"}
+        if update_fields is None or "content" in update_fields:
+            self.content_html = render_content(self.content)
+            self.content_html_version = RENDERER_VERSION
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "content_html", "content_html_version"}
+        super().save(*args, **kwargs)
+
+    @property
+    def is_visible(self):
+        return bool(self.status) and self.published_date <= timezone.now()
+
+    @property
+    def html_content(self):
+        """
+        The rendered content. Rows written without ``save()`` (``bulk_create``)
+        are rendered on the fly until rerender_posts has stored their HTML.
+        """
+        if not self.content_html_version:
+            return mark_safe(render_content(self.content))
+        return mark_safe(self.content_html)
+
     def get_snippet(self):
         return self.content[0:5]
 
@@ -31,12 +122,51 @@ class Post(models.Model):
         return reverse("blog:api-v1:post-detail", kwargs={"pk": self.pk})
 
 
+class CategoryQuerySet(models.QuerySet):
+    def add_posts(self, count):
+        """
+        Add ``count`` posts, or remove them when negative, from the post count
+        of the categories and note when they become empty.
+        """
+        if count > 0:
+            return self.update(emptied_at=None, post_count=F("post_count") + count)
+        # the assignments see the count from before the UPDATE
+        return self.filter(post_count__gte=-count).update(
+            emptied_at=Case(When(post_count=-count, then=Value(timezone.now())), default=F("emptied_at")),
+            post_count=F("post_count") + count,
+        )
+
+    def recount(self):
+        """
+        Count the posts of the categories again, for posts written without
+        the receivers (``bulk_create``, ``update()``).
+        """
+        posts = (
+            Post.objects.filter(category=OuterRef("pk")).order_by().values("category").annotate(count=Count("pk")).values("count")
+        )
+        self.update(post_count=Coalesce(Subquery(posts), 0))
+        self.filter(post_count=0, emptied_at=None).update(emptied_at=timezone.now())
+        self.filter(post_count__gt=0).update(emptied_at=None)
+
+
 class Category(models.Model):
     """
     this is a class to define categories for blog table
     """
 
     name = models.CharField(max_length=250)
+    # kept up to date by the receivers in blog.signals
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    # since when the category has no posts, blog.tasks.remove_unused_categories deletes it a while later
+    emptied_at = models.DateTimeField(null=True, blank=True, default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # the candidates of remove_unused_categories
+            models.Index(fields=["emptied_at"], condition=models.Q(post_count=0), name="blog_category_unused_idx"),
+        ]
+
+    objects = CategoryQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -0,0 +1,70 @@
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+from comment.models import Comment
+from .cache import get_categories
+from .models import Post
+from .views import PostDetailView
+
+# nginx looks up /posts/<slug> in here before passing the request to django
+PAGE_DIR = "prerendered/posts"
+
+
+def page_name(slug):
+    return f"{PAGE_DIR}/{slug}.html"
+
+
+def render_post_page(post):
+    """
+    Render the detail page of a post as any visitor sees it. The parts that
+    depend on the request (view count, author links, CSRF token) are filled
+    in by the page from ``PostLiveView``.
+    """
+    context = {
+        "post": post,
+        "object": post,
+        "comments": Comment.objects.thread(post),
+        "related_posts": PostDetailView().get_related_posts(post),
+        "categories": get_categories(),
+        "prerendered": True,
+    }
+    return render_to_string(PostDetailView.template_name, context)
+
+
+def write_page(slug, content):
+    path = Path(default_storage.path(page_name(slug)))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # renamed over the old page, so nginx never serves a half written one
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def remove_page(slug):
+    default_storage.delete(page_name(slug))
+
+
+def prerender_posts(post_ids):
+    """
+    Write the pages of the given posts, or remove them for drafts and posts
+    scheduled for later. Returns the number of pages written.
+    """
+    written = 0
+    for post in Post.objects.filter(pk__in=post_ids).select_related("category", "author"):
+        if post.is_visible:
+            write_page(post.slug, render_post_page(post))
+            written += 1
+        else:
+            remove_page(post.slug)
+    return written
@@ -0,0 +1,134 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Post
+
+# posts considered as neighbours, newest first
+CANDIDATE_LIMIT = 1000
+# added to the text similarity of posts sharing a category
+CATEGORY_BONUS = 0.2
+STOP_WORDS = frozenset(
+    "about after also and are but can for from had has have her his how into its "
+    "more not one our out she that the their them then there these they this was "
+    "were what when which who will with you your".split()
+)
+
+
+def related_key(post_id):
+    return f"blog:related:{post_id}"
+
+
+def get_related_ids(post_id):
+    """
+    Return the precomputed neighbour ids of a post, best first, or None when
+    they haven't been computed yet.
+    """
+    return cache.get(related_key(post_id))
+
+
+async def aget_related_ids(post_id):
+    """
+    Async version of ``get_related_ids``.
+    """
+    return await cache.aget(related_key(post_id))
+
+
+def get_many_related_ids(post_ids):
+    """
+    ``get_related_ids`` for several posts, as ``{post_id: ids}`` without the
+    posts whose neighbours haven't been computed.
+    """
+    keys = {related_key(post_id): post_id for post_id in post_ids}
+    return {keys[key]: ids for key, ids in cache.get_many(list(keys)).items()}
+
+
+def tokenize(text):
+    return [
+        word
+        for word in re.findall(r"\w+", text.lower())
+        if len(word) > 2 and word not in STOP_WORDS and not word.isdigit()
+    ]
+
+
+class RelatedPostsIndex:
+    """
+    TF-IDF vectors of the title and content of the candidate posts with an
+    inverted index over them, so the neighbours of a post are scored by
+    walking the postings of its own terms only.
+    """
+
+    def __init__(self, posts):
+        self.categories = {}
+        term_counts = {}
+        document_frequency = Counter()
+        for post in posts:
+            self.categories[post.pk] = post.category_id
+            # the title is short but says the most about the post
+            counts = Counter(tokenize(post.title) * 3 + tokenize(post.content))
+            term_counts[post.pk] = counts
+            document_frequency.update(counts.keys())
+
+        total = len(term_counts)
+        self.vectors = {}
+        self.postings = defaultdict(list)
+        for post_id, counts in term_counts.items():
+            vector = {
+                term: (1 + math.log(count)) * self.idf(total, document_frequency[term])
+                for term, count in counts.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            vector = {term: weight / norm for term, weight in vector.items()}
+            self.vectors[post_id] = vector
+            for term, weight in vector.items():
+                self.postings[term].append((post_id, weight))
+
+    @staticmethod
+    def idf(total, frequency):
+        # smoothed, so terms every post shares still count a little
+        return math.log((1 + total) / (1 + frequency)) + 1
+
+    def neighbours(self, post_id, count):
+        scores = defaultdict(float)
+        for term, weight in self.vectors.get(post_id, {}).items():
+            for other_id, other_weight in self.postings[term]:
+                scores[other_id] += weight * other_weight
+        category = self.categories.get(post_id)
+        if category is not None:
+            for other_id, other_category in self.categories.items():
+                if other_category == category:
+                    scores[other_id] += CATEGORY_BONUS
+        scores.pop(post_id, None)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return [other_id for other_id, score in ranked[:count] if score > 0]
+
+
+def build_index(extra_post=None):
+    """
+    Index the newest published posts, plus ``extra_post`` when it isn't one of
+    them (a draft or an old post still gets neighbours of its own).
+    """
+    posts = list(
+        Post.objects.visible()
+        .only("id", "title", "content", "category_id")
+        .order_by("-id")[:CANDIDATE_LIMIT]
+    )
+    if extra_post is not None and all(post.pk != extra_post.pk for post in posts):
+        posts.append(extra_post)
+    return RelatedPostsIndex(posts)
+
+
+def update_related_posts(post_ids, index=None):
+    """
+    Score the neighbours of the given posts, store their ids in the cache and
+    return them as ``{post_id: [neighbour_id, ...]}``.
+    """
+    index = index or build_index()
+    count = settings.BLOG_RELATED_POSTS
+    related = {post_id: index.neighbours(post_id, count) for post_id in post_ids}
+    # kept until recomputed, a save of the post or the nightly rebuild replaces them
+    cache.set_many({related_key(post_id): ids for post_id, ids in related.items()}, timeout=None)
+    return related
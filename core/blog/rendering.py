@@ -0,0 +1,17 @@
+import markdown
+
+from core.sanitizer import sanitize_html
+
+# stored with the HTML of every post, bump the first part when the output of
+# render_content changes, rerender_posts updates the posts rendered by an older one
+RENDERER_VERSION = f"2-markdown-{markdown.__version__}"
+
+EXTENSIONS = ["extra", "sane_lists"]
+
+
+def render_content(text):
+    """
+    Render the markdown content of a post to sanitized HTML. Raw HTML in the
+    content is kept as far as the sanitizer allows it.
+    """
+    return sanitize_html(markdown.markdown(text, extensions=EXTENSIONS))
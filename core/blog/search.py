@@ -0,0 +1,143 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+SEARCH_CONFIG = "english"
+SEARCH_INDEX_NAME = "blog_post_search_idx"
+FTS_TABLE = "blog_post_fts"
+
+
+class BaseSearchBackend:
+    """
+    Full-text search over post titles and content.
+
+    ``search`` narrows a post queryset down to the matches and orders them by
+    relevance, best first. Backends that keep a separate index also get told
+    about saved and deleted posts.
+    """
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Fallback for databases without a full-text index, matches with LIKE.
+    """
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(content__icontains=query)
+        ).order_by("-id")
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Uses the GIN index on the title/content search vector created by
+    ``blog/migrations/0004_post_search_index``. Title matches weigh more.
+    """
+
+    @staticmethod
+    def search_vector():
+        from django.contrib.postgres.search import SearchVector
+
+        return SearchVector("title", weight="A", config=SEARCH_CONFIG) + SearchVector(
+            "content", weight="B", config=SEARCH_CONFIG
+        )
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        vector = self.search_vector()
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.annotate(search=vector, rank=SearchRank(vector, search_query))
+            .filter(search=search_query)
+            .order_by("-rank", "-id")
+        )
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    Keeps an FTS5 table with one row per post (rowid = post id) in sync through
+    the signals in ``blog.signals`` and ranks matches with bm25.
+    """
+
+    table = FTS_TABLE
+
+    @staticmethod
+    def to_match(query):
+        # quote every word so user input can't inject FTS5 query syntax,
+        # and allow prefix matches like the old icontains lookup did
+        return " ".join(f'"{term}"*' for term in re.findall(r"\w+", query))
+
+    def search(self, queryset, query):
+        match = self.to_match(query)
+        if not match:
+            return queryset.none()
+        post_table = queryset.model._meta.db_table
+        matches = RawSQL(
+            f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", (match,)
+        )
+        # bm25 is lower for better matches; negate it so "-rank" means best first
+        # like on Postgres. Title hits count ten times as much as content hits.
+        rank = RawSQL(
+            f"SELECT -bm25({self.table}, 10.0, 1.0) FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND {self.table}.rowid = {post_table}.id",
+            (match,),
+        )
+        return (
+            queryset.filter(pk__in=matches)
+            .annotate(rank=rank)
+            .order_by("-rank", "-id")
+        )
+
+    def index_post(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [post.pk])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, content) VALUES (%s, %s, %s)",
+                [post.pk, post.title, post.content],
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [post_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, content) "
+                f"SELECT id, title, content FROM blog_post"
+            )
+
+
+VENDOR_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteFTSSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Return the backend set in ``settings.BLOG_SEARCH_BACKEND``, or the one
+    matching the database vendor when it isn't set.
+    """
+    path = getattr(settings, "BLOG_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, SimpleSearchBackend)()
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from core.images import needs_variants
+from .models import Post, Category
+from .search import get_search_backend
+from .cache import invalidate_categories, bump_generation
+from .prerender import remove_page
+from .tasks import compute_related_posts, generate_post_image_variants, prerender_posts
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_search_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    get_search_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def schedule_related_posts(sender, instance, **kwargs):
+    # the worker reads the post back, so wait until it's committed
+    transaction.on_commit(lambda: compute_related_posts.delay(instance.pk))
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_variants(sender, instance, **kwargs):
+    # resizing takes a while, the request that uploaded the image doesn't wait
+    if needs_variants(instance):
+        transaction.on_commit(lambda: generate_post_image_variants.delay(instance.pk))
+
+
+@receiver(pre_save, sender=Post)
+def remember_saved_values(sender, instance, update_fields=None, **kwargs):
+    # the slug and category the post had, for the post_save receivers below
+    instance._saved_values = {}
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {"slug", "category", "category_id"} & set(update_fields):
+        return
+    instance._saved_values = Post.objects.filter(pk=instance.pk).values("slug", "category_id").first() or {}
+
+
+@receiver(post_save, sender=Post)
+def update_category_counts(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, "_saved_values", {}).get("category_id", instance.category_id)
+    if previous == instance.category_id:
+        return
+    if previous is not None:
+        Category.objects.filter(pk=previous).add_posts(-1)
+    if instance.category_id is not None:
+        Category.objects.filter(pk=instance.category_id).add_posts(1)
+    # the cached categories carry the counts
+    invalidate_categories()
+
+
+@receiver(post_delete, sender=Post)
+def decrement_category_count(sender, instance, **kwargs):
+    if instance.category_id is not None:
+        Category.objects.filter(pk=instance.category_id).add_posts(-1)
+        invalidate_categories()
+
+
+@receiver(post_save, sender=Post)
+def schedule_prerender(sender, instance, **kwargs):
+    if not settings.BLOG_PRERENDER_POSTS:
+        return
+    old_slug = getattr(instance, "_saved_values", {}).get("slug")
+    if old_slug and old_slug != instance.slug:
+        transaction.on_commit(lambda: remove_page(old_slug))
+    transaction.on_commit(lambda: prerender_posts.delay([instance.pk]))
+
+
+@receiver(post_delete, sender=Post)
+def remove_prerendered_page(sender, instance, **kwargs):
+    if settings.BLOG_PRERENDER_POSTS:
+        transaction.on_commit(lambda: remove_page(instance.slug))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def expire_cached_post(sender, instance, **kwargs):
+    bump_generation("posts", f"post:{instance.pk}")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_cached_category(sender, instance, **kwargs):
+    invalidate_categories()
+    # posts embed their category, so every cached post goes stale
+    bump_generation("posts", "categories")
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def schedule_category_prerender(sender, instance, **kwargs):
+    # the pages show the name of the category
+    if not settings.BLOG_PRERENDER_POSTS or kwargs.get("created"):
+        return
+    post_ids = list(instance.posts.visible().values_list("id", flat=True))
+    if post_ids:
+        transaction.on_commit(lambda: prerender_posts.delay(post_ids))
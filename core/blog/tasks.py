@@ -1,12 +1,147 @@
+from collections import defaultdict
+from datetime import timedelta
+
 from celery import shared_task
-from .models import Category
-from django.db.models import Count
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from core.images import update_image_variants
+from .models import Post, Category
+from .cache import bump_generation
+from .counters import get_view_counter
+from .related import build_index, get_many_related_ids, update_related_posts
+from . import prerender
+from django.db.models import Exists, F, OuterRef
 
 
 @shared_task
 def remove_unused_categories():
-    categories_to_remove = Category.objects.annotate(
-        num_posts=Count('posts')
-    ).filter(num_posts=0)
-    categories_to_remove.delete()
-    
\ No newline at end of file
+    """
+    Delete the categories that have had no posts for
+    ``BLOG_UNUSED_CATEGORY_GRACE`` seconds. The candidates come from the
+    partial index on empty categories and are locked and checked for posts
+    again, so a post assigned meanwhile keeps its category.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.BLOG_UNUSED_CATEGORY_GRACE)
+    with transaction.atomic():
+        candidates = list(
+            Category.objects.select_for_update()
+            .filter(post_count=0, emptied_at__lte=cutoff)
+            .annotate(used=Exists(Post.objects.filter(category=OuterRef("pk"))))
+            .values_list("id", "used")
+        )
+        used = [pk for pk, is_used in candidates if is_used]
+        if used:
+            # posts written without the receivers, count them for next time
+            Category.objects.filter(pk__in=used).recount()
+        deleted, _ = Category.objects.filter(pk__in=[pk for pk, is_used in candidates if not is_used]).delete()
+    return deleted
+
+
+@shared_task
+def flush_post_views():
+    """
+    Write the hits buffered by the view counter back to ``Post.views``.
+    Posts that received the same number of hits share one UPDATE.
+    """
+    counter = get_view_counter()
+    counts = counter.drain()
+    if not counts:
+        return 0
+
+    posts_by_hits = defaultdict(list)
+    for post_id, hits in counts.items():
+        posts_by_hits[hits].append(post_id)
+
+    try:
+        with transaction.atomic():
+            for hits, post_ids in posts_by_hits.items():
+                Post.objects.filter(pk__in=post_ids).update(views=F("views") + hits)
+    except Exception:
+        # put the hits back so the next run can retry them
+        for post_id, hits in counts.items():
+            counter.hit(post_id, hits)
+        raise
+    return sum(counts.values())
+
+
+@shared_task
+def publish_scheduled_posts():
+    """
+    Take the scheduled posts that are due off the publish queue in one
+    UPDATE and expire what was cached without them. ``Post.objects.visible()``
+    shows them from their publish date on, this only catches the caches up.
+    """
+    post_ids = list(Post.objects.due().values_list("id", flat=True))
+    if not post_ids:
+        return 0
+    # a post rescheduled meanwhile isn't due anymore and stays queued
+    Post.objects.filter(pk__in=post_ids).due().update(scheduled=False)
+    bump_generation("posts", *(f"post:{pk}" for pk in post_ids))
+    for post_id in post_ids:
+        compute_related_posts.delay(post_id)
+    if settings.BLOG_PRERENDER_POSTS:
+        prerender.prerender_posts(post_ids)
+    return len(post_ids)
+
+
+@shared_task
+def compute_related_posts(post_id):
+    """
+    Recompute the related posts of a saved post. Its new neighbours are the
+    posts most likely to list it in turn, so theirs are refreshed as well.
+    """
+    post = Post.objects.filter(pk=post_id).only("id", "title", "content", "category_id", "status", "published_date").first()
+    if post is None:
+        return []
+    index = build_index(extra_post=post)
+    previous = get_many_related_ids([post_id])
+    neighbours = update_related_posts([post_id], index)[post_id]
+    if post.is_visible:
+        previous.update(get_many_related_ids(neighbours))
+        related = update_related_posts(neighbours, index)
+        related[post_id] = neighbours
+        prerender_changed_pages(previous, related)
+    return neighbours
+
+
+@shared_task
+def rebuild_related_posts():
+    """
+    Recompute the related posts of every indexed post.
+    """
+    index = build_index()
+    previous = get_many_related_ids(list(index.vectors))
+    related = update_related_posts(list(index.vectors), index)
+    prerender_changed_pages(previous, related)
+    return len(related)
+
+
+@shared_task
+def generate_post_image_variants(post_id):
+    """
+    Generate the resized variants of the image of a post. Does nothing when
+    the stored ones belong to its current image.
+    """
+    post = Post.objects.filter(pk=post_id).only("id", "image", "image_variants").first()
+    if post is None or not update_image_variants(post):
+        return False
+    # the variants are in the API representation of the post
+    bump_generation("posts", f"post:{post_id}")
+    if settings.BLOG_PRERENDER_POSTS:
+        prerender.prerender_posts([post_id])
+    return True
+
+
+@shared_task
+def prerender_posts(post_ids):
+    """
+    Write the static pages of the given posts, see blog/prerender.py.
+    """
+    return prerender.prerender_posts(post_ids)
+
+
+def prerender_changed_pages(previous, related):
+    # the pages list the related posts, only rewrite those whose list changed
+    if settings.BLOG_PRERENDER_POSTS:
+        prerender.prerender_posts([pk for pk, ids in related.items() if previous.get(pk) != ids])
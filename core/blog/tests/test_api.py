@@ -2,6 +2,8 @@ import pytest
 from rest_framework.test import APIClient
 from django.urls import reverse
 from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from blog.models import Post, Category
 from accounts.models import User, Profile
 
@@ -40,6 +42,25 @@ class TestPostModelViewSet:
         response = api_client.get(url)
         assert response.status_code == 200
 
+    def test_search_post_list(self, api_client, create_profile):
+        for slug, title, content in [
+            ("in-content", "Some tips", "A post about Django."),
+            ("in-title", "Django tips", "Nothing to see here."),
+            ("unrelated", "Cooking", "Pasta and sauce."),
+        ]:
+            Post.objects.create(
+                author=create_profile,
+                title=title,
+                slug=slug,
+                content=content,
+                status=True,
+                published_date=timezone.now()
+            )
+        url = reverse("blog:api-v1:post-list")
+        response = api_client.get(url, {"search": "django"})
+        assert response.status_code == 200
+        assert [post["title"] for post in response.data["results"]] == ["Django tips", "Some tips"]
+
     def test_create_post(self, api_client, authenticate_user, create_profile):
         category = Category.objects.create(name="Test Category")
         url = reverse("blog:api-v1:post-list")
@@ -86,6 +107,167 @@ class TestPostModelViewSet:
         assert response.status_code == 204
         assert not Post.objects.filter(pk=post.pk).exists()
 
+@pytest.mark.django_db
+class TestScheduledPostApi:
+    @pytest.fixture
+    def scheduled_post(self, authenticate_user):
+        return Post.objects.create(
+            author=Profile.objects.get(user=authenticate_user),
+            title="Launch",
+            slug="launch",
+            content="Coming soon.",
+            status=True,
+            published_date=timezone.now() + timezone.timedelta(days=1),
+        )
+
+    def url(self, post):
+        return reverse("blog:api-v1:post-detail", kwargs={"pk": post.pk})
+
+    def test_author_can_read_and_edit_it(self, api_client, scheduled_post):
+        assert api_client.get(self.url(scheduled_post)).status_code == 200
+        response = api_client.patch(self.url(scheduled_post), {"title": "Launch day"})
+        assert response.status_code == 200
+        scheduled_post.refresh_from_db()
+        assert scheduled_post.title == "Launch day"
+        assert api_client.delete(self.url(scheduled_post)).status_code == 204
+        assert not Post.objects.filter(pk=scheduled_post.pk).exists()
+
+    def test_hidden_from_everyone_else(self, scheduled_post, create_user):
+        assert APIClient().get(self.url(scheduled_post)).status_code == 404
+        client = APIClient()
+        client.force_authenticate(user=create_user(email="other@example.com"))
+        assert client.get(self.url(scheduled_post)).status_code == 404
+        assert client.patch(self.url(scheduled_post), {"title": "Mine"}).status_code == 404
+        assert client.delete(self.url(scheduled_post)).status_code == 404
+        assert Post.objects.filter(pk=scheduled_post.pk, title="Launch").exists()
+
+
+@pytest.mark.django_db
+class TestPostCursorPagination:
+    @pytest.fixture
+    def create_posts(self, create_profile):
+        category = Category.objects.create(name="Test Category")
+        now = timezone.now()
+        return [
+            Post.objects.create(
+                author=create_profile,
+                title=f"Test Post {i}",
+                slug=f"test-post-{i}",
+                content="This is a test post.",
+                status=True,
+                category=category if i % 2 else None,
+                # pairs of posts share a published date
+                published_date=now - timezone.timedelta(days=i // 2),
+            )
+            for i in range(25)
+        ]
+
+    def walk(self, api_client, url, params=None):
+        response = api_client.get(url, params)
+        pages = [response.data]
+        while response.data["next"]:
+            response = api_client.get(response.data["next"])
+            pages.append(response.data)
+        return pages
+
+    def test_cursor_pages(self, api_client, create_posts):
+        url = reverse("blog:api-v1:post-list")
+        pages = self.walk(api_client, url, {"pagination": "cursor"})
+        ids = [post["id"] for page in pages for post in page["results"]]
+        expected = sorted(create_posts, key=lambda post: (post.published_date, post.id), reverse=True)
+        assert ids == [post.id for post in expected]
+        assert [len(page["results"]) for page in pages] == [10, 10, 5]
+        assert pages[0]["previous"] is None
+        assert "count" not in pages[0]
+
+        previous = api_client.get(pages[2]["previous"]).data
+        assert previous["results"] == pages[1]["results"]
+
+    def test_cursor_pages_with_ordering_and_filter(self, api_client, create_posts):
+        url = reverse("blog:api-v1:post-list")
+        category = create_posts[1].category
+        pages = self.walk(api_client, url, {"pagination": "cursor", "ordering": "published_date", "category": category.id})
+        ids = [post["id"] for page in pages for post in page["results"]]
+        expected = sorted(
+            (post for post in create_posts if post.category == category),
+            key=lambda post: (post.published_date, post.id),
+        )
+        assert ids == [post.id for post in expected]
+
+    def test_cursor_page_does_not_count(self, api_client, create_posts):
+        url = reverse("blog:api-v1:post-list")
+        first = api_client.get(url, {"pagination": "cursor"}).data
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(first["next"])
+        assert not [q for q in queries if "COUNT(" in q["sql"]]
+
+    def test_invalid_cursor(self, api_client):
+        url = reverse("blog:api-v1:post-list")
+        response = api_client.get(url, {"cursor": "bm9wZQ=="})
+        assert response.status_code == 404
+
+@pytest.mark.django_db
+class TestPostResponseCache:
+    @pytest.fixture
+    def create_post(self, create_profile):
+        category = Category.objects.create(name="Test Category")
+        return Post.objects.create(
+            author=create_profile,
+            title="Test Post",
+            slug="test-post",
+            content="This is a test post.",
+            status=True,
+            category=category,
+            published_date=timezone.now()
+        )
+
+    def test_list_is_cached_until_a_post_changes(self, api_client, create_post, django_assert_num_queries):
+        url = reverse("blog:api-v1:post-list")
+        api_client.get(url)
+        with django_assert_num_queries(0):
+            response = api_client.get(url)
+        assert response.data["results"][0]["title"] == "Test Post"
+
+        create_post.title = "Updated Post"
+        create_post.save()
+        response = api_client.get(url)
+        assert response.data["results"][0]["title"] == "Updated Post"
+
+    def test_list_cache_key_includes_params(self, api_client, create_post):
+        url = reverse("blog:api-v1:post-list")
+        assert api_client.get(url).data["count"] == 1
+        assert api_client.get(url, {"search": "nothing"}).data["count"] == 0
+
+    def test_retrieve_is_cached_until_its_category_changes(self, api_client, create_post, django_assert_num_queries):
+        url = reverse("blog:api-v1:post-detail", kwargs={"pk": create_post.pk})
+        api_client.get(url)
+        with django_assert_num_queries(0):
+            response = api_client.get(url)
+        assert response.data["category"]["name"] == "Test Category"
+
+        create_post.category.name = "Renamed"
+        create_post.category.save()
+        response = api_client.get(url)
+        assert response.data["category"]["name"] == "Renamed"
+
+    def test_conditional_get(self, api_client, create_post):
+        url = reverse("blog:api-v1:post-detail", kwargs={"pk": create_post.pk})
+        response = api_client.get(url)
+        assert response["Last-Modified"]
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+
+        create_post.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 200
+
+    def test_authenticated_responses_are_not_cached(self, api_client, create_post, authenticate_user):
+        url = reverse("blog:api-v1:post-list")
+        api_client.get(url)
+        Post.objects.filter(pk=create_post.pk).update(title="Updated Post")
+        response = api_client.get(url)
+        assert response.data["results"][0]["title"] == "Updated Post"
+
 @pytest.mark.django_db
 class TestCategoryModelViewSet:
     def test_get_category_list(self, api_client, authenticate_user):
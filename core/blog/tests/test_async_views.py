@@ -0,0 +1,198 @@
+import pytest
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import AsyncClient, Client
+from django.urls import resolve, reverse
+from django.core.cache import cache
+from django.utils import timezone
+from asgiref.sync import async_to_sync
+from blog.cache import CATEGORIES_CACHE_KEY
+from blog.models import Post, Category
+from blog.views import AsyncHomeView, AsyncPostDetailView
+from comment.models import Comment
+from accounts.models import Profile
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def create_profile(create_user):
+    user = create_user(email='test@example.com')
+    profile = Profile.objects.get(user=user)
+    return profile
+
+@pytest.fixture
+def create_posts(create_profile):
+    category = Category.objects.create(name="Test Category")
+    return [
+        Post.objects.create(
+            author=create_profile,
+            title=f"Test Post {i}",
+            slug=f"test-post-{i}",
+            content="This is a test post.",
+            status=True,
+            category=category,
+            published_date=timezone.now(),
+        )
+        for i in range(15)
+    ]
+
+def get(path, data=None, **extra):
+    # AsyncClient runs the view on the event loop, a sync database call raises there
+    return async_to_sync(AsyncClient().get)(path, data, **extra)
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("async_views")
+class TestAsyncViews:
+    def test_urls_use_async_views(self):
+        assert resolve(reverse("blog:home")).func.view_class is AsyncHomeView
+        detail = resolve(reverse("blog:post-detail", kwargs={"slug": "x"}))
+        assert detail.func.view_class is AsyncPostDetailView
+
+    def test_home_view(self, create_posts):
+        response = get(reverse("blog:home"), {"page": 2})
+        assert response.status_code == 200
+        assert response.context["page_obj"].number == 2
+        assert response.context["is_paginated"]
+        assert [post.pk for post in response.context["post_list"]] == [post.pk for post in create_posts[2::-1]]
+        assert [category.name for category in response.context["categories"]] == ["Test Category"]
+
+    def test_home_view_matches_sync_view(self, create_posts, settings):
+        async_content = get(reverse("blog:home"), {"category": "all", "query": "post"}).content
+        settings.ASYNC_VIEWS = False
+        sync_content = Client().get(reverse("blog:home"), {"category": "all", "query": "post"}).content
+        assert async_content == sync_content
+
+    def test_home_view_invalid_page(self, create_posts):
+        assert get(reverse("blog:home"), {"page": 9}).status_code == 404
+        assert get(reverse("blog:home"), {"page": "first"}).status_code == 404
+        assert get(reverse("blog:home"), {"page": "last"}).context["page_obj"].number == 2
+
+    def test_post_detail_view(self, create_posts):
+        post = create_posts[0]
+        comment = Comment.objects.create(post=post, name="A", email="a@example.com", message="First")
+        Comment.objects.create(post=post, reply_to=comment, name="B", email="b@example.com", message="Reply")
+        response = get(reverse("blog:post-detail", kwargs={"slug": post.slug}))
+        assert response.status_code == 200
+        assert response.context["post"] == post
+        assert response.context["post"].views == 1
+        assert [reply.message for reply in response.context["comments"][0].thread_replies] == ["Reply"]
+        # not computed yet, the newest posts of the category
+        assert response.context["related_posts"] == create_posts[:0:-1][:3]
+
+    def test_post_detail_view_as_author(self, create_posts):
+        client = AsyncClient()
+        client.force_login(create_posts[0].author.user)
+        url = reverse("blog:post-detail", kwargs={"slug": create_posts[0].slug})
+        response = async_to_sync(client.get)(url)
+        assert response.status_code == 200
+        assert reverse("blog:post-update", kwargs={"slug": create_posts[0].slug}) in response.content.decode()
+
+    def test_post_detail_view_hides_scheduled_posts(self, create_posts):
+        post = create_posts[0]
+        Post.objects.filter(pk=post.pk).update(published_date=timezone.now() + timedelta(days=1))
+        url = reverse("blog:post-detail", kwargs={"slug": post.slug})
+        assert get(url).status_code == 404
+        client = AsyncClient()
+        client.force_login(post.author.user)
+        assert async_to_sync(client.get)(url).status_code == 200
+
+    def test_post_detail_view_uses_async_cache_calls(self, create_posts):
+        url = reverse("blog:post-detail", kwargs={"slug": create_posts[0].slug})
+        # the sync versions would block the event loop on the cache
+        with patch("blog.views.get_related_ids", side_effect=AssertionError), \
+                patch("blog.counters.LocMemViewCounter.hit", return_value=1) as hit:
+            assert get(url).status_code == 200
+        hit.assert_called_once_with(create_posts[0].pk, 1)
+
+    def test_post_detail_view_counts_the_hit_off_the_sync_thread(self, create_posts):
+        threads = []
+
+        def hit(post_id, amount=1):
+            threads.append(threading.current_thread())
+            return 1
+
+        url = reverse("blog:post-detail", kwargs={"slug": create_posts[0].slug})
+        with patch("blog.counters.LocMemViewCounter.hit", side_effect=hit):
+            assert get(url).status_code == 200
+        # async_to_sync runs the thread sensitive code in the main thread
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_post_detail_view_not_found(self):
+        assert get(reverse("blog:post-detail", kwargs={"slug": "missing"})).status_code == 404
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("async_views")
+class TestAsyncPostApi:
+    def test_list(self, create_posts):
+        response = get(reverse("blog:api-v1:post-list"), {"page": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 15
+        assert data["previous"] is not None
+        assert [row["id"] for row in data["results"]] == [post.pk for post in create_posts[10:]]
+        assert data["results"][0]["category"] == {"id": create_posts[0].category_id, "name": "Test Category"}
+        assert response.headers["ETag"]
+
+    def test_list_matches_sync_list(self, create_posts, settings):
+        url = reverse("blog:api-v1:post-list")
+        for query in [{}, {"category": create_posts[0].category_id}, {"search": "test"}, {"ordering": "-published_date"}]:
+            async_data = get(url, query).json()
+            # so the sync view doesn't answer from the entry cached by the async one
+            cache.clear()
+            settings.ASYNC_VIEWS = False
+            sync_data = Client().get(url, query).json()
+            settings.ASYNC_VIEWS = True
+            assert async_data == sync_data, query
+
+    def test_list_uses_async_cache_calls(self, create_posts):
+        with patch("blog.api.v1.mixins.get_generations", side_effect=AssertionError):
+            assert get(reverse("blog:api-v1:post-list")).status_code == 200
+            assert get(reverse("blog:api-v1:post-detail", kwargs={"pk": create_posts[0].pk})).status_code == 200
+
+    def test_list_with_stale_categories(self, create_posts):
+        # a category missing from the cached ones is read with the post, not lazily
+        cache.set(CATEGORIES_CACHE_KEY, [], timeout=None)
+        response = get(reverse("blog:api-v1:post-list"))
+        assert response.status_code == 200
+        assert response.json()["results"][0]["category"]["name"] == "Test Category"
+
+    def test_list_cursor_pagination(self, create_posts):
+        response = get(reverse("blog:api-v1:post-list"), {"pagination": "cursor"})
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 10
+
+    def test_list_invalid_page(self, create_posts):
+        assert get(reverse("blog:api-v1:post-list"), {"page": 5}).status_code == 404
+
+    def test_list_conditional_get(self, create_posts):
+        url = reverse("blog:api-v1:post-list")
+        etag = get(url).headers["ETag"]
+        assert get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_retrieve(self, create_posts):
+        post = create_posts[0]
+        response = get(reverse("blog:api-v1:post-detail", kwargs={"pk": post.pk}))
+        assert response.status_code == 200
+        assert response.json()["content"] == post.content
+        assert response.json()["category"]["name"] == "Test Category"
+
+    def test_retrieve_not_found(self):
+        response = get(reverse("blog:api-v1:post-detail", kwargs={"pk": 999}))
+        assert response.status_code == 404
+        response = get(reverse("blog:api-v1:post-detail", kwargs={"pk": "abc"}))
+        assert response.status_code == 404
+
+    def test_authenticated_requests_use_sync_view(self, create_posts, create_user):
+        client = Client()
+        client.force_login(create_user(email="reader@example.com"))
+        response = client.get(reverse("blog:api-v1:post-list"))
+        assert response.status_code == 200
+        assert response.json()["count"] == 15
@@ -0,0 +1,57 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F as models_f
+from blog.models import Post, Category
+from blog.rendering import RENDERER_VERSION
+from blog.search import get_search_backend
+from accounts.models import User, Profile, UsedToken
+from accounts.replay import is_token_used
+from comment.models import Comment
+
+def generate(capsys, *args):
+    call_command("add_dummy_data", "--chunk-size", "4", *args)
+    return capsys.readouterr().out
+
+@pytest.mark.django_db
+class TestAddDummyData:
+    def test_generates_everything(self, capsys):
+        output = generate(capsys, "--users", "5", "--categories", "6", "--posts", "10", "--comments", "4", "--tokens", "7")
+
+        assert User.objects.count() == Profile.objects.count() == 5
+        assert Category.objects.count() == 6
+        assert Post.objects.count() == 10
+        assert UsedToken.objects.count() == 7
+        assert "posts: 10 rows" in output and "rows/sec" in output
+
+        comments = Post.objects.annotate(actual=Count("comments"))
+        assert all(post.comment_count == post.actual for post in comments)
+        assert all(post.content_html_version == RENDERER_VERSION for post in Post.objects.all())
+        assert all(category.post_count == category.posts.count() for category in Category.objects.all())
+        # the replies belong to the post of the comment they reply to
+        assert not Comment.objects.exclude(reply_to=None).exclude(reply_to__post=models_f("post")).exists()
+        assert User.objects.first().check_password("password123")
+        assert is_token_used(UsedToken.objects.first().token_jti)
+
+        post = Post.objects.filter(status=True).first()
+        assert post in get_search_backend().search(Post.objects.all(), post.title.split()[0])
+
+    def test_reply_depth(self, capsys):
+        generate(capsys, "--users", "1", "--posts", "20", "--comments", "10", "--reply-depth", "1")
+        assert not Comment.objects.filter(reply_to__reply_to__isnull=False).exists()
+        assert Comment.objects.filter(reply_to__isnull=False).exists()
+
+    def test_same_seed_same_data(self, capsys):
+        generate(capsys, "--users", "2", "--posts", "6", "--seed", "7")
+        first = list(Post.objects.order_by("id").values_list("title", "content", "views"))
+        generate(capsys, "--users", "2", "--posts", "6", "--seed", "7")
+        second = list(Post.objects.order_by("id").values_list("title", "content", "views"))[6:]
+        assert first == second
+        # unique columns still get new values
+        assert Post.objects.values("slug").distinct().count() == 12
+        assert User.objects.values("email").distinct().count() == 4
+
+    def test_existing_user(self, capsys, django_user_model):
+        user = django_user_model.objects.create_user(email="author@example.com", password="password123")
+        generate(capsys, "author@example.com", "--users", "0", "--posts", "3")
+        assert Post.objects.filter(author__user=user).count() == 3
+        assert Profile.objects.get(user=user).first_name
@@ -25,6 +25,40 @@ class TestCategoryModel:
         assert category.name == "Test Category"
         assert str(category) == "Test Category"
 
+    def test_post_count(self, create_profile):
+        tech, ai = Category.objects.create(name="Tech"), Category.objects.create(name="AI")
+        assert tech.post_count == 0 and tech.emptied_at is not None
+
+        post = Post.objects.create(author=create_profile, title="Post", slug="post", content="Content",
+                                   status=True, category=tech, published_date=timezone.now())
+        Post.objects.create(author=create_profile, title="Other", slug="other", content="Content",
+                            status=False, category=tech, published_date=timezone.now())
+        tech.refresh_from_db()
+        assert (tech.post_count, tech.emptied_at) == (2, None)
+
+        post.category = ai
+        post.save()
+        post.title = "Renamed"
+        post.save(update_fields=["title"])
+        tech.refresh_from_db()
+        ai.refresh_from_db()
+        assert (tech.post_count, ai.post_count) == (1, 1)
+
+        post.delete()
+        ai.refresh_from_db()
+        assert ai.post_count == 0 and ai.emptied_at is not None
+
+    def test_recount(self, create_profile):
+        tech = Category.objects.create(name="Tech")
+        Post.objects.bulk_create(
+            Post(author=create_profile, title=f"Post {i}", slug=f"post-{i}", content="Content",
+                 status=True, category=tech, published_date=timezone.now())
+            for i in range(3)
+        )
+        Category.objects.all().recount()
+        tech.refresh_from_db()
+        assert (tech.post_count, tech.emptied_at) == (3, None)
+
 @pytest.mark.django_db
 class TestPostModel:
     def test_create_post(self, create_profile):
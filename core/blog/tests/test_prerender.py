@@ -0,0 +1,166 @@
+import pytest
+from unittest.mock import patch
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from blog.models import Post, Category
+from blog.prerender import page_name, prerender_posts
+from blog.related import get_related_ids
+from blog.tasks import compute_related_posts
+from comment.models import Comment
+from comment.tasks import drain_comment_buffer, COMMENT_BUFFER
+from core.buffers import get_buffer
+from accounts.models import Profile
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def create_profile(create_user):
+    user = create_user(email='test@example.com')
+    profile = Profile.objects.get(user=user)
+    return profile
+
+@pytest.fixture
+def create_post(create_profile):
+    return Post.objects.create(
+        author=create_profile,
+        title="Test Post",
+        slug="test-post",
+        content="This is a test post.",
+        status=True,
+        views=10,
+        category=Category.objects.create(name="Test Category"),
+        published_date=timezone.now()
+    )
+
+@pytest.fixture
+def prerender(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_PRERENDER_POSTS = True
+    return tmp_path
+
+def page(media_root, slug):
+    path = media_root / page_name(slug)
+    return path.read_text() if path.exists() else None
+
+@pytest.mark.django_db
+class TestPrerenderPosts:
+    def test_writes_published_posts(self, create_post, prerender):
+        Comment.objects.create(post=create_post, name="Reader", email="reader@example.com", message="Nice post.")
+        assert prerender_posts([create_post.pk]) == 1
+
+        content = page(prerender, "test-post")
+        assert "Test Post" in content and "Nice post." in content
+        assert reverse("blog:post-live", kwargs={"slug": "test-post"}) in content
+        # nothing from a request ends up in a page every visitor gets
+        assert 'type="hidden" name="csrfmiddlewaretoken"' not in content
+        assert '<span id="author-links" class="hidden">' in content
+        assert not list(prerender.glob("prerendered/posts/*.tmp"))
+
+    def test_removes_unpublished_posts(self, create_post, prerender):
+        prerender_posts([create_post.pk])
+        Post.objects.filter(pk=create_post.pk).update(status=False)
+        assert prerender_posts([create_post.pk]) == 0
+        assert page(prerender, "test-post") is None
+
+    def test_command(self, create_post, prerender):
+        call_command("prerender_posts")
+        assert page(prerender, "test-post") is not None
+        call_command("prerender_posts", "--clear")
+        assert page(prerender, "test-post") is None
+
+    def test_related_posts_change(self, create_profile, create_post, prerender):
+        other = Post.objects.create(
+            author=create_profile, title="Test Post again", slug="other-post", content="This is a test post too.",
+            status=True, category=create_post.category, published_date=timezone.now()
+        )
+        compute_related_posts(other.pk)
+        assert get_related_ids(create_post.pk) == [other.pk]
+        assert 'href="/posts/other-post"' in page(prerender, "test-post")
+        assert page(prerender, "other-post") is not None
+
+        # the lists stay the same, the pages are left alone
+        (prerender / page_name("test-post")).unlink()
+        compute_related_posts(other.pk)
+        assert page(prerender, "test-post") is None
+
+@pytest.mark.django_db
+class TestPrerenderSignals:
+    @patch("blog.signals.compute_related_posts.delay")
+    @patch("blog.signals.prerender_posts.delay")
+    def test_post_save_and_delete(self, mock_delay, mock_related, create_post, prerender, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            create_post.title = "New title"
+            create_post.save()
+        mock_delay.assert_called_once_with([create_post.pk])
+
+        prerender_posts([create_post.pk])
+        with django_capture_on_commit_callbacks(execute=True):
+            create_post.slug = "new-slug"
+            create_post.save()
+        assert page(prerender, "test-post") is None
+
+        prerender_posts([create_post.pk])
+        with django_capture_on_commit_callbacks(execute=True):
+            create_post.delete()
+        assert page(prerender, "new-slug") is None
+
+    @patch("blog.signals.prerender_posts.delay")
+    def test_category_rename(self, mock_delay, create_post, prerender, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            create_post.category.name = "Renamed"
+            create_post.category.save()
+        mock_delay.assert_called_once_with([create_post.pk])
+
+    @patch("comment.signals.prerender_posts.delay")
+    def test_comment_created(self, mock_delay, create_post, prerender, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            Comment.objects.create(post=create_post, name="Reader", email="reader@example.com", message="Nice.")
+        mock_delay.assert_called_once_with([create_post.pk])
+
+    @patch("comment.tasks.prerender_posts.delay")
+    def test_comments_created_in_batch(self, mock_delay, create_post, prerender, django_capture_on_commit_callbacks):
+        get_buffer(COMMENT_BUFFER).push({
+            "task_id": "task", "post_id": create_post.pk, "reply_to_id": None,
+            "name": "Reader", "email": "reader@example.com", "message": "Nice.",
+        })
+        with django_capture_on_commit_callbacks(execute=True):
+            assert drain_comment_buffer() == 1
+        mock_delay.assert_called_once_with([create_post.pk])
+
+    @patch("blog.signals.prerender_posts.delay")
+    def test_disabled(self, mock_delay, create_post, settings, django_capture_on_commit_callbacks):
+        settings.BLOG_PRERENDER_POSTS = False
+        with patch("blog.signals.compute_related_posts.delay"), django_capture_on_commit_callbacks(execute=True):
+            create_post.save()
+        mock_delay.assert_not_called()
+
+@pytest.mark.django_db
+class TestPostLiveView:
+    def test_anonymous(self, client, create_post):
+        url = reverse("blog:post-live", kwargs={"slug": "test-post"})
+        assert client.get(url).json()["views"] == 11
+        response = client.get(url)
+        data = response.json()
+        assert data["views"] == 12
+        assert data["is_author"] is False
+        assert data["csrf_token"]
+        assert "csrftoken" in response.cookies
+        assert "no-cache" in response.headers["Cache-Control"]
+
+    def test_author(self, client, create_post):
+        client.force_login(create_post.author.user)
+        response = client.get(reverse("blog:post-live", kwargs={"slug": "test-post"}))
+        assert response.json()["is_author"] is True
+
+    def test_unpublished(self, client, create_post):
+        Post.objects.filter(pk=create_post.pk).update(status=False)
+        response = client.get(reverse("blog:post-live", kwargs={"slug": "test-post"}))
+        assert response.status_code == 404
@@ -0,0 +1,75 @@
+import pytest
+from django.utils import timezone
+from blog.models import Post, Category
+from blog.related import get_related_ids
+from blog.tasks import compute_related_posts, rebuild_related_posts
+from accounts.models import Profile
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def create_profile(create_user):
+    user = create_user(email='test@example.com')
+    profile = Profile.objects.get(user=user)
+    return profile
+
+@pytest.fixture
+def create_post(create_profile):
+    def make_post(slug, title, content, category=None, status=True):
+        return Post.objects.create(
+            author=create_profile,
+            title=title,
+            slug=slug,
+            content=content,
+            category=category,
+            status=status,
+            published_date=timezone.now()
+        )
+    return make_post
+
+@pytest.mark.django_db
+class TestRelatedPosts:
+    def test_compute_related_posts_ranks_similar_posts_first(self, create_post):
+        django = create_post("django", "Django ORM tips", "Querysets, select_related and prefetch_related in Django.")
+        create_post("baking", "Baking bread", "Flour, water, salt and a long proof.")
+        orm = create_post("orm", "Faster Django querysets", "Avoid N+1 queries with select_related.")
+        create_post("garden", "Garden planning", "Tomatoes need sun and water.")
+
+        assert compute_related_posts(django.pk)[0] == orm.pk
+        assert get_related_ids(django.pk)[0] == orm.pk
+        # the neighbours learn about the saved post as well
+        assert get_related_ids(orm.pk)[0] == django.pk
+
+    def test_same_category_is_preferred(self, create_post):
+        news = Category.objects.create(name="News")
+        post = create_post("first", "Weekly update", "Release notes for the week.", category=news)
+        create_post("second", "Weekly digest", "Release notes for the week.")
+        same_category = create_post("third", "Weekly digest", "Release notes for the week.", category=news)
+
+        assert compute_related_posts(post.pk)[0] == same_category.pk
+
+    def test_unrelated_and_draft_posts_are_left_out(self, create_post):
+        post = create_post("django", "Django ORM tips", "Querysets in Django.")
+        create_post("baking", "Baking bread", "Flour and water.")
+        create_post("draft", "Django ORM drafts", "Querysets in Django.", status=False)
+
+        assert compute_related_posts(post.pk) == []
+
+    def test_compute_related_posts_for_missing_post(self):
+        assert compute_related_posts(1) == []
+
+    def test_rebuild_related_posts(self, create_post):
+        first = create_post("first", "Django ORM tips", "Querysets in Django.")
+        second = create_post("second", "Django ORM tricks", "Querysets in Django.")
+        create_post("draft", "Django ORM drafts", "Querysets in Django.", status=False)
+
+        assert rebuild_related_posts() == 2
+        assert get_related_ids(first.pk) == [second.pk]
+        assert get_related_ids(second.pk) == [first.pk]
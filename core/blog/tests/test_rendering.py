@@ -0,0 +1,91 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from blog.models import Post
+from blog.rendering import RENDERER_VERSION, render_content
+from core.sanitizer import sanitize_html
+from accounts.models import Profile
+
+@pytest.fixture
+def create_profile(django_user_model):
+    user = django_user_model.objects.create_user(email='test@example.com', password='password123')
+    return Profile.objects.get(user=user)
+
+def make_post(profile, i=0, **kwargs):
+    return Post(
+        author=profile,
+        title=f"Test Post {i}",
+        slug=f"test-post-{i}",
+        content=f"# Post {i}\n\nSome *markdown*.",
+        status=True,
+        published_date=timezone.now(),
+        **kwargs,
+    )
+
+class TestSanitizer:
+    @pytest.mark.parametrize("html, expected", [
+        ("<p>Hi <b>there</b></p>", "<p>Hi <b>there</b></p>"),
+        ("<p onclick=\"x()\">Hi</p>", "<p>Hi</p>"),
+        ("<script>alert(1)</script><p>Hi</p>", "<p>Hi</p>"),
+        ("<style>p {}</style><span>Hi</span>", "Hi"),
+        ("<a href=\"javascript:alert(1)\">x</a>", "<a>x</a>"),
+        ("<a href=\"java\tscript:alert(1)\">x</a>", "<a>x</a>"),
+        ("<a href=\"&#106;avascript:alert(1)\">x</a>", "<a>x</a>"),
+        ("<a href=\"\x01javascript:alert(1)\">x</a>", "<a>x</a>"),
+        ("<a href=\"/posts/other\" title='a \"b\"'>x</a>", "<a href=\"/posts/other\" title=\"a &quot;b&quot;\">x</a>"),
+        ("<img src=\"https://example.com/a.png\" onerror=\"x()\">", "<img src=\"https://example.com/a.png\">"),
+        ("<p><em>unclosed", "<p><em>unclosed</em></p>"),
+        ("<ul><li>one</ul></li>", "<ul><li>one</li></ul>"),
+        ("1 &lt; 2 &amp;&amp; <!-- comment -->3 > 2", "1 &lt; 2 &amp;&amp; 3 &gt; 2"),
+        # void, nothing to drop after it
+        ("<p>a<embed src=x>b</p><p>rest</p>", "<p>ab</p><p>rest</p>"),
+        ("<p>a<embed src=x />b</embed>c</p>", "<p>abc</p>"),
+        # unclosed, dropped until the element around it ends
+        ("<p>a<object>b<iframe>c</p><p>rest</p>", "<p>a</p><p>rest</p>"),
+        ("<object>a<iframe>b</object>c", "c"),
+        ("<p>a<textarea>b", "<p>a</p>"),
+    ])
+    def test_sanitize_html(self, html, expected):
+        assert sanitize_html(html) == expected
+
+    def test_render_content(self):
+        html = render_content("# Title\n\n```python\nprint('<hi>')\n```\n\n<div onmouseover=\"x()\">raw</div>")
+        assert html == (
+            "<h1>Title</h1>\n<pre><code class=\"language-python\">print('&lt;hi&gt;')\n</code></pre>\n"
+            "<div>raw</div>"
+        )
+
+@pytest.mark.django_db
+class TestContentHtml:
+    def test_rendered_on_save(self, create_profile):
+        post = make_post(create_profile)
+        post.save()
+        assert post.content_html == "<h1>Post 0</h1>\n<p>Some <em>markdown</em>.</p>"
+        assert post.content_html_version == RENDERER_VERSION
+
+        post.content = "Changed"
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        assert post.content_html == "<p>Changed</p>"
+
+    def test_rows_without_html_are_rendered_on_the_fly(self, create_profile):
+        (post,) = Post.objects.bulk_create([make_post(create_profile)])
+        assert post.content_html == ""
+        assert post.html_content == "<h1>Post 0</h1>\n<p>Some <em>markdown</em>.</p>"
+
+    def test_rerender_posts(self, create_profile, capsys):
+        stale = Post.objects.bulk_create(
+            [make_post(create_profile, i) for i in range(3)]
+            + [make_post(create_profile, 3, content_html="<p>old</p>", content_html_version="0-markdown-1.0")]
+        )
+        current = make_post(create_profile, 4)
+        current.save()
+        Post.objects.filter(pk=current.pk).update(content_html="<p>kept</p>")
+
+        call_command("rerender_posts", "--workers", "2", "--chunk-size", "2")
+
+        assert "4 posts rendered" in capsys.readouterr().out
+        for post in Post.objects.filter(pk__in=[post.pk for post in stale]):
+            assert post.content_html_version == RENDERER_VERSION
+            assert post.content_html == render_content(post.content)
+        assert Post.objects.get(pk=current.pk).content_html == "<p>kept</p>"
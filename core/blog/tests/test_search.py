@@ -0,0 +1,68 @@
+import pytest
+from django.utils import timezone
+from blog.models import Post
+from blog.search import get_search_backend
+from accounts.models import Profile
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def create_profile(create_user):
+    user = create_user(email='test@example.com')
+    profile = Profile.objects.get(user=user)
+    return profile
+
+@pytest.fixture
+def create_post(create_profile):
+    def make_post(slug, title, content):
+        return Post.objects.create(
+            author=create_profile,
+            title=title,
+            slug=slug,
+            content=content,
+            status=True,
+            published_date=timezone.now()
+        )
+    return make_post
+
+@pytest.mark.django_db
+class TestSearchBackend:
+    def search(self, query):
+        return list(get_search_backend().search(Post.objects.all(), query))
+
+    def test_search_matches_title_or_content(self, create_post):
+        in_title = create_post("django-title", "Django tips", "Nothing to see here.")
+        in_content = create_post("django-content", "Some tips", "A post about Django.")
+        create_post("unrelated", "Cooking", "Pasta and sauce.")
+        assert set(self.search("django")) == {in_title, in_content}
+
+    def test_search_ranks_title_matches_first(self, create_post):
+        in_content = create_post("django-content", "Some tips", "A post about Django.")
+        in_title = create_post("django-title", "Django tips", "Nothing to see here.")
+        assert self.search("django") == [in_title, in_content]
+
+    def test_search_matches_prefix(self, create_post):
+        post = create_post("blockchain", "Blockchain basics", "Ledgers.")
+        assert self.search("block") == [post]
+
+    def test_index_follows_updates_and_deletes(self, create_post):
+        post = create_post("django", "Django tips", "Nothing to see here.")
+        post.title = "Flask tips"
+        post.save()
+        assert self.search("django") == []
+        assert self.search("flask") == [post]
+        post.delete()
+        assert self.search("flask") == []
+
+    def test_search_ignores_query_syntax(self, create_post):
+        post = create_post("django", "Django tips", "Nothing to see here.")
+        assert self.search('django" OR NEAR(') == []
+        assert self.search('"django"') == [post]
+        assert self.search("*") == []
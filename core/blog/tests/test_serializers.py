@@ -59,6 +59,7 @@ class TestPostSerializer:
         serializer = PostSerializer(instance=post, context={'request': drf_request})
         
         assert "content" not in serializer.data
+        assert "content_html" not in serializer.data
         assert "snippet" in serializer.data
         assert "relative_url" in serializer.data
         assert "absolute_url" in serializer.data
@@ -82,10 +83,45 @@ class TestPostSerializer:
         serializer = PostSerializer(instance=post, context={'request': drf_request})
 
         assert "content" in serializer.data
+        assert serializer.data["content_html"] == "<p>This is a test post.</p>"
         assert "snippet" not in serializer.data
         assert "relative_url" not in serializer.data
         assert "absolute_url" not in serializer.data
 
+    def test_post_list_serializer_matches_post_serializer(self, create_profile, request_factory):
+        category = Category.objects.create(name="Test Category")
+        posts = [
+            Post.objects.create(
+                author=create_profile,
+                title=f"Test Post {i}",
+                slug=f"test-post-{i}",
+                content="This is a test post.",
+                status=True,
+                category=category if i % 2 else None,
+                image="post.jpg" if i == 1 else None,
+                image_variants={
+                    "source": "post.jpg",
+                    "webp": [{"width": 320, "name": "variants/post.jpg/320w.webp"}],
+                    "jpeg": [{"width": 320, "name": "variants/post.jpg/320w.jpeg"}],
+                } if i == 1 else {},
+                published_date=timezone.now()
+            )
+            for i in range(3)
+        ]
+        request = request_factory.get('/blog/api/v1/post/')
+        drf_request = Request(request)
+        drf_request.parser_context = {'kwargs': {}}
+        context = {'request': drf_request}
+
+        expected = [PostSerializer(instance=post, context=context).data for post in posts]
+        serializer = PostSerializer(instance=posts, many=True, context=context)
+        assert serializer.data == expected
+        assert expected[1]["image_srcset"] == {
+            "webp": "http://testserver/media/variants/post.jpg/320w.webp 320w",
+            "jpeg": "http://testserver/media/variants/post.jpg/320w.jpeg 320w",
+        }
+        assert [list(row) for row in serializer.data] == [list(row) for row in expected]
+
     def test_post_serializer_create(self, create_profile, request_factory, create_user):
         category = Category.objects.create(name="Test Category")
         user = create_user(email='test2@example.com')
@@ -0,0 +1,269 @@
+import io
+import fakeredis
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from blog.models import Post, Category
+from blog.counters import RedisViewCounter, get_view_counter
+from blog.tasks import flush_post_views, generate_post_image_variants, publish_scheduled_posts, remove_unused_categories
+from accounts.models import Profile
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def create_profile(create_user):
+    user = create_user(email='test@example.com')
+    profile = Profile.objects.get(user=user)
+    return profile
+
+@pytest.fixture
+def create_posts(create_profile):
+    return [
+        Post.objects.create(
+            author=create_profile,
+            title=f"Test Post {i}",
+            slug=f"test-post-{i}",
+            content="This is a test post.",
+            status=True,
+            views=10,
+            published_date=timezone.now()
+        )
+        for i in range(3)
+    ]
+
+@pytest.mark.django_db
+class TestFlushPostViews:
+    def test_flush_post_views(self, create_posts):
+        counter = get_view_counter()
+        first, second, third = create_posts
+        counter.hit(first.pk)
+        counter.hit(first.pk)
+        counter.hit(second.pk)
+        counter.hit(third.pk)
+
+        assert flush_post_views() == 4
+        first.refresh_from_db()
+        second.refresh_from_db()
+        third.refresh_from_db()
+        assert (first.views, second.views, third.views) == (12, 11, 11)
+        assert counter.pending(first.pk) == 0
+
+    def test_flush_post_views_without_hits(self, create_posts):
+        assert flush_post_views() == 0
+
+    def test_flush_post_views_picks_up_an_interrupted_drain(self, create_posts, settings):
+        settings.BLOG_VIEW_COUNTER = "blog.counters.RedisViewCounter"
+        first, second, _ = create_posts
+        with patch.object(RedisViewCounter, "client", fakeredis.FakeRedis()):
+            counter = get_view_counter()
+            # renamed by a worker that died before it read the hash
+            counter.client.hset(counter.draining_key, mapping={first.pk: 2, second.pk: 1})
+            counter.hit(first.pk)
+
+            assert flush_post_views() == 4
+            assert counter.pending(first.pk) == 0
+            assert not counter.client.exists(counter.draining_key)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.views, second.views) == (13, 11)
+
+
+@pytest.mark.django_db
+class TestRemoveUnusedCategories:
+    def test_removes_categories_empty_for_the_grace_period(self, create_profile, settings):
+        settings.BLOG_UNUSED_CATEGORY_GRACE = 60
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        old = Category.objects.create(name="Old", emptied_at=an_hour_ago)
+        Category.objects.create(name="New")
+        used = Category.objects.create(name="Used")
+        Post.objects.create(author=create_profile, title="Post", slug="post", content="Content",
+                            status=True, category=used, published_date=timezone.now())
+
+        assert remove_unused_categories() == 1
+        assert set(Category.objects.values_list("name", flat=True)) == {"New", "Used"}
+        assert not Category.objects.filter(pk=old.pk).exists()
+
+    def test_keeps_categories_with_uncounted_posts(self, create_profile, settings):
+        settings.BLOG_UNUSED_CATEGORY_GRACE = 60
+        category = Category.objects.create(name="Bulk", emptied_at=timezone.now() - timedelta(hours=1))
+        # bulk_create skips the receivers that count it
+        Post.objects.bulk_create([
+            Post(author=create_profile, title="Post", slug="post", content="Content",
+                 status=True, category=category, published_date=timezone.now())
+        ])
+        assert remove_unused_categories() == 0
+        category.refresh_from_db()
+        assert (category.post_count, category.emptied_at) == (1, None)
+
+@pytest.mark.django_db
+class TestPublishScheduledPosts:
+    @pytest.fixture
+    def scheduled_post(self, create_profile):
+        return Post.objects.create(
+            author=create_profile,
+            title="Launch",
+            slug="launch",
+            content="Coming soon.",
+            status=True,
+            published_date=timezone.now() + timedelta(hours=1)
+        )
+
+    def test_future_posts_are_scheduled(self, scheduled_post):
+        assert scheduled_post.scheduled
+        assert not Post.objects.visible().filter(pk=scheduled_post.pk).exists()
+        scheduled_post.status = False
+        scheduled_post.save(update_fields=["status"])
+        assert not Post.objects.get(pk=scheduled_post.pk).scheduled
+
+    @patch("blog.tasks.compute_related_posts.delay")
+    def test_publishes_due_posts(self, mock_related, client, create_posts, scheduled_post):
+        api_client = APIClient()
+        url = reverse("blog:api-v1:post-list")
+        assert "Launch" not in [post["title"] for post in api_client.get(url).json()["results"]]
+        assert "Launch" not in client.get(reverse("blog:home")).content.decode()
+        assert publish_scheduled_posts() == 0
+
+        # the publish date comes
+        Post.objects.filter(pk=scheduled_post.pk).update(published_date=timezone.now() - timedelta(seconds=1))
+        assert publish_scheduled_posts() == 1
+        assert not Post.objects.get(pk=scheduled_post.pk).scheduled
+        mock_related.assert_called_once_with(scheduled_post.pk)
+        # the cached list is expired
+        assert "Launch" in [post["title"] for post in api_client.get(url).json()["results"]]
+        assert "Launch" in client.get(reverse("blog:home")).content.decode()
+        assert publish_scheduled_posts() == 0
+
+    def test_post_page_of_scheduled_post_is_not_prerendered(self, scheduled_post, settings, tmp_path):
+        from blog.prerender import page_name, prerender_posts
+
+        settings.MEDIA_ROOT = tmp_path
+        assert prerender_posts([scheduled_post.pk]) == 0
+        assert not default_storage.exists(page_name("launch"))
+
+def image_file(width, height, orientation=None, color="red"):
+    image = Image.new("RGB", (width, height), color)
+    exif = image.getexif()
+    exif[0x010F] = "Camera maker"
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", exif=exif)
+    return ContentFile(buffer.getvalue())
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WIDTHS = [320, 640, 1280]
+    return tmp_path
+
+@pytest.mark.django_db
+class TestGeneratePostImageVariants:
+    def test_generates_variants(self, create_posts, media_root):
+        post = create_posts[0]
+        post.image.save("photo.jpg", image_file(800, 400), save=True)
+        assert generate_post_image_variants(post.pk)
+
+        post.refresh_from_db()
+        variants = post.image_variants
+        assert variants["source"] == post.image.name
+        assert (variants["width"], variants["height"]) == (800, 400)
+        for fmt, pillow_format in [("webp", "WEBP"), ("jpeg", "JPEG")]:
+            assert [variant["width"] for variant in variants[fmt]] == [320, 640]
+            with default_storage.open(variants[fmt][0]["name"]) as f, Image.open(f) as image:
+                assert image.format == pillow_format
+                assert image.size == (320, 160)
+                # the metadata is stripped
+                assert not image.getexif()
+        assert post.image_srcsets == {
+            "webp": "/media/variants/photo.jpg/320w.webp 320w, /media/variants/photo.jpg/640w.webp 640w",
+            "jpeg": "/media/variants/photo.jpg/320w.jpeg 320w, /media/variants/photo.jpg/640w.jpeg 640w",
+        }
+
+    def test_applies_orientation_and_never_upscales(self, create_posts, media_root):
+        post = create_posts[0]
+        # rotated by 90 degrees, displayed as 100x200
+        post.image.save("small.jpg", image_file(200, 100, orientation=6), save=True)
+        generate_post_image_variants(post.pk)
+
+        post.refresh_from_db()
+        assert [variant["width"] for variant in post.image_variants["jpeg"]] == [100]
+        with default_storage.open(post.image_variants["jpeg"][0]["name"]) as f, Image.open(f) as image:
+            assert image.size == (100, 200)
+
+    def test_is_idempotent(self, create_posts, media_root):
+        post = create_posts[0]
+        post.image.save("photo.jpg", image_file(800, 400), save=True)
+        generate_post_image_variants(post.pk)
+        names = sorted(path.name for path in (media_root / "variants" / "photo.jpg").iterdir())
+
+        assert not generate_post_image_variants(post.pk)
+        assert sorted(path.name for path in (media_root / "variants" / "photo.jpg").iterdir()) == names
+
+        # a lost file is generated again, under the same name
+        (media_root / "variants" / "photo.jpg" / "320w.webp").unlink()
+        assert generate_post_image_variants(post.pk)
+        assert sorted(path.name for path in (media_root / "variants" / "photo.jpg").iterdir()) == names
+
+    def test_sources_with_the_same_stem(self, create_posts, media_root):
+        first, second = create_posts[:2]
+        first.image.save("photo.png", image_file(800, 400, color="red"), save=True)
+        second.image.save("photo.jpg", image_file(800, 400, color="blue"), save=True)
+        generate_post_image_variants(first.pk)
+        generate_post_image_variants(second.pk)
+
+        for post, color in [(first, (255, 0, 0)), (second, (0, 0, 255))]:
+            post.refresh_from_db()
+            with default_storage.open(post.image_variants["webp"][0]["name"]) as f, Image.open(f) as image:
+                # each post keeps the variants of its own image
+                assert all(abs(a - b) < 8 for a, b in zip(image.convert("RGB").getpixel((0, 0)), color))
+        assert first.image_variants["webp"][0]["name"] != second.image_variants["webp"][0]["name"]
+
+    def test_replaced_and_removed_image(self, create_posts, media_root):
+        post = create_posts[0]
+        post.image.save("photo.jpg", image_file(800, 400), save=True)
+        generate_post_image_variants(post.pk)
+        assert (media_root / "variants" / "photo.jpg" / "320w.webp").exists()
+
+        post.refresh_from_db()
+        post.image.save("other.jpg", image_file(800, 400), save=True)
+        # stale variants are not offered for the new image
+        assert Post.objects.get(pk=post.pk).image_srcsets == {}
+        generate_post_image_variants(post.pk)
+        assert not (media_root / "variants" / "photo.jpg" / "320w.webp").exists()
+        assert (media_root / "variants" / "other.jpg" / "320w.webp").exists()
+
+        post.refresh_from_db()
+        post.image = None
+        post.save()
+        assert generate_post_image_variants(post.pk)
+        assert Post.objects.get(pk=post.pk).image_variants == {}
+        assert not (media_root / "variants" / "other.jpg" / "320w.webp").exists()
+
+    @patch("blog.signals.compute_related_posts.delay")
+    @patch("blog.signals.generate_post_image_variants.delay")
+    def test_scheduled_when_the_image_changes(self, mock_delay, mock_related, create_posts, media_root, django_capture_on_commit_callbacks):
+        post = create_posts[0]
+        with django_capture_on_commit_callbacks(execute=True):
+            post.image.save("photo.jpg", image_file(800, 400), save=True)
+        mock_delay.assert_called_once_with(post.pk)
+
+        mock_delay.reset_mock()
+        generate_post_image_variants(post.pk)
+        post.refresh_from_db()
+        with django_capture_on_commit_callbacks(execute=True):
+            post.title = "New title"
+            post.save()
+        mock_delay.assert_not_called()
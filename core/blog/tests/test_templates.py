@@ -52,7 +52,7 @@ class TestHomeTemplate:
 
 @pytest.mark.django_db
 class TestPostDetailTemplate:
-    def test_post-detail_template_renders_correctly(self, client, create_profile):
+    def test_post_detail_template_renders_correctly(self, client, create_profile):
         category = Category.objects.create(name="Test Category")
         post = Post.objects.create(
             author=create_profile,
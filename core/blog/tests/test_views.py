@@ -1,8 +1,15 @@
 import pytest
+from datetime import timedelta
 from django.test import Client
 from django.urls import reverse
 from django.utils import timezone
+from django.db import connection
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
 from blog.models import Post, Category
+from blog.views import HomeView
+from comment.models import Comment
+from comment.tasks import create_comment_task
 from accounts.models import User, Profile
 
 @pytest.fixture
@@ -49,9 +56,49 @@ class TestHomeView:
         assert "object_list" in response.context
         assert len(response.context["object_list"]) == 1
 
+    def test_home_view_categories_cache_is_refreshed(self, client):
+        url = reverse("blog:home")
+        Category.objects.create(name="Tech")
+        assert [c.name for c in client.get(url).context["categories"]] == ["Tech"]
+        Category.objects.create(name="AI")
+        assert [c.name for c in client.get(url).context["categories"]] == ["Tech", "AI"]
+
+    def test_home_view_category_options(self, client, create_profile):
+        category = Category.objects.create(name="Tech")
+        Post.objects.create(author=create_profile, title="Test Post", slug="test-post", content="Content",
+                            status=True, category=category, published_date=timezone.now())
+        Post.objects.create(author=create_profile, title="Draft", slug="draft", content="Content",
+                            status=False, category=category, published_date=timezone.now())
+        response = client.get(reverse("blog:home"), {"category": category.id})
+        # post_count includes drafts and scheduled posts, readers don't see it
+        assert f'<option value="{category.id}" selected>Tech</option>' in response.content.decode()
+
+    @pytest.mark.parametrize("page_size", [12, 30])
+    def test_home_view_query_count(self, client, create_profile, django_assert_max_num_queries, monkeypatch, page_size):
+        monkeypatch.setattr(HomeView, "paginate_by", page_size)
+        categories = [Category.objects.create(name=f"Category {i}") for i in range(3)]
+        for i in range(page_size + 1):
+            post = Post.objects.create(
+                author=create_profile,
+                title=f"Test Post {i}",
+                slug=f"test-post-{i}",
+                content="This is a test post.",
+                status=True,
+                category=categories[i % 3],
+                published_date=timezone.now()
+            )
+            create_comment_task(post.id, None, "Reader", "reader@example.com", "Nice.")
+        url = reverse("blog:home")
+        client.get(url)  # warm up the categories cache
+        # one COUNT for the paginator and one joined SELECT for the page
+        with django_assert_max_num_queries(2):
+            response = client.get(url)
+        assert len(response.context["object_list"]) == page_size
+        assert response.context["object_list"][0].comment_count == 1
+
 @pytest.mark.django_db
 class TestPostDetailView:
-    def test_post-detail_view_get(self, client, create_profile):
+    def test_post_detail_view_get(self, client, create_profile):
         category = Category.objects.create(name="Test Category")
         post = Post.objects.create(
             author=create_profile,
@@ -69,6 +116,155 @@ class TestPostDetailView:
         assert "post" in response.context
         assert response.context["post"] == post
 
+    @pytest.mark.parametrize("status, published_in", [(True, timedelta(days=1)), (False, timedelta(0))])
+    def test_post_detail_view_hides_unpublished_posts(self, client, create_profile, status, published_in):
+        post = Post.objects.create(
+            author=create_profile,
+            title="Test Post",
+            slug="test-post",
+            content="This is a test post.",
+            status=status,
+            published_date=timezone.now() + published_in
+        )
+        url = reverse("blog:post-detail", kwargs={"slug": post.slug})
+        assert client.get(url).status_code == 404
+        # the author can preview it
+        client.force_login(create_profile.user)
+        assert client.get(url).status_code == 200
+
+    @pytest.mark.parametrize("comment_count", [5, 500])
+    def test_post_detail_view_query_count(self, client, create_profile, django_assert_max_num_queries, comment_count):
+        post = Post.objects.create(
+            author=create_profile,
+            title="Test Post",
+            slug="test-post",
+            content="This is a test post.",
+            status=True,
+            published_date=timezone.now()
+        )
+        parents = Comment.objects.bulk_create(
+            Comment(post=post, name="Reader", email="reader@example.com", message="Nice.")
+            for _ in range(comment_count // 2)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=post, reply_to=parent, name="Author", email="author@example.com", message="Thanks.")
+            for parent in parents
+        )
+        url = reverse("blog:post-detail", kwargs={"slug": post.slug})
+        client.get(url)  # warm up the categories cache
+        # the post with its category and author, the comments, the related posts
+        with django_assert_max_num_queries(3):
+            response = client.get(url)
+        comments = response.context["comments"]
+        assert len(comments) == comment_count // 2
+        assert all(len(comment.thread_replies) == 1 for comment in comments)
+
+    def test_post_detail_view_related_posts(self, client, create_profile, django_assert_max_num_queries):
+        posts = [
+            Post.objects.create(
+                author=create_profile,
+                title=f"Test Post {i}",
+                slug=f"test-post-{i}",
+                content="This is a test post.",
+                status=i != 3,
+                published_date=timezone.now()
+            )
+            for i in range(5)
+        ]
+        post = posts[0]
+        url = reverse("blog:post-detail", kwargs={"slug": post.slug})
+        response = client.get(url)
+        # not computed yet, falls back to the newest posts
+        assert list(response.context["related_posts"]) == [posts[4], posts[2], posts[1]]
+
+        cache.set(f"blog:related:{post.pk}", [posts[3].pk, posts[2].pk, posts[4].pk, posts[1].pk])
+        with django_assert_max_num_queries(3):
+            response = client.get(url)
+            # the draft is skipped and the stored order is kept
+            assert response.context["related_posts"] == [posts[2], posts[4], posts[1]]
+
+    def test_post_detail_view_does_not_write_post(self, client, create_profile):
+        post = Post.objects.create(
+            author=create_profile,
+            title="Test Post",
+            slug="test-post",
+            content="This is a test post.",
+            status=True,
+            published_date=timezone.now()
+        )
+        updated_date = post.updated_date
+        url = reverse("blog:post-detail", kwargs={"slug": post.slug})
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+            response = client.get(url)
+        assert not [q for q in queries if q["sql"].startswith("UPDATE")]
+        assert response.context["post"].views == 2
+        post.refresh_from_db()
+        assert post.views == 0
+        assert post.updated_date == updated_date
+
+@pytest.mark.django_db
+class TestPostListView:
+    @pytest.fixture
+    def author_posts(self, create_profile):
+        category = Category.objects.create(name="Test Category")
+        other = Profile.objects.get(user=User.objects.create_user(email="other@example.com", password="password123"))
+        for i in range(14):
+            Post.objects.create(
+                author=create_profile if i < 13 else other,
+                title=f"Test Post {i}",
+                slug=f"test-post-{i}",
+                content="This is a test post.",
+                status=i % 4 != 0,
+                category=category,
+                published_date=timezone.now()
+            )
+        return create_profile
+
+    def test_post_list_view_login_required(self, client):
+        response = client.get(reverse("blog:post-list"))
+        assert response.status_code == 302
+        assert "/accounts/login/" in response.url
+
+    def test_post_list_view_paginates_own_posts(self, client, author_posts, django_assert_max_num_queries):
+        client.force_login(author_posts.user)
+        url = reverse("blog:post-list")
+        client.get(url)  # warm up the categories cache
+        # session, user, profile, the COUNT, the page and the aggregate
+        with django_assert_max_num_queries(6):
+            response = client.get(url)
+        posts = response.context["object_list"]
+        assert [post.title for post in posts] == [f"Test Post {i}" for i in range(12, 0, -1)]
+        assert response.context["counts"] == {"total": 13, "published": 9, "scheduled": 0, "drafts": 4}
+        assert 'href="?page=2"' in response.content.decode()
+
+        response = client.get(url, {"page": 2})
+        assert [post.title for post in response.context["object_list"]] == ["Test Post 0"]
+
+        # the pages of a search keep the query
+        response = client.get(url, {"query": "test"})
+        assert 'href="?query=test&amp;page=2"' in response.content.decode()
+
+    def test_post_list_view_search_matches_title_or_content(self, client, create_profile):
+        for slug, title, content in [
+            ("in-title", "Django tips", "Nothing else."),
+            ("in-content", "Some tips", "All about Django."),
+            ("in-neither", "Flask tips", "Nothing else."),
+        ]:
+            Post.objects.create(author=create_profile, title=title, slug=slug, content=content,
+                                status=True, published_date=timezone.now())
+        client.force_login(create_profile.user)
+        response = client.get(reverse("blog:post-list"), {"query": "django"})
+        assert {post.slug for post in response.context["object_list"]} == {"in-title", "in-content"}
+
+    def test_post_list_view_filters_category(self, client, author_posts):
+        other = Category.objects.create(name="Other")
+        Post.objects.filter(slug="test-post-3").update(category=other)
+        client.force_login(author_posts.user)
+        response = client.get(reverse("blog:post-list"), {"category": other.id})
+        assert [post.slug for post in response.context["object_list"]] == ["test-post-3"]
+        assert response.context["counts"]["total"] == 13
+
 @pytest.mark.django_db
 class TestPostCreateView:
     def test_post_create_view_get_unauthenticated(self, client):
@@ -83,7 +279,7 @@ class TestPostCreateView:
         url = reverse("blog:create")
         response = client.get(url)
         assert response.status_code == 200
-        assert "blog/post-create.html" in [t.name for t in response.templates]
+        assert "blog/post-form.html" in [t.name for t in response.templates]
 
     def test_post_create_view_post(self, client, create_user, create_profile):
         user = create_user(email="test5@example.com")
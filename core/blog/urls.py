@@ -1,14 +1,23 @@
+from django.conf import settings
 from django.urls import path, include
 
 from . import views
 
 app_name = "blog"
 
+if settings.ASYNC_VIEWS:
+    home_view = views.AsyncHomeView.as_view()
+    post_detail_view = views.AsyncPostDetailView.as_view()
+else:
+    home_view = views.HomeView.as_view()
+    post_detail_view = views.PostDetailView.as_view()
+
 urlpatterns = [
-    path("", views.HomeView.as_view(), name="home"),
+    path("", home_view, name="home"),
     # Manage posts
     path("posts/", views.PostListView.as_view(), name="post-list"),
-    path("posts/<slug:slug>", views.PostDetailView.as_view(), name="post-detail"),
+    path("posts/<slug:slug>", post_detail_view, name="post-detail"),
+    path("posts/<slug:slug>/live", views.PostLiveView.as_view(), name="post-live"),
     path("posts/<slug:slug>/edit", views.PostUpdateView.as_view(), name="post-update"),
     path("posts/<slug:slug>/delete", views.PostDeleteView.as_view(), name="post-delete"),
     path("create/", views.PostCreateView.as_view(), name="create"),
@@ -1,12 +1,25 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import View, ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from .mixins import OwnerRequiredMixin
 from django.shortcuts import get_object_or_404
+from django.http import Http404, JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
+from django.utils.decorators import method_decorator
+from django.core.paginator import InvalidPage
+from django.db.models import Count, Q
+from django.utils.translation import gettext as _
+from django.contrib.auth import get_user_model
 from .forms import PostForm, CategoryForm
 from django.urls import reverse_lazy
-from django.db.models import Q
 
 from blog.models import Post, Category
+from blog.cache import get_categories, aget_categories
+from comment.models import Comment
+from blog.counters import get_view_counter
+from blog.search import get_search_backend
+from blog.related import get_related_ids, aget_related_ids
+from core.async_api import apaginate
 
 
 class HomeView(ListView):
@@ -14,7 +27,8 @@ class HomeView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        qs = Post.objects.filter(status=True)
+        # the post cards show the category, the author and the comment count
+        qs = Post.objects.visible().select_related("category", "author").defer("content_html")
 
         # 1) Filter by category if set and valid
         category = self.request.GET.get("category")
@@ -26,20 +40,17 @@ class HomeView(ListView):
                 # invalid category id in URL—ignore or log
                 pass
 
-        # 2) Filter by search query, matching title OR content
+        # 2) Full-text search on title OR content, best matches first
         query = self.request.GET.get("query", "").strip()
         if query:
-            qs = qs.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query)
-            )
+            return get_search_backend().search(qs, query)
 
         # 3) Final ordering
         return qs.order_by("-id")
 
     def get_context_data(self, **kwargs):
         context = super(HomeView, self).get_context_data(**kwargs)
-        context["categories"] = Category.objects.all()
+        context["categories"] = get_categories()
         return context
 
 
@@ -47,17 +58,131 @@ class PostDetailView(DetailView):
     template_name = "blog/post-detail.html"
     context_object_name = "post"
     slug_url_kwarg = "slug"
-    model = Post
+
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user).select_related("category", "author")
 
     def get_context_data(self, **kwargs):
         context = super(PostDetailView, self).get_context_data(**kwargs)
-        context["related_posts"] = Post.objects.filter(status=True).order_by("-id")[:3]
-        context["categories"] = Category.objects.all()
+        context["comments"] = Comment.objects.thread(context["post"])
         post = context["post"]
-        post.views += 1
-        post.save()
+        context["related_posts"] = self.get_related_posts(post)
+        context["categories"] = get_categories()
+        # hits are buffered and flushed by blog.tasks.flush_post_views,
+        # so add the pending ones to show an up to date count
+        post.views += get_view_counter().hit(post.pk)
         return context
 
+    def get_related_posts(self, post):
+        posts = Post.objects.visible().select_related("category")
+        related_ids = get_related_ids(post.pk)
+        if related_ids is None:
+            # not computed yet, show the newest posts of the same category
+            return posts.filter(category_id=post.category_id).exclude(pk=post.pk).order_by("-id")[:3]
+        related = posts.in_bulk(related_ids)
+        return [related[pk] for pk in related_ids if pk in related][:3]
+
+
+class AsyncHomeView(HomeView):
+    """
+    ``HomeView`` for ASGI mode, the page is loaded with the async ORM.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        paginator = self.get_paginator(self.object_list, self.paginate_by)
+        paginator.count = await self.object_list.acount()
+        # same page number handling as MultipleObjectMixin.paginate_queryset
+        page_number = self.kwargs.get(self.page_kwarg) or request.GET.get(self.page_kwarg) or 1
+        try:
+            page_number = paginator.num_pages if page_number == "last" else int(page_number)
+        except ValueError:
+            raise Http404(_("Page is not “last”, nor can it be converted to an int."))
+        try:
+            page = await apaginate(paginator, page_number)
+        except InvalidPage as e:
+            raise Http404(
+                _("Invalid page (%(page_number)s): %(message)s")
+                % {"page_number": page_number, "message": str(e)}
+            )
+        context = {
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "object_list": page.object_list,
+            "post_list": page.object_list,
+            "categories": await aget_categories(),
+            "view": self,
+        }
+        return self.render_to_response(context)
+
+
+class AsyncPostDetailView(PostDetailView):
+    """
+    ``PostDetailView`` for ASGI mode, the page is loaded with the async ORM.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if user.is_authenticated:
+            # the template compares the author with user.profile
+            user = await get_user_model().objects.select_related("profile").aget(pk=user.pk)
+        request.user = user
+        try:
+            post = await self.get_queryset().aget(slug=self.kwargs[self.slug_url_kwarg])
+        except Post.DoesNotExist:
+            raise Http404(
+                _("No %(verbose_name)s found matching the query")
+                % {"verbose_name": Post._meta.verbose_name}
+            )
+
+        post.views += await get_view_counter().ahit(post.pk)
+        self.object = post
+        context = {
+            "object": post,
+            "post": post,
+            "comments": await Comment.objects.athread(post),
+            "related_posts": await self.aget_related_posts(post),
+            "categories": await aget_categories(),
+            "view": self,
+        }
+        return self.render_to_response(context)
+
+    async def aget_related_posts(self, post):
+        posts = Post.objects.visible().select_related("category")
+        related_ids = await aget_related_ids(post.pk)
+        if related_ids is None:
+            fallback = posts.filter(category_id=post.category_id).exclude(pk=post.pk).order_by("-id")[:3]
+            return [related async for related in fallback]
+        related = await posts.ain_bulk(related_ids)
+        return [related[pk] for pk in related_ids if pk in related][:3]
+
+
+@method_decorator(never_cache, name="dispatch")
+class PostLiveView(View):
+    """
+    The per-request parts of a pre-rendered post page, which fetches them
+    on load: records the hit and returns the view count, whether to show the
+    author links and a CSRF token for the comment forms.
+    """
+
+    def get(self, request, slug):
+        post = (
+            Post.objects.visible().filter(slug=slug)
+            .values("id", "views", "author__user_id")
+            .first()
+        )
+        if post is None:
+            raise Http404(
+                _("No %(verbose_name)s found matching the query")
+                % {"verbose_name": Post._meta.verbose_name}
+            )
+        return JsonResponse({
+            "views": post["views"] + get_view_counter().hit(post["id"]),
+            "is_author": request.user.is_authenticated and request.user.pk == post["author__user_id"],
+            "csrf_token": get_token(request),
+        })
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     form_class = PostForm
@@ -80,17 +205,36 @@ class CategoryCreateView(LoginRequiredMixin, CreateView):
 class PostListView(LoginRequiredMixin, ListView):
     model = Post
     template_name = "blog/post-list.html"
+    paginate_by = 12
 
     def get_queryset(self):
-        category_id = self.request.GET.get("category", "all")
-        query = self.request.GET.get("query", "")
-        if category_id != "all":
-            posts = Post.objects.filter(title__icontains=query, content__icontains=query, category_id=category_id, author=self.request.user.profile).order_by("-id")
-        elif query:
-            posts = Post.objects.filter(title__icontains=query, content__icontains=query, author=self.request.user.profile).order_by("-id")
-        else:
-            posts = Post.objects.filter(author=self.request.user.profile).order_by("-id")
-        return posts
+        # walks the (author, id) index newest first
+        qs = Post.objects.filter(author=self.request.user.profile).select_related("category").defer("content_html")
+
+        category = self.request.GET.get("category")
+        if category and category != "all":
+            try:
+                qs = qs.filter(category_id=int(category))
+            except ValueError:
+                pass
+
+        # title OR content, best matches first, like the home page
+        query = self.request.GET.get("query", "").strip()
+        if query:
+            return get_search_backend().search(qs, query)
+        return qs.order_by("-id")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["categories"] = get_categories()
+        # all the counts of the author in one query
+        context["counts"] = Post.objects.filter(author=self.request.user.profile).aggregate(
+            total=Count("id"),
+            published=Count("id", filter=Q(status=True, scheduled=False)),
+            scheduled=Count("id", filter=Q(scheduled=True)),
+            drafts=Count("id", filter=Q(status=False)),
+        )
+        return context
 
 
 class PostUpdateView(LoginRequiredMixin, OwnerRequiredMixin, UpdateView):
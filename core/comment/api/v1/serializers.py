@@ -12,3 +12,12 @@ class CommentSerializer(serializers.ModelSerializer):
         if not value.strip():
             raise serializers.ValidationError("Comment message cannot be empty.")
         return value
+
+
+class CommentSubmissionSerializer(CommentSerializer):
+    """
+    ``CommentSerializer`` taking the post and the comment replied to as plain
+    ids, for the async view, which looks them up with the async ORM.
+    """
+    post = serializers.IntegerField()
+    reply_to = serializers.IntegerField(required=False, allow_null=True)
@@ -1,8 +1,16 @@
+from django.conf import settings
 from django.urls import path
-from .views import CreateCommentApiView
+from core.async_api import async_api_view
+from .views import CreateCommentApiView, CommentStatusApiView
 
 app_name="api-v1"
 
+if settings.ASYNC_VIEWS:
+    create_view = async_api_view(CreateCommentApiView, {"post": "apost"})
+else:
+    create_view = CreateCommentApiView.as_view()
+
 urlpatterns = [
-    path("create/", CreateCommentApiView.as_view(), name="create"),
+    path("create/", create_view, name="create"),
+    path("status/<str:task_id>", CommentStatusApiView.as_view(), name="status"),
 ]
\ No newline at end of file
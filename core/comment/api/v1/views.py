@@ -1,9 +1,20 @@
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import GenericAPIView
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
-from ...tasks import create_comment_task
-from .serializers import CommentSerializer
+from core.buffers import get_buffer
+from ...tasks import create_comment_task, COMMENT_BUFFER
+from ...status import mark_pending, get_status
+from blog.models import Post
+from ...models import Comment
+from .serializers import CommentSerializer, CommentSubmissionSerializer
 
 
 class CreateCommentApiView(GenericAPIView):
@@ -16,16 +27,75 @@ class CreateCommentApiView(GenericAPIView):
         post_id = serializer.validated_data['post'].id
         reply_to = serializer.validated_data.get('reply_to')
         reply_to_id = reply_to.id if reply_to else None
-        name = serializer.validated_data['name']
-        email = serializer.validated_data['email']
-        message = serializer.validated_data['message']
+        return self.enqueue(post_id, reply_to_id, serializer.validated_data)
+
+    async def apost(self, request, *args, **kwargs):
+        """
+        Async version of ``post`` for ASGI mode.
+        """
+        serializer = CommentSubmissionSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
 
-        task = create_comment_task.apply_async(
-            args=[post_id, reply_to_id, name, email, message]
+        post_id = serializer.validated_data['post']
+        reply_to_id = serializer.validated_data.get('reply_to')
+        # the same errors as the related fields of CommentSerializer
+        does_not_exist = PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+        errors = {}
+        if not await Post.objects.filter(pk=post_id).aexists():
+            errors['post'] = [does_not_exist.format(pk_value=post_id)]
+        if reply_to_id is not None and not await Comment.objects.filter(pk=reply_to_id).aexists():
+            errors['reply_to'] = [does_not_exist.format(pk_value=reply_to_id)]
+        if errors:
+            raise ValidationError(errors)
+        # the buffer, the status store and the broker are no database, so
+        # enqueue doesn't have to queue up for the thread of the sync code
+        return await sync_to_async(self.enqueue, thread_sensitive=False)(
+            post_id, reply_to_id, serializer.validated_data
         )
 
+    def enqueue(self, post_id, reply_to_id, validated_data):
+        name = validated_data['name']
+        email = validated_data['email']
+        message = validated_data['message']
+
+        if settings.COMMENT_BATCH_INGESTION:
+            # queued for comment.tasks.drain_comment_buffer
+            task_id = str(uuid.uuid4())
+            mark_pending(task_id)
+            get_buffer(COMMENT_BUFFER).push({
+                'task_id': task_id,
+                'post_id': post_id,
+                'reply_to_id': reply_to_id,
+                'name': name,
+                'email': email,
+                'message': message,
+            })
+        else:
+            task = create_comment_task.apply_async(
+                args=[post_id, reply_to_id, name, email, message]
+            )
+            task_id = task.id
+            mark_pending(task_id)
+
         return Response({
             'status': 'accepted',
-            'task_id': task.id,
+            'task_id': task_id,
             'detail': 'Comment creation is processing in background.'
-        }, status=status.HTTP_202_ACCEPTED)
\ No newline at end of file
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+
+class CommentStatusApiView(APIView):
+    """
+    Lets a client poll whether the comment it submitted has been created.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, task_id, *args, **kwargs):
+        record = get_status(task_id)
+        if record is None:
+            return Response(
+                {'detail': 'Unknown or expired task id.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response({'task_id': task_id, **record}, status=status.HTTP_200_OK)
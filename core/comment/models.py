@@ -2,6 +2,39 @@ from django.db import models
 from blog.models import Post
 
 
+class CommentQuerySet(models.QuerySet):
+    def thread(self, post):
+        """
+        Load every active comment of a post with a single query and build the
+        reply tree in memory. Returns the top level comments; each comment
+        carries its direct replies in ``thread_replies``.
+        """
+        return self.build_thread(list(self.thread_queryset(post)))
+
+    async def athread(self, post):
+        """
+        Async version of ``thread``.
+        """
+        return self.build_thread([comment async for comment in self.thread_queryset(post)])
+
+    def thread_queryset(self, post):
+        return self.filter(post=post, is_active=True).order_by("created_at", "id")
+
+    @staticmethod
+    def build_thread(comments):
+        by_id = {comment.id: comment for comment in comments}
+        top_level = []
+        for comment in comments:
+            comment.thread_replies = []
+        for comment in comments:
+            if comment.reply_to_id is None:
+                top_level.append(comment)
+            elif comment.reply_to_id in by_id:
+                by_id[comment.reply_to_id].thread_replies.append(comment)
+            # replies to a hidden comment are hidden along with it
+        return top_level
+
+
 class Comment(models.Model):
     """
     This is the comment model for managing comments of each post
@@ -15,5 +48,7 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CommentQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name}:{self.email} | {self.message[:25]}"
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from blog.models import Post
+from blog.tasks import prerender_posts
+from .models import Comment
+
+
+@receiver(pre_save, sender=Comment)
+def remember_saved_values(sender, instance, update_fields=None, **kwargs):
+    # the post and state the comment had, for update_comment_counts
+    instance._saved_values = {}
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {"post", "post_id", "is_active"} & set(update_fields):
+        return
+    instance._saved_values = Comment.objects.filter(pk=instance.pk).values("post_id", "is_active").first() or {}
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_counts(sender, instance, created, **kwargs):
+    # Post.comment_count counts the active comments, the ones the thread shows
+    previous = None
+    if not created:
+        saved = getattr(instance, "_saved_values", {})
+        if saved.get("is_active", instance.is_active):
+            previous = saved.get("post_id", instance.post_id)
+    current = instance.post_id if instance.is_active else None
+    if previous == current:
+        return
+    if previous is not None:
+        Post.objects.filter(pk=previous).add_comments(-1)
+    if current is not None:
+        Post.objects.filter(pk=current).add_comments(1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if instance.is_active:
+        Post.objects.filter(pk=instance.post_id).add_comments(-1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def schedule_prerender(sender, instance, **kwargs):
+    # the pre-rendered page of the post lists its comments
+    if settings.BLOG_PRERENDER_POSTS:
+        transaction.on_commit(lambda: prerender_posts.delay([instance.post_id]))
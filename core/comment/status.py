@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+
+PENDING = "pending"
+CREATED = "created"
+FAILED = "failed"
+
+
+def status_key(task_id):
+    return f"comment:status:{task_id}"
+
+
+def set_status(task_id, status, comment_id=None):
+    cache.set(
+        status_key(task_id),
+        {"status": status, "comment_id": comment_id},
+        timeout=settings.COMMENT_STATUS_TIMEOUT,
+    )
+
+
+def mark_pending(task_id):
+    """
+    Record a new submission as pending, unless its worker already got to it.
+    """
+    cache.add(
+        status_key(task_id),
+        {"status": PENDING, "comment_id": None},
+        timeout=settings.COMMENT_STATUS_TIMEOUT,
+    )
+
+
+def set_statuses(statuses):
+    """
+    Write many ``{task_id: (status, comment_id)}`` records in one round trip.
+    """
+    cache.set_many(
+        {
+            status_key(task_id): {"status": status, "comment_id": comment_id}
+            for task_id, (status, comment_id) in statuses.items()
+        },
+        timeout=settings.COMMENT_STATUS_TIMEOUT,
+    )
+
+
+def get_status(task_id):
+    """
+    Return ``{"status": ..., "comment_id": ...}`` for a submission, or None
+    when it is unknown or its record has expired.
+    """
+    return cache.get(status_key(task_id))
@@ -1,15 +1,31 @@
+from collections import Counter, defaultdict
+
 from celery import shared_task
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
+from core.buffers import get_buffer
 from .models import Comment
+from .status import set_status, set_statuses, CREATED, FAILED
 from blog.models import Post
+from blog.tasks import prerender_posts
 
-@shared_task
-def create_comment_task(post_id, reply_to_id, name, email, message):
+COMMENT_BUFFER = "comments"
+
+
+@shared_task(bind=True)
+def create_comment_task(self, post_id, reply_to_id, name, email, message):
     """
     Background task to create a new comment.
     """
+    task_id = self.request.id
 
-    post = Post.objects.get(pk=post_id)
+    try:
+        post = Post.objects.get(pk=post_id)
+    except Post.DoesNotExist:
+        if task_id:
+            set_status(task_id, FAILED)
+        raise
     parent = None
     if reply_to_id:
         try:
@@ -17,11 +33,90 @@ def create_comment_task(post_id, reply_to_id, name, email, message):
         except Comment.DoesNotExist:
             parent = None
 
-    comment = Comment.objects.create(
-        post=post,
-        reply_to=parent,
-        name=name,
-        email=email,
-        message=message,
+    with transaction.atomic():
+        # comment.signals counts it on the post
+        comment = Comment.objects.create(
+            post=post,
+            reply_to=parent,
+            name=name,
+            email=email,
+            message=message,
+        )
+    if task_id:
+        set_status(task_id, CREATED, comment.id)
+    return comment.id
+
+
+@shared_task
+def drain_comment_buffer(batch_size=None):
+    """
+    Create the comments queued by CreateCommentApiView in batch ingestion mode,
+    up to ``batch_size`` of them per transaction, until the buffer is empty.
+    """
+    batch_size = batch_size or settings.COMMENT_BATCH_SIZE
+    comment_buffer = get_buffer(COMMENT_BUFFER)
+    created = 0
+    while True:
+        submissions = comment_buffer.pop_many(batch_size)
+        if not submissions:
+            return created
+        created += create_comments(submissions)
+
+
+def create_comments(submissions):
+    """
+    Validate a batch of submissions with one lookup for posts and one for
+    parents, insert the comments with a single bulk_create and record the
+    status of every submission. When the insert fails the batch is queued
+    again, a submission is marked failed once it has been tried
+    ``COMMENT_MAX_ATTEMPTS`` times.
+    """
+    posts = Post.objects.in_bulk({s["post_id"] for s in submissions})
+    parents = Comment.objects.in_bulk(
+        {s["reply_to_id"] for s in submissions if s["reply_to_id"]}
     )
-    return comment.id
\ No newline at end of file
+
+    statuses = {}
+    accepted = []
+    for submission in submissions:
+        if submission["post_id"] not in posts:
+            statuses[submission["task_id"]] = (FAILED, None)
+            continue
+        comment = Comment(
+            post_id=submission["post_id"],
+            # like create_comment_task, an unknown parent makes a top level comment
+            reply_to=parents.get(submission["reply_to_id"]),
+            name=submission["name"],
+            email=submission["email"],
+            message=submission["message"],
+        )
+        accepted.append((submission, comment))
+
+    try:
+        with transaction.atomic():
+            Comment.objects.bulk_create([comment for _, comment in accepted])
+            # bulk_create sends no post_save, comment.signals doesn't see these
+            posts_by_count = defaultdict(list)
+            for post_id, count in Counter(c.post_id for _, c in accepted).items():
+                posts_by_count[count].append(post_id)
+            for count, post_ids in posts_by_count.items():
+                Post.objects.filter(pk__in=post_ids).add_comments(count)
+            if settings.BLOG_PRERENDER_POSTS:
+                commented = list({comment.post_id for _, comment in accepted})
+                transaction.on_commit(lambda: prerender_posts.delay(commented))
+    except Exception:
+        # the batch is already out of the buffer, the next drain tries it again
+        retry = []
+        for submission, _ in accepted:
+            attempts = submission.get("attempts", 0) + 1
+            if attempts < settings.COMMENT_MAX_ATTEMPTS:
+                retry.append({**submission, "attempts": attempts})
+            else:
+                statuses[submission["task_id"]] = (FAILED, None)
+        get_buffer(COMMENT_BUFFER).push(*retry)
+        set_statuses(statuses)
+        raise
+
+    statuses.update({submission["task_id"]: (CREATED, comment.id) for submission, comment in accepted})
+    set_statuses(statuses)
+    return len(accepted)
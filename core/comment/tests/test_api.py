@@ -1,10 +1,16 @@
 import pytest
+import threading
 from rest_framework.test import APIClient
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
 from django.urls import reverse
 from django.utils import timezone
 from blog.models import Post, Category
 from accounts.models import User, Profile
 from unittest.mock import patch
+from comment.models import Comment
+from comment.status import get_status
+from comment.tasks import create_comment_task, drain_comment_buffer
 
 @pytest.fixture
 def api_client():
@@ -57,6 +63,27 @@ class TestCreateCommentApiView:
         assert response.data["task_id"] == "test_task_id"
         mock_apply_async.assert_called_once()
 
+    @patch('comment.api.v1.views.create_comment_task.apply_async')
+    def test_create_comment_api_view_batch_mode(self, mock_apply_async, api_client, create_post, settings):
+        settings.COMMENT_BATCH_INGESTION = True
+        url = reverse("comment:api-v1:create")
+        data = {
+            "post": create_post.id,
+            "name": "Test User",
+            "email": "test@example.com",
+            "message": "This is a test comment."
+        }
+        response = api_client.post(url, data)
+        assert response.status_code == 202
+        mock_apply_async.assert_not_called()
+        task_id = response.data["task_id"]
+        assert get_status(task_id) == {"status": "pending", "comment_id": None}
+
+        drain_comment_buffer()
+        status = get_status(task_id)
+        assert status["status"] == "created"
+        assert Comment.objects.get(pk=status["comment_id"]).message == "This is a test comment."
+
     def test_create_comment_api_view_invalid_data(self, api_client, create_post):
         url = reverse("comment:api-v1:create")
         data = {
@@ -69,3 +96,101 @@ class TestCreateCommentApiView:
         assert response.status_code == 400
         assert "email" in response.data
         assert "message" in response.data
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("async_views")
+class TestAsyncCreateCommentApiView:
+    def post(self, data):
+        # AsyncClient runs the view on the event loop, a sync database call raises there
+        return async_to_sync(AsyncClient().post)(reverse("comment:api-v1:create"), data)
+
+    @patch('comment.api.v1.views.create_comment_task.apply_async')
+    def test_create_comment(self, mock_apply_async, create_post):
+        mock_apply_async.return_value.id = 'test_task_id'
+        comment = Comment.objects.create(post=create_post, name="A", email="a@example.com", message="First")
+        response = self.post({
+            "post": create_post.id,
+            "reply_to": comment.id,
+            "name": "Test User",
+            "email": "test@example.com",
+            "message": "This is a test comment."
+        })
+        assert response.status_code == 202
+        assert response.json()["task_id"] == "test_task_id"
+        assert mock_apply_async.call_args.kwargs["args"] == [
+            create_post.id, comment.id, "Test User", "test@example.com", "This is a test comment."
+        ]
+        assert get_status("test_task_id") == {"status": "pending", "comment_id": None}
+
+    def test_create_comment_is_queued_off_the_sync_thread(self, create_post, settings):
+        settings.COMMENT_BATCH_INGESTION = True
+        threads = []
+        with patch("comment.api.v1.views.mark_pending", side_effect=lambda task_id: threads.append(threading.current_thread())):
+            response = self.post({
+                "post": create_post.id,
+                "name": "Test User",
+                "email": "test@example.com",
+                "message": "This is a test comment."
+            })
+        assert response.status_code == 202
+        # async_to_sync runs the thread sensitive code in the main thread
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_create_comment_missing_objects(self, create_post):
+        response = self.post({
+            "post": 999,
+            "reply_to": 998,
+            "name": "Test User",
+            "email": "test@example.com",
+            "message": "This is a test comment."
+        })
+        assert response.status_code == 400
+        assert response.json() == {
+            "post": ['Invalid pk "999" - object does not exist.'],
+            "reply_to": ['Invalid pk "998" - object does not exist.'],
+        }
+
+    def test_create_comment_invalid_data(self, create_post):
+        response = self.post({
+            "post": create_post.id,
+            "name": "Test User",
+            "email": "invalid-email",
+            "message": ""
+        })
+        assert response.status_code == 400
+        assert set(response.json()) == {"email", "message"}
+
+
+@pytest.mark.django_db
+class TestCommentStatusApiView:
+    @patch('comment.api.v1.views.create_comment_task.apply_async')
+    def test_comment_status(self, mock_apply_async, api_client, create_post):
+        mock_apply_async.return_value.id = 'test_task_id'
+        args = [create_post.id, None, "Test User", "test@example.com", "This is a test comment."]
+        api_client.post(reverse("comment:api-v1:create"), {
+            "post": create_post.id,
+            "name": "Test User",
+            "email": "test@example.com",
+            "message": "This is a test comment."
+        })
+        url = reverse("comment:api-v1:status", kwargs={"task_id": "test_task_id"})
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert response.data == {"task_id": "test_task_id", "status": "pending", "comment_id": None}
+
+        # what the worker does with the enqueued task
+        comment_id = create_comment_task.apply(args=args, task_id="test_task_id").get()
+        response = api_client.get(url)
+        assert response.data == {"task_id": "test_task_id", "status": "created", "comment_id": comment_id}
+
+    def test_comment_status_failed(self, api_client):
+        create_comment_task.apply(args=[999, None, "Test User", "test@example.com", "Hi."], task_id="failing")
+        url = reverse("comment:api-v1:status", kwargs={"task_id": "failing"})
+        response = api_client.get(url)
+        assert response.data["status"] == "failed"
+
+    def test_comment_status_unknown(self, api_client):
+        url = reverse("comment:api-v1:status", kwargs={"task_id": "unknown"})
+        response = api_client.get(url)
+        assert response.status_code == 404
@@ -1,4 +1,5 @@
 import pytest
+from django.urls import reverse
 from django.utils import timezone
 from blog.models import Post, Category
 from accounts.models import User, Profile
@@ -66,3 +67,67 @@ class TestCommentModel:
         assert reply.reply_to == parent_comment
         assert parent_comment.replies.count() == 1
         assert parent_comment.replies.first() == reply
+
+    def test_thread(self, create_post):
+        first = Comment.objects.create(
+            post=create_post, name="First", email="first@example.com", message="First comment."
+        )
+        second = Comment.objects.create(
+            post=create_post, name="Second", email="second@example.com", message="Second comment."
+        )
+        reply = Comment.objects.create(
+            post=create_post, name="Reply", email="reply@example.com", message="A reply.", reply_to=first
+        )
+        hidden = Comment.objects.create(
+            post=create_post, name="Hidden", email="hidden@example.com", message="Hidden.", is_active=False
+        )
+        Comment.objects.create(
+            post=create_post, name="Orphan", email="orphan@example.com", message="Orphan.", reply_to=hidden
+        )
+
+        thread = Comment.objects.thread(create_post)
+        assert thread == [first, second]
+        assert thread[0].thread_replies == [reply]
+        assert thread[1].thread_replies == []
+
+
+@pytest.mark.django_db
+class TestCommentCount:
+    def comment_count(self, post):
+        post.refresh_from_db()
+        return post.comment_count
+
+    def test_created_comment_is_counted(self, create_post):
+        Comment.objects.create(post=create_post, name="First", email="first@example.com", message="First.")
+        Comment.objects.create(
+            post=create_post, name="Hidden", email="hidden@example.com", message="Hidden.", is_active=False
+        )
+        assert self.comment_count(create_post) == 1
+
+    def test_deactivate_and_reactivate(self, create_post):
+        comment = Comment.objects.create(post=create_post, name="First", email="first@example.com", message="First.")
+        comment.is_active = False
+        comment.save()
+        assert self.comment_count(create_post) == 0
+        # saving it again unchanged doesn't count it twice
+        comment.save()
+        assert self.comment_count(create_post) == 0
+
+        comment.is_active = True
+        comment.save(update_fields=["is_active"])
+        assert self.comment_count(create_post) == 1
+        comment.message = "Edited."
+        comment.save()
+        assert self.comment_count(create_post) == 1
+
+    def test_admin_created_and_moderated_comment(self, admin_client, create_post):
+        data = {"post": create_post.pk, "name": "Admin", "email": "admin@example.com", "message": "Hi.", "is_active": "on"}
+        response = admin_client.post(reverse("admin:comment_comment_add"), data)
+        assert response.status_code == 302
+        assert self.comment_count(create_post) == 1
+
+        comment = Comment.objects.get()
+        data.pop("is_active")
+        response = admin_client.post(reverse("admin:comment_comment_change", args=[comment.pk]), data)
+        assert response.status_code == 302
+        assert self.comment_count(create_post) == 0
@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import patch
+from django.utils import timezone
+from blog.models import Post, Category
+from accounts.models import Profile
+from comment.models import Comment
+from comment.tasks import create_comment_task, drain_comment_buffer, COMMENT_BUFFER
+from comment.status import get_status
+from core.buffers import get_buffer
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def create_profile(create_user):
+    user = create_user(email='test@example.com')
+    profile = Profile.objects.get(user=user)
+    return profile
+
+@pytest.fixture
+def create_post(create_profile):
+    category = Category.objects.create(name="Test Category")
+    post = Post.objects.create(
+        author=create_profile,
+        title="Test Post",
+        slug="test-post",
+        content="This is a test post.",
+        status=True,
+        category=category,
+        published_date=timezone.now()
+    )
+    return post
+
+@pytest.mark.django_db
+class TestCreateCommentTask:
+    def test_create_comment_task(self, create_post):
+        comment_id = create_comment_task(create_post.id, None, "Test User", "test@example.com", "A comment.")
+        reply_id = create_comment_task(create_post.id, comment_id, "Reply User", "reply@example.com", "A reply.")
+
+        reply = Comment.objects.get(pk=reply_id)
+        assert reply.reply_to_id == comment_id
+        create_post.refresh_from_db()
+        assert create_post.comment_count == 2
+
+    def test_deleting_comment_updates_count(self, create_post):
+        comment_id = create_comment_task(create_post.id, None, "Test User", "test@example.com", "A comment.")
+        create_comment_task(create_post.id, comment_id, "Reply User", "reply@example.com", "A reply.")
+
+        Comment.objects.get(pk=comment_id).delete()
+        create_post.refresh_from_db()
+        assert create_post.comment_count == 0
+
+
+@pytest.mark.django_db
+class TestDrainCommentBuffer:
+    def submission(self, task_id, post_id, reply_to_id=None):
+        return {
+            "task_id": task_id,
+            "post_id": post_id,
+            "reply_to_id": reply_to_id,
+            "name": "Test User",
+            "email": "test@example.com",
+            "message": "A comment.",
+        }
+
+    def test_drain_comment_buffer(self, create_post, django_assert_max_num_queries):
+        parent = Comment.objects.create(
+            post=create_post, name="Parent", email="parent@example.com", message="Parent."
+        )
+        comment_buffer = get_buffer(COMMENT_BUFFER)
+        comment_buffer.push(
+            *(self.submission(f"task-{i}", create_post.id) for i in range(7)),
+            self.submission("reply", create_post.id, parent.id),
+            self.submission("missing-parent", create_post.id, 999),
+            self.submission("missing-post", 999),
+        )
+
+        # per batch of 5: posts, parents, insert, count update, plus the savepoint
+        with django_assert_max_num_queries(12):
+            assert drain_comment_buffer(batch_size=5) == 9
+
+        assert len(comment_buffer) == 0
+        create_post.refresh_from_db()
+        # the parent was counted when it was created
+        assert create_post.comment_count == 10
+        assert get_status("missing-post") == {"status": "failed", "comment_id": None}
+        status = get_status("reply")
+        assert status["status"] == "created"
+        assert Comment.objects.get(pk=status["comment_id"]).reply_to == parent
+        status = get_status("missing-parent")
+        assert Comment.objects.get(pk=status["comment_id"]).reply_to is None
+
+    def test_drain_empty_buffer(self):
+        assert drain_comment_buffer() == 0
+
+    def test_failed_batch_is_queued_again(self, create_post):
+        comment_buffer = get_buffer(COMMENT_BUFFER)
+        comment_buffer.push(self.submission("first", create_post.id), self.submission("second", create_post.id))
+
+        with patch.object(Comment.objects, "bulk_create", side_effect=Exception("database is down")):
+            with pytest.raises(Exception):
+                drain_comment_buffer()
+        assert len(comment_buffer) == 2
+        assert get_status("first") is None
+
+        assert drain_comment_buffer() == 2
+        assert get_status("first")["status"] == "created"
+
+    def test_failed_batch_is_dropped_after_the_last_attempt(self, create_post, settings):
+        settings.COMMENT_MAX_ATTEMPTS = 2
+        comment_buffer = get_buffer(COMMENT_BUFFER)
+        comment_buffer.push(self.submission("comment", create_post.id))
+
+        with patch.object(Comment.objects, "bulk_create", side_effect=Exception("database is down")):
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    drain_comment_buffer()
+        assert len(comment_buffer) == 0
+        assert get_status("comment") == {"status": "failed", "comment_id": None}
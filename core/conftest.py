@@ -0,0 +1,96 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="run the benchmarks under benchmarks/",
+    )
+    parser.addoption(
+        "--benchmark-json",
+        metavar="PATH",
+        help="write the results of the endpoint benchmarks to PATH",
+    )
+    parser.addoption(
+        "--benchmark-baseline",
+        metavar="PATH",
+        help="fail the endpoint benchmarks that regressed against the results in PATH",
+    )
+    parser.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.5,
+        help="how much slower than the baseline the median latency may get, 0.5 is 50%% (default)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="needs --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """
+    Swap the Redis backed stores for in-process ones so tests don't need a Redis server.
+    """
+    from django.core.cache import cache
+    from blog.counters import get_view_counter
+    from core.buffers import _buffers
+    from accounts.replay import _filters
+    from profiling.stats import _stores
+
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    settings.BLOG_VIEW_COUNTER = "blog.counters.LocMemViewCounter"
+    settings.BUFFER_BACKEND = "core.buffers.LocMemBuffer"
+    settings.ACCOUNTS_REPLAY_FILTER = "accounts.replay.LocMemReplayFilter"
+    settings.PROFILING_STORE = "profiling.stats.LocMemProfileStore"
+    cache.clear()
+    get_view_counter().drain()
+    _buffers.clear()
+    _filters.clear()
+    _stores.clear()
+    yield
+
+
+@pytest.fixture
+def async_views(settings):
+    """
+    Route requests to the async views, like a deployment with ASYNC_VIEWS set.
+    """
+    import importlib
+    from django.urls import clear_url_caches
+
+    # the root urlconf last, its resolvers hold on to the patterns of the others
+    modules = [
+        "blog.api.v1.urls",
+        "blog.urls",
+        "comment.api.v1.urls",
+        "comment.urls",
+        "accounts.api.v1.urls.account",
+        "accounts.api.v1.urls",
+        "accounts.urls",
+        settings.ROOT_URLCONF,
+    ]
+
+    def reload_urls():
+        for name in modules:
+            importlib.reload(importlib.import_module(name))
+        clear_url_caches()
+
+    enabled = settings.ASYNC_VIEWS
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.ASYNC_VIEWS = enabled
+    reload_urls()
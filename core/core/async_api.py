@@ -0,0 +1,67 @@
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+
+
+async def apaginate(paginator, number):
+    """
+    Async version of ``paginator.page(number)`` for a paginator over a
+    queryset. The rows of the returned page are loaded.
+    """
+    if "count" not in paginator.__dict__:
+        # a cached_property, filled in so the page number is validated without a query
+        paginator.count = await paginator.object_list.acount()
+    page = paginator.page(number)
+    page.object_list = [row async for row in page.object_list]
+    return page
+
+
+async def is_anonymous(request):
+    """
+    Whether a request carries no credentials at all, resolved without blocking.
+    """
+    if "HTTP_AUTHORIZATION" in request.META:
+        return False
+    request.user = await request.auser()
+    return not request.user.is_authenticated
+
+
+def async_api_view(view_class, handlers, actions=None, **initkwargs):
+    """
+    Build an async view for ``view_class``, a DRF view or viewset.
+
+    Anonymous requests whose method is a key of ``handlers`` are answered by
+    the coroutine method of the view named by the value. It runs with the
+    same content negotiation, permission checks and exception handling as
+    ``APIView.dispatch``, the credentials don't have to be checked. Every other
+    request is passed to the regular sync view. ``actions`` and ``initkwargs``
+    are passed on to ``as_view``.
+    """
+    if actions:
+        sync_view = sync_to_async(view_class.as_view(actions, **initkwargs))
+    else:
+        sync_view = sync_to_async(view_class.as_view(**initkwargs))
+
+    async def view(request, *args, **kwargs):
+        handler_name = handlers.get(request.method.lower())
+        if handler_name is None or not await is_anonymous(request):
+            return await sync_view(request, *args, **kwargs)
+
+        self = view_class(**initkwargs)
+        # viewsets pick self.action from it in initialize_request
+        self.action_map = actions or {}
+        self.args, self.kwargs = args, kwargs
+        self.headers = self.default_response_headers
+        self.request = self.initialize_request(request, *args, **kwargs)
+        self.request.user, self.request.auth = request.user, None
+        try:
+            self.format_kwarg = self.get_format_suffix(**kwargs)
+            renderer, media_type = self.perform_content_negotiation(self.request)
+            self.request.accepted_renderer, self.request.accepted_media_type = renderer, media_type
+            self.check_permissions(self.request)
+            response = await getattr(self, handler_name)(self.request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(self.request, response, *args, **kwargs)
+
+    # like APIView.as_view, CSRF is checked by SessionAuthentication
+    return csrf_exempt(view)
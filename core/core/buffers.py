@@ -0,0 +1,96 @@
+import json
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseBuffer:
+    """
+    A named FIFO queue of JSON-serializable items, used to hand work from the
+    web processes to celery tasks that process it in batches.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def push(self, *items):
+        raise NotImplementedError
+
+    def pop_many(self, count):
+        """
+        Atomically remove and return up to ``count`` items, oldest first.
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class RedisListBuffer(BaseBuffer):
+    """
+    Keeps the items in a Redis list on the connection of the ``default`` cache.
+    """
+
+    alias = "default"
+
+    @property
+    def key(self):
+        return f"buffer:{self.name}"
+
+    @property
+    def client(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection(self.alias)
+
+    def push(self, *items):
+        if items:
+            self.client.rpush(self.key, *(json.dumps(item) for item in items))
+
+    def pop_many(self, count):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(self.key, 0, count - 1)
+        pipe.ltrim(self.key, count, -1)
+        items, _ = pipe.execute()
+        return [json.loads(item) for item in items]
+
+    def __len__(self):
+        return self.client.llen(self.key)
+
+
+class LocMemBuffer(BaseBuffer):
+    """
+    In-process buffer for development and tests.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._lock = threading.Lock()
+        self._items = deque()
+
+    def push(self, *items):
+        with self._lock:
+            # round-trip through JSON like the Redis buffer does
+            self._items.extend(json.loads(json.dumps(item)) for item in items)
+
+    def pop_many(self, count):
+        with self._lock:
+            return [self._items.popleft() for _ in range(min(count, len(self._items)))]
+
+    def __len__(self):
+        return len(self._items)
+
+
+_buffers = {}
+
+
+def get_buffer(name):
+    """
+    Return the buffer called ``name``, of the class set by ``settings.BUFFER_BACKEND``.
+    """
+    key = (settings.BUFFER_BACKEND, name)
+    if key not in _buffers:
+        _buffers[key] = import_string(settings.BUFFER_BACKEND)(name)
+    return _buffers[key]
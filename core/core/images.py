@@ -0,0 +1,157 @@
+import io
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils.functional import cached_property
+from PIL import Image, ImageOps
+
+# Pillow names of the formats variants can be written in
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def variant_name(source, width, fmt):
+    # the extension stays in: a.png and a.jpg are different uploads
+    return f"variants/{source}/{width}w.{fmt}"
+
+
+def variant_widths(width):
+    """
+    The configured widths narrower than the original, or the original width
+    when it is narrower than all of them. Images are never upscaled.
+    """
+    return [w for w in settings.IMAGE_VARIANT_WIDTHS if w < width] or [width]
+
+
+def encode(image, fmt, icc_profile):
+    buffer = io.BytesIO()
+    if fmt == "jpeg" and image.mode != "RGB":
+        if "A" in image.getbands() or "transparency" in image.info:
+            # JPEG has no alpha, flatten it onto white instead of black
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+    elif fmt == "webp" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    # nothing from the original but the colour profile is written, EXIF
+    # (camera, GPS position...) and XMP are left out
+    params = {"quality": settings.IMAGE_VARIANT_FORMATS[fmt], "icc_profile": icc_profile}
+    if fmt == "jpeg":
+        params.update(optimize=True, progressive=True)
+    else:
+        params.update(method=6)
+    image.save(buffer, FORMATS[fmt], **params)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file):
+    """
+    Write the resized variants of an image to its storage and return their
+    description, the value stored in an ``image_variants`` field.
+    """
+    storage = field_file.storage
+    with storage.open(field_file.name, "rb") as f:
+        with Image.open(f) as original:
+            icc_profile = original.info.get("icc_profile")
+            # apply the EXIF orientation, it is dropped with the rest of the metadata
+            image = ImageOps.exif_transpose(original)
+            image.load()
+
+    variants = {"source": field_file.name, "width": image.width, "height": image.height}
+    for fmt in settings.IMAGE_VARIANT_FORMATS:
+        variants[fmt] = []
+        for width in variant_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            name = variant_name(field_file.name, width, fmt)
+            # same source, same names: regenerating overwrites instead of adding copies
+            if storage.exists(name):
+                storage.delete(name)
+            name = storage.save(name, ContentFile(encode(resized, fmt, icc_profile)))
+            variants[fmt].append({"width": width, "name": name})
+    return variants
+
+
+def variant_names(variants):
+    return [variant["name"] for fmt in FORMATS for variant in variants.get(fmt, [])]
+
+
+def delete_variants(storage, variants):
+    for name in variant_names(variants):
+        storage.delete(name)
+
+
+def needs_variants(instance, field_name="image"):
+    """
+    Whether the variants stored on ``instance`` don't belong to its current image.
+    """
+    name = getattr(instance, field_name).name or ""
+    return name != getattr(instance, f"{field_name}_variants").get("source", "")
+
+
+def update_image_variants(instance, field_name="image"):
+    """
+    Generate the variants of an image field unless they exist already and
+    store them in ``<field_name>_variants``, with an UPDATE that only applies
+    while the image is still the same one. Returns whether they were stored.
+    """
+    field_file = getattr(instance, field_name)
+    variants_field = f"{field_name}_variants"
+    current = getattr(instance, variants_field)
+    storage = field_file.storage
+    if not needs_variants(instance, field_name) and all(
+        storage.exists(name) for name in variant_names(current)
+    ):
+        return False
+
+    if field_file:
+        variants = generate_variants(field_file)
+        same_image = Q(**{field_name: field_file.name})
+    else:
+        variants = {}
+        same_image = Q(**{field_name: ""}) | Q(**{f"{field_name}__isnull": True})
+    updated = (
+        type(instance)
+        ._default_manager.filter(same_image, pk=instance.pk)
+        .update(**{variants_field: variants})
+    )
+    if not updated:
+        # the image was replaced meanwhile, its own task takes care of it
+        delete_variants(storage, variants)
+        return False
+    if current.get("source") != variants.get("source"):
+        delete_variants(storage, current)
+    setattr(instance, variants_field, variants)
+    return True
+
+
+def image_srcsets(instance, field_name="image", build_url=None):
+    """
+    Return ``{format: srcset}`` for the variants of the current image of
+    ``instance``, empty while they haven't been generated. ``build_url`` is
+    applied to the storage URL of every variant.
+    """
+    if needs_variants(instance, field_name):
+        return {}
+    storage = getattr(instance, field_name).storage
+    variants = getattr(instance, f"{field_name}_variants")
+    build_url = build_url or (lambda url: url)
+    return {
+        fmt: ", ".join(f"{build_url(storage.url(v['name']))} {v['width']}w" for v in variants[fmt])
+        for fmt in FORMATS
+        if variants.get(fmt)
+    }
+
+
+class ImageVariantsMixin:
+    """
+    Model mixin for an ``image`` field with its variants stored in
+    ``image_variants``, for templates.
+    """
+
+    @cached_property
+    def image_srcsets(self):
+        return image_srcsets(self)
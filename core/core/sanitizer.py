@@ -0,0 +1,110 @@
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+# what rendered markdown is made of, everything else is stripped
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "dd", "del", "div", "dl", "dt", "em",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "ins", "li", "ol", "p", "pre",
+    "s", "strong", "sub", "sup", "table", "tbody", "td", "th", "thead", "tr", "u", "ul",
+}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "code": {"class"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "td": {"align"},
+    "th": {"align"},
+}
+URL_ATTRIBUTES = {"href", "src"}
+ALLOWED_SCHEMES = {"", "http", "https", "mailto"}
+# elements without content or an end tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+# removed together with their content, not only the tags
+DROPPED_TAGS = {"script", "style", "iframe", "object", "embed", "template", "textarea", "select", "noscript"}
+# browsers ignore these inside a URL, "java\tscript:" is still javascript
+IGNORED_URL_CHARACTERS = re.compile(r"[\x00-\x20]")
+
+
+def is_safe_url(url):
+    try:
+        scheme = urlsplit(IGNORED_URL_CHARACTERS.sub("", url)).scheme
+    except ValueError:
+        return False
+    return scheme.lower() in ALLOWED_SCHEMES
+
+
+class Sanitizer(HTMLParser):
+    """
+    Rewrites HTML keeping only the allowed tags and attributes, with text
+    re-escaped and every element closed.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output = []
+        # allowed elements that haven't been closed yet
+        self.open_tags = []
+        # dropped elements that haven't been closed yet
+        self.dropping = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            if tag not in VOID_TAGS:
+                self.dropping.append(tag)
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = "".join(
+            f' {name}="{escape(value, quote=True)}"'
+            for name, value in attrs
+            if name in allowed and value is not None and (name not in URL_ATTRIBUTES or is_safe_url(value))
+        )
+        self.output.append(f"<{tag}{rendered}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            if tag in self.dropping:
+                # with the dropped elements left open inside it
+                del self.dropping[len(self.dropping) - self.dropping[::-1].index(tag) - 1:]
+            return
+        if tag not in self.open_tags:
+            return
+        # allowed elements aren't opened while dropping, so this one is around
+        # the dropped elements left open and ends them too
+        self.dropping.clear()
+        # close the elements left open inside it first
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.output.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.output.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        return "".join(self.output + [f"</{tag}>" for tag in reversed(self.open_tags)])
+
+
+def sanitize_html(html):
+    """
+    Return ``html`` without the markup that could run scripts or escape its
+    container, safe to output unescaped.
+    """
+    sanitizer = Sanitizer()
+    sanitizer.feed(html)
+    return sanitizer.result()
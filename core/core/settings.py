@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     "accounts",
     "blog",
     "comment",
+    "profiling",
     "rest_framework",
     "rest_framework.authtoken",
     "rest_framework_simplejwt",
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so the time of the other middleware is included
+    'profiling.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,6 +80,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
+# Serve the hot read endpoints with async views, for deployments running core.asgi
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -147,10 +153,8 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # Basic, Session, Token and JWT, picked from the Authorization header
+        "accounts.api.authentication.APIAuthentication",
     ],
 }
 
@@ -161,12 +165,47 @@ EMAIL_HOST = "smtp4dev"  # SMTP server host
 EMAIL_HOST_USER = ""  # SMTP server username
 EMAIL_HOST_PASSWORD = ""  # SMTP server password
 EMAIL_PORT = 25  # SMTP server port (587 for TLS, 465 for SSL)
+DEFAULT_FROM_EMAIL = "admin@admin.com"
+# Queued emails sent per batch by accounts.tasks.send_queued_emails
+EMAIL_BATCH_SIZE = 100
+# Times a queued email is tried before it is dropped
+EMAIL_MAX_ATTEMPTS = 3
 
 # Swagger configuration
 SWAGGER_USE_COMPAT_RENDERERS = False
 
 # Celery Configuration
 CELERY_BROKER_URL = "redis://redis:6379/1"
+CELERY_BEAT_SCHEDULE = {
+    "flush-post-views": {
+        "task": "blog.tasks.flush_post_views",
+        "schedule": 30.0,  # seconds
+    },
+    "drain-comment-buffer": {
+        "task": "comment.tasks.drain_comment_buffer",
+        "schedule": 5.0,  # seconds
+    },
+    "send-queued-emails": {
+        "task": "accounts.tasks.send_queued_emails",
+        "schedule": 5.0,  # seconds
+    },
+    "prune-used-tokens": {
+        "task": "accounts.tasks.prune_used_tokens",
+        "schedule": 60.0 * 60 * 24,  # seconds
+    },
+    "remove-unused-categories": {
+        "task": "blog.tasks.remove_unused_categories",
+        "schedule": 60.0 * 60,  # seconds
+    },
+    "publish-scheduled-posts": {
+        "task": "blog.tasks.publish_scheduled_posts",
+        "schedule": 60.0,  # seconds
+    },
+    "rebuild-related-posts": {
+        "task": "blog.tasks.rebuild_related_posts",
+        "schedule": 60.0 * 60 * 24,  # seconds
+    },
+}
 
 # Cache
 CACHES = {
@@ -178,3 +217,56 @@ CACHES = {
         }
     }
 }
+
+# Queue used to hand batched work to celery, see core/buffers.py
+BUFFER_BACKEND = config("BUFFER_BACKEND", default="core.buffers.RedisListBuffer")
+
+# Accounts
+# Seconds API credentials and the users they belong to stay cached
+ACCOUNTS_AUTH_CACHE_TIMEOUT = 60 * 5
+# Threads hashing the passwords of new users for the async registration view, see accounts/hashing.py
+ACCOUNTS_HASHING_WORKERS = config("ACCOUNTS_HASHING_WORKERS", default=4, cast=int)
+# Bloom filter answering whether a token JTI may have been used, see accounts/replay.py
+ACCOUNTS_REPLAY_FILTER = config("ACCOUNTS_REPLAY_FILTER", default="accounts.replay.RedisReplayFilter")
+ACCOUNTS_REPLAY_FILTER_CAPACITY = 1_000_000
+ACCOUNTS_REPLAY_FILTER_ERROR_RATE = 0.001
+
+# Images
+# Widths in pixels of the variants generated for uploaded images, see core/images.py
+IMAGE_VARIANT_WIDTHS = [320, 640, 1280]
+# Formats of the variants and their encoder quality
+IMAGE_VARIANT_FORMATS = {"webp": 80, "jpeg": 82}
+
+# Blog
+# Where post page hits are buffered until flush_post_views writes them
+BLOG_VIEW_COUNTER = config("BLOG_VIEW_COUNTER", default="blog.counters.RedisViewCounter")
+# Dotted path of the post search backend, picked from the database vendor when unset
+BLOG_SEARCH_BACKEND = config("BLOG_SEARCH_BACKEND", default=None)
+# Seconds anonymous post API responses stay cached, saves and deletes expire them earlier
+BLOG_API_CACHE_TIMEOUT = 60 * 15
+# Number of related post ids computed and stored per post
+BLOG_RELATED_POSTS = 3
+# Write the pages of published posts under MEDIA_ROOT/prerendered for nginx to serve, see blog/prerender.py
+BLOG_PRERENDER_POSTS = config("BLOG_PRERENDER_POSTS", default=False, cast=bool)
+# Seconds a category stays without posts before remove_unused_categories deletes it
+BLOG_UNUSED_CATEGORY_GRACE = 60 * 60 * 24
+
+# Profiling
+# Record query counts and timings of every request per view, see profiling/middleware.py
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=False, cast=bool)
+# Where the histograms are aggregated, shared by every process by default
+PROFILING_STORE = config("PROFILING_STORE", default="profiling.stats.RedisProfileStore")
+# Upper bounds of the histogram buckets, in milliseconds and in queries
+PROFILING_TIME_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+PROFILING_QUERY_BUCKETS = [1, 2, 5, 10, 20, 50, 100]
+# A request running the same SQL more often than this is logged as a likely N+1
+PROFILING_REPEATED_QUERY_THRESHOLD = config("PROFILING_REPEATED_QUERY_THRESHOLD", default=10, cast=int)
+
+# Comments
+# Queue submitted comments and insert them in batches instead of one task per comment
+COMMENT_BATCH_INGESTION = config("COMMENT_BATCH_INGESTION", default=False, cast=bool)
+COMMENT_BATCH_SIZE = 500
+# Times a queued comment is tried before its submission is marked failed
+COMMENT_MAX_ATTEMPTS = 3
+# Seconds the status of a comment submission is kept
+COMMENT_STATUS_TIMEOUT = 60 * 60
@@ -26,6 +26,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include("accounts.urls")),
     path("comment/", include("comment.urls")),
+    path("profiling/", include("profiling.urls")),
     path("", include("blog.urls"))
 ]
 
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import ProfilingReportApiView
+
+app_name = "api-v1"
+
+urlpatterns = [
+    path("report/", ProfilingReportApiView.as_view(), name="report"),
+]
@@ -0,0 +1,21 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ...stats import get_profile_store
+
+
+class ProfilingReportApiView(APIView):
+    """
+    Per view request counts, time and query histograms and the SQL flagged
+    as N+1 recorded by ProfilingMiddleware. DELETE starts over.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_profile_store().report())
+
+    def delete(self, request, *args, **kwargs):
+        get_profile_store().reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
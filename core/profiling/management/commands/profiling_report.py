@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ...stats import get_profile_store
+
+COLUMNS = [
+    ("requests", None),
+    ("total p50", ("total_ms", "p50")),
+    ("total p95", ("total_ms", "p95")),
+    ("total mean", ("total_ms", "mean")),
+    ("db mean", ("db_ms", "mean")),
+    ("render mean", ("render_ms", "mean")),
+    ("queries p95", ("queries", "p95")),
+    ("queries mean", ("queries", "mean")),
+]
+
+
+class Command(BaseCommand):
+    help = "Show the per view timings and query counts recorded by ProfilingMiddleware, slowest first"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+        parser.add_argument("--reset", action="store_true", help="clear the recorded data after showing it")
+
+    def handle(self, *args, **options):
+        store = get_profile_store()
+        report = store.report()
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        elif not report:
+            self.stdout.write("Nothing recorded, is PROFILING_ENABLED set?")
+        else:
+            self.write_table(report)
+        if options["reset"]:
+            store.reset()
+
+    def write_table(self, report):
+        rows = [
+            [view_name] + [
+                str(summary["requests"] if path is None else summary[path[0]][path[1]])
+                for _, path in COLUMNS
+            ]
+            for view_name, summary in sorted(
+                report.items(), key=lambda item: item[1]["total_ms"]["mean"], reverse=True
+            )
+        ]
+        header = ["view"] + [title for title, _ in COLUMNS]
+        widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+        for row in [header, *rows]:
+            self.stdout.write("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+        for view_name, summary in report.items():
+            for shape, requests in summary["repeated_queries"].items():
+                self.stdout.write(self.style.WARNING(f"N+1 in {view_name}, {requests} requests: {shape}"))
@@ -0,0 +1,145 @@
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .stats import get_profile_store
+
+logger = logging.getLogger(__name__)
+
+# the profile of the request being handled, context variables follow the
+# queries of async views into the threads running them
+_current = contextvars.ContextVar("profiling_request", default=None)
+
+IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+\b")
+
+
+def sql_shape(sql):
+    """
+    The SQL with the values taken out, so the queries of a loop over rows
+    share one shape whatever row they load.
+    """
+    sql = IN_LIST.sub("IN (...)", sql)
+    return NUMBER_LITERAL.sub("?", STRING_LITERAL.sub("?", sql))
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.shapes = Counter()
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated_queries(self):
+        threshold = settings.PROFILING_REPEATED_QUERY_THRESHOLD
+        return {shape: count for shape, count in self.shapes.items() if count > threshold}
+
+
+def profile_queries(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection, a no-op outside of a
+    profiled request.
+    """
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile.execute(execute, sql, params, many, context)
+
+
+def install_wrapper(connection, **kwargs):
+    if profile_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_queries)
+
+
+class ProfilingMiddleware:
+    """
+    Measures the total time, the number and duration of the database
+    queries and the render time of every request and records them in the
+    profile store under the URL name of the view. A request running the
+    same SQL shape more than ``PROFILING_REPEATED_QUERY_THRESHOLD`` times
+    is logged and counted as a likely N+1.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # connections opened later get it from the connection_created receiver
+        for connection in connections.all(initialized_only=True):
+            install_wrapper(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, profile, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        await sync_to_async(self.record)(request, profile, time.perf_counter() - started)
+        return response
+
+    def process_template_response(self, request, response):
+        # the response is rendered right after the template response middleware ran
+        profile = _current.get()
+        started = time.perf_counter()
+
+        def rendered(response):
+            profile.render_time += time.perf_counter() - started
+
+        if profile is not None:
+            response.add_post_render_callback(rendered)
+        return response
+
+    def record(self, request, profile, elapsed):
+        match = request.resolver_match
+        view_name = match.view_name if match else "<unresolved>"
+        repeated = profile.repeated_queries()
+        for shape, count in repeated.items():
+            logger.warning("%s %s ran the same query %d times: %s", request.method, request.path, count, shape)
+        metrics = {
+            "total_ms": round(elapsed * 1000, 3),
+            "db_ms": round(profile.db_time * 1000, 3),
+            "render_ms": round(profile.render_time * 1000, 3),
+            "queries": profile.queries,
+        }
+        try:
+            get_profile_store().record(view_name, metrics, repeated)
+        except Exception:
+            # losing a measurement is better than failing the request
+            logger.exception("Could not record the profile of %s", view_name)
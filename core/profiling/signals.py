@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .middleware import install_wrapper
+
+
+@receiver(connection_created)
+def profile_connection(sender, connection, **kwargs):
+    if settings.PROFILING_ENABLED:
+        install_wrapper(connection)
@@ -0,0 +1,181 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+TIME_METRICS = ["total_ms", "db_ms", "render_ms"]
+METRICS = [*TIME_METRICS, "queries"]
+PERCENTILES = [50, 95, 99]
+
+
+def bucket_bounds(metric):
+    return settings.PROFILING_TIME_BUCKETS if metric in TIME_METRICS else settings.PROFILING_QUERY_BUCKETS
+
+
+def histogram_fields(metrics):
+    """
+    Return the increments recording one request as ``{field: amount}``: the
+    request counter, the sum of every metric and one bucket per metric.
+    """
+    fields = {"requests": 1}
+    for metric in METRICS:
+        value = metrics[metric]
+        fields[f"{metric}:sum"] = value
+        # the bucket past the last bound counts everything above it
+        fields[f"{metric}:{bisect_left(bucket_bounds(metric), value)}"] = 1
+    return fields
+
+
+def summarize(fields, repeated):
+    """
+    Turn the stored fields of a view back into its report: per metric the
+    mean, bucket counts and percentiles, given as the upper bound of the
+    bucket they fall in.
+    """
+    requests = int(fields.get("requests", 0))
+    summary = {"requests": requests}
+    for metric in METRICS:
+        bounds = bucket_bounds(metric)
+        counts = [int(fields.get(f"{metric}:{index}", 0)) for index in range(len(bounds) + 1)]
+        labels = [str(bound) for bound in bounds] + ["+Inf"]
+        percentiles = {}
+        for percentile in PERCENTILES:
+            rank, seen = requests * percentile / 100, 0
+            for label, count in zip(labels, counts):
+                seen += count
+                if seen >= rank:
+                    percentiles[f"p{percentile}"] = label
+                    break
+        summary[metric] = {
+            "mean": round(float(fields.get(f"{metric}:sum", 0)) / requests, 2) if requests else 0,
+            **percentiles,
+            "buckets": dict(zip(labels, counts)),
+        }
+    summary["repeated_queries"] = {shape: int(count) for shape, count in repeated.items()}
+    return summary
+
+
+class BaseProfileStore:
+    """
+    Aggregates the measurements of ``ProfilingMiddleware`` per view name as
+    histograms, plus the SQL the N+1 detector flagged and how many requests
+    it flagged it in.
+    """
+
+    def record(self, view_name, metrics, repeated=()):
+        """
+        Add one request of ``view_name``. ``metrics`` maps every name in
+        ``METRICS`` to its value, ``repeated`` lists the flagged SQL shapes.
+        """
+        self.increment(view_name, histogram_fields(metrics), list(repeated))
+
+    def increment(self, view_name, fields, repeated):
+        raise NotImplementedError
+
+    def load(self):
+        """
+        Return the raw data as ``{view_name: (fields, repeated)}``.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def report(self):
+        """
+        Return ``{view_name: summary}``, see ``summarize``.
+        """
+        return {view_name: summarize(fields, repeated) for view_name, (fields, repeated) in sorted(self.load().items())}
+
+
+class RedisProfileStore(BaseProfileStore):
+    """
+    Keeps a hash per view on the connection of the ``default`` cache, shared
+    by every web process. Recording a request is one pipelined round trip.
+    """
+
+    alias = "default"
+    prefix = "profiling"
+
+    @property
+    def client(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection(self.alias)
+
+    def keys(self, view_name):
+        return f"{self.prefix}:view:{view_name}", f"{self.prefix}:repeated:{view_name}"
+
+    def increment(self, view_name, fields, repeated):
+        view_key, repeated_key = self.keys(view_name)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.sadd(f"{self.prefix}:views", view_name)
+        for field, amount in fields.items():
+            if isinstance(amount, float):
+                pipe.hincrbyfloat(view_key, field, amount)
+            else:
+                pipe.hincrby(view_key, field, amount)
+        for shape in repeated:
+            pipe.hincrby(repeated_key, shape, 1)
+        pipe.execute()
+
+    def load(self):
+        client = self.client
+        view_names = sorted(name.decode() for name in client.smembers(f"{self.prefix}:views"))
+        pipe = client.pipeline(transaction=False)
+        for view_name in view_names:
+            for key in self.keys(view_name):
+                pipe.hgetall(key)
+        results = pipe.execute()
+        decode = lambda data: {key.decode(): value.decode() for key, value in data.items()}
+        return {
+            view_name: (decode(results[2 * i]), decode(results[2 * i + 1]))
+            for i, view_name in enumerate(view_names)
+        }
+
+    def reset(self):
+        client = self.client
+        keys = [key for name in client.smembers(f"{self.prefix}:views") for key in self.keys(name.decode())]
+        client.delete(f"{self.prefix}:views", *keys)
+
+
+class LocMemProfileStore(BaseProfileStore):
+    """
+    In-process store for development and tests, every process reports only
+    its own requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def increment(self, view_name, fields, repeated):
+        with self._lock:
+            view_fields, view_repeated = self._views[view_name]
+            for field, amount in fields.items():
+                view_fields[field] += amount
+            for shape in repeated:
+                view_repeated[shape] += 1
+
+    def load(self):
+        with self._lock:
+            return {name: (dict(fields), dict(repeated)) for name, (fields, repeated) in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views = defaultdict(lambda: (defaultdict(int), defaultdict(int)))
+
+
+_stores = {}
+
+
+def get_profile_store():
+    """
+    Return the store configured by ``settings.PROFILING_STORE``.
+    """
+    path = settings.PROFILING_STORE
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
@@ -0,0 +1,135 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient, RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from blog.models import Post, Category
+from blog.cache import get_categories
+from accounts.models import Profile
+from profiling.middleware import ProfilingMiddleware, sql_shape
+from profiling.stats import get_profile_store, summarize
+
+@pytest.fixture
+def profiling(settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_TIME_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+    settings.PROFILING_QUERY_BUCKETS = [1, 2, 5, 10, 20, 50, 100]
+    settings.PROFILING_REPEATED_QUERY_THRESHOLD = 10
+
+@pytest.fixture
+def create_user(django_user_model):
+    def make_user(**kwargs):
+        kwargs.setdefault('password', 'password123')
+        if 'email' not in kwargs:
+            raise ValueError("Email is required to create a user")
+        return django_user_model.objects.create_user(**kwargs)
+    return make_user
+
+@pytest.fixture
+def create_posts(create_user):
+    profile = Profile.objects.get(user=create_user(email='test@example.com'))
+    category = Category.objects.create(name="Test Category")
+    return Post.objects.bulk_create([
+        Post(
+            author=profile,
+            title=f"Test Post {i}",
+            slug=f"test-post-{i}",
+            content="This is a test post.",
+            status=True,
+            category=category,
+            published_date=timezone.now(),
+        )
+        for i in range(12)
+    ])
+
+def test_sql_shape():
+    assert sql_shape('SELECT * FROM "blog_post" WHERE "id" = %s') == 'SELECT * FROM "blog_post" WHERE "id" = %s'
+    assert sql_shape('SELECT * FROM "blog_post" WHERE "id" IN (%s, %s, %s)') == 'SELECT * FROM "blog_post" WHERE "id" IN (...)'
+    assert sql_shape("SELECT * FROM t WHERE a = 12 AND b = 'it''s' LIMIT 21") == "SELECT * FROM t WHERE a = ? AND b = ? LIMIT ?"
+
+def test_summarize(profiling):
+    fields = {"requests": 4, "queries:sum": 10, "queries:1": 3, "queries:7": 1}
+    for metric in ["total_ms", "db_ms", "render_ms"]:
+        fields.update({f"{metric}:sum": 40.0, f"{metric}:0": 4})
+    summary = summarize(fields, {"SELECT 1": 2})
+    assert summary["requests"] == 4
+    assert summary["queries"]["mean"] == 2.5
+    assert (summary["queries"]["p50"], summary["queries"]["p95"]) == ("2", "+Inf")
+    assert summary["queries"]["buckets"]["+Inf"] == 1
+    assert summary["total_ms"]["p99"] == "5"
+    assert summary["repeated_queries"] == {"SELECT 1": 2}
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    def test_records_views(self, client, profiling, create_posts):
+        get_categories()
+        client.get(reverse("blog:home"))
+        client.get(reverse("blog:home"))
+        client.get(reverse("blog:post-detail", kwargs={"slug": "test-post-0"}))
+
+        report = get_profile_store().report()
+        assert set(report) == {"blog:home", "blog:post-detail"}
+        home = report["blog:home"]
+        assert home["requests"] == 2
+        # a COUNT and the page, the categories are cached
+        assert home["queries"]["mean"] == 2
+        assert home["render_ms"]["mean"] > 0
+        assert home["total_ms"]["mean"] >= home["db_ms"]["mean"]
+        assert sum(home["total_ms"]["buckets"].values()) == 2
+        assert home["repeated_queries"] == {}
+
+    def test_async_views(self, profiling, create_posts, async_views):
+        get_categories()
+        async_to_sync(AsyncClient().get)(reverse("blog:home"))
+        # queries run in the threads of the async ORM are counted too
+        assert get_profile_store().report()["blog:home"]["queries"]["mean"] == 2
+
+    def test_detects_repeated_queries(self, profiling, create_posts, settings, caplog):
+        settings.PROFILING_REPEATED_QUERY_THRESHOLD = 5
+
+        def view(request):
+            for post in Post.objects.all():
+                post.author.first_name
+            return None
+
+        request = RequestFactory().get(reverse("blog:home"))
+        request.resolver_match = resolve(reverse("blog:home"))
+        ProfilingMiddleware(view)(request)
+
+        repeated = get_profile_store().report()["blog:home"]["repeated_queries"]
+        assert len(repeated) == 1
+        assert 'FROM "accounts_profile"' in next(iter(repeated))
+        assert "ran the same query 12 times" in caplog.text
+
+    def test_disabled(self, client, create_posts):
+        client.get(reverse("blog:home"))
+        assert get_profile_store().report() == {}
+
+@pytest.mark.django_db
+class TestProfilingReport:
+    def test_staff_only(self, create_user, profiling):
+        client = APIClient()
+        url = reverse("profiling:api-v1:report")
+        assert client.get(url).status_code == 401
+        client.force_authenticate(create_user(email="user@example.com"))
+        assert client.get(url).status_code == 403
+
+    def test_report_and_reset(self, create_user, profiling, create_posts):
+        client = APIClient()
+        client.force_authenticate(create_user(email="staff@example.com", is_staff=True))
+        client.get(reverse("blog:home"))
+        url = reverse("profiling:api-v1:report")
+        assert client.get(url).json()["blog:home"]["requests"] == 1
+        assert client.delete(url).status_code == 204
+        # the DELETE itself came after the reset
+        assert list(client.get(url).json()) == ["profiling:api-v1:report"]
+
+    def test_command(self, client, profiling, create_posts, capsys):
+        client.get(reverse("blog:home"))
+        call_command("profiling_report", "--reset")
+        output = capsys.readouterr().out
+        assert output.splitlines()[0].split()[:3] == ["view", "requests", "total"]
+        assert output.splitlines()[1].split()[:2] == ["blog:home", "1"]
+        assert get_profile_store().report() == {}
@@ -0,0 +1,7 @@
+from django.urls import path, include
+
+app_name = "profiling"
+
+urlpatterns = [
+    path("api/v1/", include("profiling.api.v1.urls")),
+]